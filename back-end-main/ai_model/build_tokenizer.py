@@ -0,0 +1,18 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db.util import iterReviewsOrderedByProduct
+from ai_model.util import data_prep, save_tokenizer, preprocess_text, vocab_size, max_length, tokenizer_path
+
+
+def build_tokenizer(path=tokenizer_path):
+  # Tokenizer di-fit pada teks hasil praproses, sama seperti teks yang di-encode saat prediksi
+  corpus = [preprocess_text(review['review']) for review in iterReviewsOrderedByProduct()]
+  _, tokenizer = data_prep(corpus, vocab_size, max_length)
+  save_tokenizer(tokenizer, path)
+  print(f"✅ Tokenizer fitted on {len(corpus)} reviews and saved to {path}")
+  return tokenizer
+
+
+if __name__ == '__main__':
+  build_tokenizer()
@@ -1,59 +1,93 @@
 import os
+import logging
 import pandas as pd
 from tensorflow.keras.models import load_model
-from .util import data_prep, preprocess_text
+from .util import preprocess_many, load_tokenizer, max_length, tokenizer_path, default_batch_size
 from tensorflow.keras.preprocessing.sequence import pad_sequences
 from .custom_layers import TransformerBlock, TokenAndPositionEmbedding
 import numpy as np
 import nltk
+from monitoring.metrics import timed_inference
+
+log = logging.getLogger(__name__)
 
 
 
 # Load pre-trained model
 abs_path = os.path.abspath(os.path.join(os.path.dirname(__file__)))
 model_path = os.path.join(abs_path, 'sentiment_model.keras')
+
+# Label dari sentimen
+mapped_class = ['negative', 'neutral', 'positive']
+
 nltk.download('stopwords')
 # Load pre-trained model
 model = load_model(model_path)
 
 
+# Tokenizer disimpan sebagai artifact di samping model dan hanya dimuat sekali.
+# Buat dengan: python -m ai_model.build_tokenizer
+try:
+  tokenizer = load_tokenizer()
+except FileNotFoundError:
+  tokenizer = None
+  log.warning('tokenizer artifact not found, run: python -m ai_model.build_tokenizer', extra={'path': tokenizer_path})
 
 
-def predict_sentiment(corpus, text):
-  # Praproses teks masukan
-  preprocessed_text = preprocess_text(text)
-
-  # config
-  max_length = 100
-  vocab_size = 6000
-
-  # Inisialisasi tokenizer dan padding
-  _, tokenizer = data_prep(corpus, vocab_size, max_length)
+def encode_texts(texts, preprocessed=False):
+  if tokenizer is None:
+    raise RuntimeError(f"Tokenizer artifact not found at {tokenizer_path}, run: python -m ai_model.build_tokenizer")
 
+  # Praproses teks masukan (dilewati jika sudah dipraproses, misal oleh worker ETL)
+  preprocessed_texts = texts if preprocessed else preprocess_many(texts)
   # Membentuk text menjadi sequences
-  test_seq = tokenizer.texts_to_sequences([preprocessed_text])
+  sequences = tokenizer.texts_to_sequences(preprocessed_texts)
   # Menerapkan padding untuk meneyeragamkan dimensi input
-  test_pad = pad_sequences(test_seq, max_length, padding='post')
+  return pad_sequences(sequences, max_length, padding='post')
 
+@timed_inference('sentiment')
+def predict_proba(texts, batch_size=default_batch_size, preprocessed=False):
+  """Class probabilities with shape (len(texts), 3), ordered like mapped_class."""
+  encoded = encode_texts(texts, preprocessed)
+  if len(encoded) == 0:
+    return np.zeros((0, len(mapped_class)), dtype=np.float32)
+
+  # Satu panggilan model per batch, bukan per review
+  outputs = []
+  for start in range(0, len(encoded), batch_size):
+    outputs.append(np.asarray(model.predict_on_batch(encoded[start:start + batch_size])))
+  return np.concatenate(outputs)
+
+def predict_sentiment(text):
   # Prediksi sentiment
-  prediction = model.predict(test_pad)
+  prediction = predict_proba([text])
   predicted_index = np.argmax(prediction, axis=1)[0]
-  # Label dari sentimen
-  mapped_class = ['negative', 'neutral', 'positive']
   # Memperoleh label sentimen
   predicted_class = mapped_class[predicted_index]
 
   return predicted_class
 
-def predict_batch_sentiment(corpus, texts):
+def predict_batch_sentiment(texts, batch_size=default_batch_size, preprocessed=False):
+  """
+  Batched prediction for a list of texts.
+
+  Returns per-review labels and probabilities plus the aggregate counts
+  per label ({'negative': n, 'neutral': n, 'positive': n}). Pass
+  preprocessed=True when texts already went through preprocess_text.
+  """
+  probabilities = predict_proba(list(texts), batch_size, preprocessed)
+  labels = [mapped_class[index] for index in np.argmax(probabilities, axis=1)]
+
   sentiment = {
     'negative': 0,
     'neutral': 0,
     'positive': 0
   }
-  for text in texts:
-    predicted_label = predict_sentiment(corpus, text)
-    sentiment[predicted_label] += 1
-  return sentiment
+  for label in labels:
+    sentiment[label] += 1
 
-predict_sentiment('bagus', 'recommended muas bagus kokoh')
+  return {
+    'counts': sentiment,
+    'labels': labels,
+    'probabilities': probabilities
+  }
@@ -1,15 +1,18 @@
 import os
-import re
 import pandas as pd
 import numpy as np
-import string
-from nltk.corpus import stopwords
+import json
+import logging
+import threading
+from collections import OrderedDict
 from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
+from Sastrawi.Stemmer.Stemmer import Stemmer
+from Sastrawi.Dictionary.ArrayDictionary import ArrayDictionary
 from sklearn.utils import resample
 import yaml
-import requests
+from text_processing.normalize import TextNormalizer
+
+log = logging.getLogger(__name__)
 
 # Load config.yaml
 def load_config(path='config.yaml'):
@@ -77,8 +80,17 @@ def balance_df(df):
 
     return df_balanced
 
+# Konfigurasi input model sentimen
+max_length = 100
+vocab_size = 6000
+default_batch_size = int(os.getenv('SENTIMENT_BATCH_SIZE', 256))
+tokenizer_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tokenizer.json')
+
+# TensorFlow diimport di dalam fungsi agar worker praproses ETL tidak ikut memuatnya
 def data_prep(corpus, vocab_size, max_length):
-    
+    from tensorflow.keras.preprocessing.text import Tokenizer
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+
     tokenizer = Tokenizer(num_words=vocab_size, oov_token="<OOV>")
     tokenizer.fit_on_texts(corpus)
 
@@ -87,299 +99,142 @@ def data_prep(corpus, vocab_size, max_length):
 
     return padded_sequences, tokenizer
 
-def preprocess_text(text):
-    if pd.isna(text) or not isinstance(text, str) or text.strip() == "":
-        return ""
-
-    text_clean = cleaningText(text)
-    text_casefolded = casefoldingText(text_clean)
-    text_stemmed = stemmingText(text_casefolded)
-    text_slang_fixed = fix_slangwords(text_stemmed)
-    text_tokenized = tokenizingText(text_slang_fixed)
-    text_filtered = filteringText(text_tokenized)
-    text_final = toSentence(text_filtered)
-
-    return text_final
-
-#####################################################################################
-def cleaningText(text):
-    text = re.sub(r'@[A-Za-z0-9]+', '', text) # menghapus mention
-    text = re.sub(r'#[A-Za-z0-9]+', '', text) # menghapus hashtag
-    text = re.sub(r'RT[\s]', '', text) # menghapus RT
-    text = re.sub(r"http\S+", '', text) # menghapus link
-    text = re.sub(r'[0-9]+', '', text) # menghapus angka
-    text = re.sub(r'[^\w\s]', '', text) # menghapus karakter selain huruf dan angka
- 
-    text = text.replace('\n', ' ') # mengganti baris baru dengan spasi
-    text = text.translate(str.maketrans('', '', string.punctuation)) # menghapus semua tanda baca
-    text = text.strip(' ') # menghapus karakter spasi dari kiri dan kanan teks
-
-    # remove emojis
-    emoji_pattern = re.compile(
-        "["                               
-        u"\U0001F600-\U0001F64F"
-        u"\U0001F300-\U0001F5FF"
-        u"\U0001F680-\U0001F6FF"
-        u"\U0001F1E0-\U0001F1FF"
-        u"\U00002700-\U000027BF"
-        u"\U000024C2-\U0001F251"
-        "]+", flags=re.UNICODE)
-    
-    text = emoji_pattern.sub(r'', text)
-    
-    return text
- 
-def casefoldingText(text): # Mengubah semua karakter dalam teks menjadi huruf kecil
-    text = text.lower()
-    return text
- 
-# def tokenizingText(text): # Memecah atau membagi string, teks menjadi daftar token
-#     text = word_tokenize(text)
-#     return text
- 
-def tokenizingText(text):
-    if pd.isna(text):
-        return []
-    return text.split()
-
-def filteringText(text): # Menghapus stopwords dalam teks
-    listStopwords = set(stopwords.words('indonesian'))
-    listStopwords1 = set(stopwords.words('english'))
-    listStopwords.update(listStopwords)
-    # listStopwords.update(listStopwords1)
-    listStopwords.update(['iya','yaa','nya','na','sih','ku',"di","ya","loh","kah","woi","woii","woy", "nih", "trus", "tuh",\
-                          "yah", "ajah", "lagi", "lah", "aj", "aja", "jg", "juga", "jga", "jugaa", "yng", 'apa', "cuman", "deh",\
-                            "min", "gak", "cuma",\
-                            "si", "an", "dikit", "langsung"])
-    filtered = []
-    for txt in text:
-        if txt not in listStopwords:
-            filtered.append(txt)
-    text = filtered
-    return text
- 
-factory = StemmerFactory()
-stemmer = factory.create_stemmer()
-
-def stemmingText(text):
-    words = text.split()
-    stemmed_words = [stemmer.stem(word) for word in words]
-    stemmed_text = ' '.join(stemmed_words)
-    return stemmed_text
- 
-def toSentence(list_words): # Mengubah daftar kata menjadi kalimat
-    sentence = ' '.join(word for word in list_words)
-    return sentence
-
-# Download slang dictionary from a public dataset (if available)
-url = "https://raw.githubusercontent.com/louisowen6/NLP_bahasa_resources/refs/heads/master/combined_slang_words.txt"
-slang_dict = requests.get(url).json()
-
-slang_dict['aku'] = 'saya'
-slang_dict['ak'] = 'saya'
-slang_dict['gua'] = 'saya'
-slang_dict['gw'] = 'saya'
-
-slang_dict['jlk'] = 'jelek'
-slang_dict['jlek'] = 'jelek'
-slang_dict['burik'] = 'jelek'
-slang_dict['buriq'] = 'jelek'
-slang_dict['ampas'] = 'jelek'
-slang_dict['amps'] = 'jelek'
-slang_dict['buruk'] = 'jelek'
-slang_dict['kentang'] = 'jelek'
-slang_dict['bobrok'] = 'jelek'
-
-slang_dict['bgs'] = 'bagus'
-slang_dict['wokeh'] = 'bagus'
-slang_dict['bgus'] = 'bagus'
-slang_dict['baguss'] = 'bagus'
-
-slang_dict['trnyata'] = 'ternyata'
-
-slang_dict['amann'] = 'aman'
-
-slang_dict['syukaa'] = 'suka'
-
-slang_dict['bgt'] = 'banget'
-slang_dict['bgtt'] = 'banget'
-
-slang_dict['kren'] = 'keren'
-
-slang_dict['udh'] = 'udah'
-
-slang_dict['kasi'] = 'kasih'
-slang_dict['ksi'] = 'kasih'
-slang_dict['ksih'] = 'kasih'
-
-slang_dict['gk'] = 'gak'
-slang_dict['ga'] = 'gak'
-slang_dict['gaa'] = 'gak'
-slang_dict['kagak'] = 'gak'
-slang_dict['kgk'] = 'gak'
-slang_dict['g'] = 'gak'
-slang_dict['engga'] = 'gak'
-slang_dict['tdk'] = 'gak'
-slang_dict['nggk'] = 'gak'
-slang_dict['no'] = 'gak'
-
-slang_dict['jls'] = 'jelas'
-slang_dict['jlas'] = 'jelas'
-slang_dict['danta'] = 'jelas'
-
-slang_dict['mntp'] = 'mantap'
-slang_dict['mantul'] = 'mantap'
-slang_dict['mntap'] = 'mantap'
-
-slang_dict['lg'] = 'lagi'
-slang_dict['lgi'] = 'lagi'
-
-slang_dict['uk'] = 'ukuran'
-
-slang_dict['ksel'] = 'kesal'
-slang_dict['kesel'] = 'kesal'
-slang_dict['sebel'] = 'kesal'
-slang_dict['sebal'] = 'kesal'
-
-slang_dict['bacod'] = 'bacot'
-slang_dict['bct'] = 'bacot'
-slang_dict['bcd'] = 'bacot'
-
-slang_dict['goblog'] = 'goblok'
-slang_dict['gblg'] = 'goblok'
-slang_dict['gblk'] = 'goblok'
-slang_dict['bego'] = 'goblok'
-slang_dict['bgo'] = 'goblok'
-slang_dict['tolol'] = 'goblok'
-slang_dict['tlol'] = 'goblok'
-slang_dict['idiot'] = 'goblok'
-
-slang_dict['trun'] = 'turun'
-
-slang_dict['brg'] = 'barang'
-slang_dict['brang'] = 'barang'
-slang_dict['barng'] = 'barang'
-
-slang_dict['cm'] = 'cuma'
-slang_dict['cma'] = 'cuma'
-slang_dict['cman'] = 'cuma'
-slang_dict['cmn'] = 'cuma'
-
-slang_dict['yt'] = 'youtube'
-
-slang_dict['wrnaa'] = 'warna'
-
-slang_dict['ajg'] = 'anjing'
-slang_dict['anj'] = 'anjing'
-slang_dict['anjg'] = 'anjing'
-slang_dict['anjir'] = 'anjing'
-slang_dict['anjr'] = 'anjing'
+def save_tokenizer(tokenizer, path=tokenizer_path):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(tokenizer.to_json())
 
-slang_dict['leg'] = 'lambat'
-slang_dict['ngeleg'] = 'lambat'
-slang_dict['lemod'] = 'lambat'
-slang_dict['lemot'] = 'lambat'
+def load_tokenizer(path=tokenizer_path):
+    from tensorflow.keras.preprocessing.text import tokenizer_from_json
 
-slang_dict['happy'] = 'senang'
+    with open(path, 'r', encoding='utf-8') as file:
+        return tokenizer_from_json(file.read())
 
-slang_dict['satset'] = 'cepat'
-slang_dict['cpt'] = 'cepat'
-
-slang_dict['pass'] = 'pas'
-
-slang_dict['sbg'] = 'sebagai'
-
-slang_dict['wr'] = 'win rate'
-slang_dict['winrate'] = 'win rate'
-slang_dict['ws'] = 'win streak'
-slang_dict['winstreak'] = 'win streak'
-
-slang_dict['ori'] = 'asli'
-slang_dict['original'] = 'asli'
-
-slang_dict['kw'] = 'palsu'
-slang_dict['fake'] = 'palsu'
-
-slang_dict['ok'] = 'oke'
-slang_dict['okey'] = 'oke'
-slang_dict['okay'] = 'oke'
-
-slang_dict['hps'] = 'hapus'
-slang_dict['hpus'] = 'hapus'
-slang_dict['uninstal'] = 'hapus'
-slang_dict['uninstall'] = 'hapus'
-
-slang_dict['dikirim'] = 'pengiriman'
-
-# Bi-gram
-# Common
-slang_dict['cepat selesai'] = 'cepat'
-
-slang_dict['gak palsu'] = 'asli'
-slang_dict['gak asli'] = 'palsu'
-slang_dict['gak jelas'] = 'aneh'
-slang_dict['gaje'] = 'aneh'
-
-slang_dict['suka banget'] = 'cinta'
-
-slang_dict['tebel'] = 'tebal'
-
-slang_dict['gak suka'] = 'jelek'
-slang_dict['gak enak'] = 'jelek'
-slang_dict['gak bagus'] = 'jelek'
-
-slang_dict['murah banget'] = 'murah_banget'
-
-slang_dict['mahal banget'] = 'mahal_banget'
-
-slang_dict['cepet banget'] = 'cepet_banget'
-
-slang_dict['lama banget'] = 'lambat_banget'
-slang_dict['lambat banget'] = 'lambat_banget'
-
-slang_dict['bagus banget'] = 'bagus_banget'
-
-slang_dict['jelek banget'] = 'jelek_banget'
-slang_dict['sangat jelek'] = 'jelek_banget'
-
-slang_dict['pelayanan buruk'] = 'buruk'
-
-slang_dict['sangat puas'] = 'sangat_puas'
-
-slang_dict['gak puas'] = 'kecewa'
-
-# Purchase & Delivery
-slang_dict['barang datang'] = "datang"
-slang_dict['barang telat'] = "lambat"
-slang_dict['barang cepat'] = "cepat"
-slang_dict['barang rusak'] = "rusak"
-slang_dict['barang oke'] = "bagus"
-slang_dict['tebal banget'] = "bagus"
-slang_dict['barang bagus'] = "bagus"
-slang_dict['barang jelek'] = "jelek"
-slang_dict['pengiriman cepat'] = "cepat"
-slang_dict['pengiriman lambat'] = "lambat"
-slang_dict['pengiriman aman'] = "aman"
-slang_dict['pengiriman oke'] = "bagus"
+def preprocess_text(text):
+    return review_normalizer.normalize(text)
+
+def preprocess_many(texts):
+    return review_normalizer.normalize_many(texts)
+
+def preprocess_batch(texts):
+    # Dipanggil oleh worker ETL (multiprocessing), jadi harus bisa di-import
+    return preprocess_many(texts)
+
+def init_stem_tracking():
+    # Initializer worker ETL: catat stem baru agar bisa dikirim ke proses utama
+    stem_cache.track_new()
+
+def preprocess_batch_with_stems(texts):
+    """Worker variant of preprocess_batch that also returns the words it stemmed for the first time"""
+    return preprocess_batch(texts), stem_cache.drain_new()
+
+class StemCache:
+    """
+    Bounded word -> stem LRU cache in front of the Sastrawi stemmer.
+
+    Review vocabulary repeats a lot ("bagus", "barang", "sesuai"), so most
+    words are stemmed once per process. Counters are exposed through
+    stats(); save()/load() persist the cache so later runs warm-start.
+    With track_new() enabled, newly stemmed words are also collected so a
+    worker process can hand them back to the parent via drain_new().
+    """
+
+    def __init__(self, stem, max_size=100000):
+        self._stem = stem
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._new = None
+
+    def __len__(self):
+        return len(self._cache)
+
+    def stem(self, word):
+        with self._lock:
+            stemmed = self._cache.get(word)
+            if stemmed is not None:
+                self._cache.move_to_end(word)
+                self.hits += 1
+                return stemmed
+            self.misses += 1
+
+        stemmed = self._stem(word)
+        with self._lock:
+            self._cache[word] = stemmed
+            if self._new is not None:
+                self._new[word] = stemmed
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return stemmed
+
+    def track_new(self):
+        with self._lock:
+            if self._new is None:
+                self._new = {}
+
+    def drain_new(self):
+        """Words stemmed since the last drain (empty unless track_new() was called)"""
+        with self._lock:
+            entries = self._new or {}
+            if self._new is not None:
+                self._new = {}
+        return entries
+
+    def update(self, entries):
+        with self._lock:
+            for word, stemmed in entries.items():
+                self._cache[word] = stemmed
+                self._cache.move_to_end(word)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._cache),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def save(self, path):
+        with self._lock:
+            entries = dict(self._cache)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(entries, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            entries = json.load(file)
+        self.update(entries)
+        return len(entries)
 
-def fix_slangwords(text):
-    words = text.lower().split()
-    
-    # Step 1: Fix unigrams
-    fixed_unigrams = [slang_dict.get(word, word) for word in words]
-    
-    # Step 2: Check for fixed bigrams
-    i = 0
-    final_words = []
-    while i < len(fixed_unigrams):
-        if i + 1 < len(fixed_unigrams):
-            bigram = f"{fixed_unigrams[i]} {fixed_unigrams[i+1]}"
-            if bigram in slang_dict:
-                final_words.append(slang_dict[bigram])
-                i += 2
-                continue
-        
-        final_words.append(fixed_unigrams[i])
-        i += 1
-
-    return ' '.join(final_words)
\ No newline at end of file
+factory = StemmerFactory()
+# Stemmer tanpa ArrayCache bawaan Sastrawi (tidak terbatas); cache ditangani StemCache
+stemmer = Stemmer(ArrayDictionary(factory.get_words()))
+stem_cache = StemCache(stemmer.stem, int(os.getenv('STEM_CACHE_SIZE', 100000)))
+# Jika diisi, cache dimuat dari file ini saat import dan bisa disimpan kembali dengan save_stem_cache()
+stem_cache_path = os.getenv('STEM_CACHE_PATH')
+
+if stem_cache_path and os.path.exists(stem_cache_path):
+    try:
+        stem_cache.load(stem_cache_path)
+    except (OSError, ValueError) as e:
+        log.warning('could not warm-start stem cache', extra={'path': stem_cache_path, 'error': str(e)})
+
+# Pipeline praproses review: clean -> stem -> slang -> stopword (lihat text_processing.normalize)
+review_normalizer = TextNormalizer(stem=stem_cache.stem)
+
+def save_stem_cache(path=None):
+    path = path or stem_cache_path
+    if path:
+        stem_cache.save(path)
+    return path
@@ -0,0 +1,573 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import functools
+import threading
+import multiprocessing
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv()
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from db import async_util as adb
+from db.cache import cache_stats
+from db.util import (
+    PRODUCT_PAGE_SIZE, REVIEW_PAGE_SIZE, SENTIMENT_BUCKETS,
+    streamAllProducts, streamAllReviews, streamReviewsByCategory
+)
+from controller.params import (
+    MAX_SUMMARY_BATCH, parse_page_args, parse_stream_mode, parse_date_window, parse_fuzzy
+)
+from controller.stream import ndjson_stream, json_array_stream
+from controller.fetch import recommender, summarizer, getProductsByName
+from controller.lazy import start_background_warmup
+from monitoring.memory import memory_monitor, rss_mb
+from monitoring.logs import configure_logging, log_request
+from monitoring.metrics import REQUEST_SECONDS, CONTENT_TYPE, render_metrics
+
+configure_logging()
+log = logging.getLogger(__name__)
+
+# Proses untuk pekerjaan CPU (LexRank, rekomendasi); 0 = thread di proses server
+ASGI_CPU_WORKERS = int(os.getenv('ASGI_CPU_WORKERS', '2'))
+# Pekerjaan CPU yang boleh berjalan + antre sekaligus; sisanya menunggu paling lama ASGI_CPU_WAIT_SECONDS
+ASGI_CPU_SLOTS = int(os.getenv('ASGI_CPU_SLOTS', str(max(1, ASGI_CPU_WORKERS) * 2)))
+ASGI_CPU_WAIT_SECONDS = float(os.getenv('ASGI_CPU_WAIT_SECONDS', '10'))
+# Thread untuk pemanggilan sync yang lama (rangkuman batch), terpisah dari threadpool Starlette
+ASGI_BLOCKING_THREADS = int(os.getenv('ASGI_BLOCKING_THREADS', '4'))
+
+_cpu_pool = None
+# Pool dibuat oleh warmup di latar atau oleh request pertama, mana yang lebih dulu
+_cpu_pool_lock = threading.Lock()
+_cpu_slots = None
+_cpu_stats = {'busy': 0, 'rejected': 0}
+_blocking_pool = ThreadPoolExecutor(ASGI_BLOCKING_THREADS, thread_name_prefix='asgi-blocking')
+
+
+class ServerBusy(Exception):
+    """No CPU slot freed up within ASGI_CPU_WAIT_SECONDS"""
+
+
+def get_cpu_pool():
+    global _cpu_pool
+    with _cpu_pool_lock:
+        if _cpu_pool is None and ASGI_CPU_WORKERS > 0:
+            _cpu_pool = _create_cpu_pool()
+    return _cpu_pool
+
+
+def _create_cpu_pool():
+    initializer = None
+    if recommender.available():
+        from recomm_system.index import preload_index
+        initializer = preload_index
+    # spawn seperti pool LexRank lain; index rekomendasi dimuat sekali per worker
+    return ProcessPoolExecutor(
+        max_workers=ASGI_CPU_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=initializer
+    )
+
+
+async def load_subsystem(subsystem):
+    """LazySubsystem.get() without blocking the event loop while the subsystem imports"""
+    if subsystem.loaded:
+        return subsystem.get()
+    return await run_in_threadpool(subsystem.get)
+
+
+@contextlib.asynccontextmanager
+async def cpu_slot():
+    try:
+        await asyncio.wait_for(_cpu_slots.acquire(), ASGI_CPU_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        _cpu_stats['rejected'] += 1
+        raise ServerBusy()
+    _cpu_stats['busy'] += 1
+    try:
+        yield
+    finally:
+        _cpu_stats['busy'] -= 1
+        _cpu_slots.release()
+
+
+async def run_cpu(function, *args, executor=None):
+    """
+    Run CPU-bound work off the event loop, in the process pool (or the
+    blocking thread pool with ASGI_CPU_WORKERS=0). At most ASGI_CPU_SLOTS
+    jobs hold a slot at once, so slow summaries queue here instead of
+    taking threads and connections from cheap catalogue requests.
+    """
+    async with cpu_slot():
+        if executor is None:
+            # Membuat pool dapat memuat sistem rekomendasi: jangan di event loop
+            executor = _cpu_pool or await run_in_threadpool(get_cpu_pool) or _blocking_pool
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(function, *args))
+
+
+def envelope(data, message, error=False, status=200, **extra):
+    return JSONResponse({'error': error, 'message': message, 'data': data, **extra}, status_code=status)
+
+
+def invalid_query_args(e):
+    return envelope([], str(e), error=True, status=400)
+
+
+def stream_response(rows, mode, message):
+    """Starlette version of controller.stream.stream_response (the sync generator runs in the threadpool)"""
+    if mode == 'ndjson':
+        return StreamingResponse(ndjson_stream(rows), media_type='application/x-ndjson')
+    return StreamingResponse(json_array_stream(rows, message), media_type='application/json')
+
+
+def product_param(request):
+    """(productId, None) or (None, error response) for the `product` query parameter"""
+    productId = request.query_params.get('product')
+    if not productId:
+        return None, invalid_query_args('Product parameter is required')
+    try:
+        return int(productId), None
+    except ValueError:
+        return None, invalid_query_args('Product parameter must be a valid number')
+
+
+def category_param(request):
+    categoryId = request.query_params.get('category')
+    if not categoryId:
+        return None, invalid_query_args('Category parameter is required')
+    try:
+        return int(categoryId), None
+    except ValueError:
+        return None, invalid_query_args('Category parameter must be a valid number')
+
+
+async def hello(request):
+    return envelope({
+        'status': 'healthy',
+        'version': '1.0.0',
+        'endpoints': [
+            '/getAllProduct',
+            '/getAllCategory',
+            '/getAllReview',
+            '/getRecommendProducts',
+            '/getReviewsSumOfProduct',
+            '/getReviewsSumOfProducts'
+        ]
+    }, 'YAPin API is running!')
+
+
+async def fetchAllProduct(request):
+    try:
+        after_id, limit = parse_page_args(request.query_params)
+        stream = parse_stream_mode(request.query_params)
+    except ValueError as e:
+        return invalid_query_args(e)
+    if stream:
+        return stream_response(streamAllProducts(after_id), stream, 'Data fetched successfully')
+    try:
+        result, next_cursor = await adb.getProductPage(after_id, limit or PRODUCT_PAGE_SIZE)
+        return envelope(result, 'Data fetched successfully', next_cursor=next_cursor)
+    except Exception:
+        log.exception('getProductPage failed')
+        return envelope(None, 'Error fetching data', error=True, status=500)
+
+
+async def fetchAllCategory(request):
+    try:
+        return envelope(await adb.getAllCategory(), 'Categories fetched successfully')
+    except Exception:
+        log.exception('getAllCategory failed')
+        return envelope(None, 'Error fetching categories', error=True, status=500)
+
+
+async def fetchAllReview(request):
+    try:
+        after_id, limit = parse_page_args(request.query_params)
+        stream = parse_stream_mode(request.query_params)
+    except ValueError as e:
+        return invalid_query_args(e)
+    if stream:
+        return stream_response(streamAllReviews(after_id), stream, 'Reviews fetched successfully')
+    try:
+        result, next_cursor = await adb.getReviewPage(after_id, limit or REVIEW_PAGE_SIZE)
+        return envelope(result, 'Reviews fetched successfully', next_cursor=next_cursor)
+    except Exception:
+        log.exception('getReviewPage failed')
+        return envelope(None, 'Error fetching reviews', error=True, status=500)
+
+
+async def fetchAllProductsByCategory(request):
+    categoryId, error = category_param(request)
+    if error:
+        return error
+    try:
+        result = await adb.getProductsByCategory(categoryId)
+        return envelope(result or [], 'Products by category fetched successfully')
+    except Exception as e:
+        return envelope([], f'Error fetching products by category: {str(e)}', error=True, status=500)
+
+
+async def fetchAllReviewsByProduct(request):
+    productId, error = product_param(request)
+    if error:
+        return error
+    try:
+        result = await adb.getReviewsByProduct(productId)
+        return envelope(result or [], 'Reviews by product fetched successfully')
+    except Exception as e:
+        return envelope([], f'Error fetching reviews by product: {str(e)}', error=True, status=500)
+
+
+async def fetchAllReviewsByCategory(request):
+    categoryId, error = category_param(request)
+    if error:
+        return error
+    try:
+        stream = parse_stream_mode(request.query_params)
+    except ValueError as e:
+        return invalid_query_args(e)
+    if stream:
+        return stream_response(streamReviewsByCategory(categoryId), stream, 'Reviews by category fetched successfully')
+    try:
+        result = await adb.getReviewsByCategory(categoryId)
+        return envelope(result or [], 'Reviews by category fetched successfully')
+    except Exception as e:
+        return envelope([], f'Error fetching reviews by category: {str(e)}', error=True, status=500)
+
+
+async def fetchSentimentReviewsByProduct(request):
+    productId, error = product_param(request)
+    if error:
+        return error
+    try:
+        start, end = parse_date_window(request.query_params)
+    except ValueError as e:
+        return invalid_query_args(e)
+    try:
+        if start is not None or end is not None:
+            result = await adb.getSentimentInWindow(productId, start, end)
+        else:
+            result = await adb.getSentimentByProduct(productId)
+        return envelope(result or [], 'Sentiment analysis fetched successfully')
+    except Exception as e:
+        return envelope([], f'Error fetching sentiment analysis: {str(e)}', error=True, status=500)
+
+
+async def fetchSentimentTimeline(request):
+    productId, error = product_param(request)
+    if error:
+        return invalid_query_args('Product parameter is required and must be a valid number')
+    bucket = request.query_params.get('bucket', 'day')
+    if bucket not in SENTIMENT_BUCKETS:
+        return invalid_query_args(f"bucket must be one of: {', '.join(SENTIMENT_BUCKETS)}")
+    try:
+        start, end = parse_date_window(request.query_params)
+    except ValueError as e:
+        return invalid_query_args(e)
+    try:
+        result = await adb.getSentimentTimeline(productId, start, end, bucket)
+        return envelope(result, 'Sentiment timeline fetched successfully')
+    except Exception as e:
+        return envelope([], f'Error fetching sentiment timeline: {str(e)}', error=True, status=500)
+
+
+async def fetchSentimentByRating(request):
+    productId, error = product_param(request)
+    if error:
+        return invalid_query_args('Product parameter is required and must be a valid number')
+    try:
+        result = await adb.getSentimentByRating(productId)
+        return envelope(result, 'Sentiment by rating fetched successfully')
+    except Exception as e:
+        return envelope([], f'Error fetching sentiment by rating: {str(e)}', error=True, status=500)
+
+
+async def fetchAllProductsByName(request):
+    name = request.query_params.get('name')
+    if not name:
+        return invalid_query_args('Name parameter is required')
+    if len(name.strip()) < 2:
+        return invalid_query_args('Name parameter must be at least 2 characters')
+    try:
+        fuzzy = parse_fuzzy(request.query_params)
+    except ValueError as e:
+        return invalid_query_args(e)
+    # Index pencarian di memori (atau LIKE sebagai fallback), cepat tetapi sync
+    response_data = await run_in_threadpool(getProductsByName, name, fuzzy)
+    return JSONResponse(response_data, status_code=500 if response_data.get('error') else 200)
+
+
+async def _fallback_products(productId, limit):
+    products, _ = await adb.getProductPage(None, limit)
+    return [product for product in products if product.get('id') != productId][:5]
+
+
+async def fetchRecommendProductsByName(request):
+    productId = request.query_params.get('product')
+    if not productId:
+        return envelope([], 'Product ID is required', error=True, status=400)
+    try:
+        productId = int(productId)
+    except ValueError:
+        return envelope([], 'Invalid product ID format', error=True, status=400)
+
+    recomend = await load_subsystem(recommender)
+    if recomend is None:
+        try:
+            fallback = await _fallback_products(None, 5)
+            if fallback:
+                return envelope(fallback, 'Fallback recommendations (recommendation system unavailable)')
+            return envelope([], 'No products available for recommendations')
+        except Exception:
+            log.exception('fallback recommendations failed')
+            return envelope([], 'Recommendation system unavailable and fallback failed', error=True, status=500)
+
+    try:
+        result = await run_cpu(recomend, productId)
+    except ServerBusy:
+        raise
+    except Exception as e:
+        log.exception('recommendation system error', extra={'product': productId})
+        try:
+            fallback = await _fallback_products(productId, 6)
+            if fallback:
+                return envelope(fallback, f'Fallback recommendations (error: {str(e)})')
+            return envelope([], 'No recommendations available')
+        except Exception as fallback_error:
+            log.error('fallback recommendations failed', extra={'error': str(fallback_error)})
+            return envelope([], f'Recommendation failed: {str(e)}', error=True, status=500)
+
+    if result is None:
+        return envelope([], 'Product not found in recommendation index', error=True, status=404)
+    if not result:
+        return envelope([], 'No recommendations found for this product')
+    return envelope(result, 'Product recommendations fetched successfully')
+
+
+def _summary(productId, summary, message='Review summary generated successfully', error=False, status=200):
+    return envelope({'productId': str(productId), 'summary': summary}, message, error=error, status=status)
+
+
+def _fallback_summary(texts):
+    combined = " ".join(texts[:5])
+    return combined[:200] + "..." if len(combined) > 200 else combined
+
+
+async def fetchReviewsSumOfProduct(request):
+    productId = request.query_params.get('product')
+    if not productId:
+        return envelope(None, 'Product ID is required', error=True, status=400)
+    try:
+        productId = int(productId)
+    except ValueError:
+        return envelope(None, 'Invalid product ID format', error=True, status=400)
+
+    store = await load_subsystem(summarizer)
+    try:
+        fingerprint = await adb.getReviewFingerprint(productId)
+        if store is not None and fingerprint[0] > 0:
+            # Review tidak berubah sejak rangkuman terakhir: tidak perlu LexRank lagi
+            try:
+                stored = await adb.getStoredSummary(productId)
+            except Exception as e:
+                log.warning('stored summary lookup failed', extra={'product': productId, 'error': str(e)})
+                stored = None
+            if stored is not None and stored['fingerprint'] == fingerprint:
+                return _summary(productId, stored['summary'])
+        rows = await adb.getReviewsByProduct.uncached(productId) if fingerprint[0] > 0 else []
+    except Exception as e:
+        log.exception('could not read reviews for summary', extra={'product': productId})
+        return _summary(productId, 'Gagal mengambil data review.', f'Error fetching reviews: {str(e)}', True, 500)
+
+    if not rows:
+        return _summary(productId, 'Belum ada review tersedia untuk produk ini.', 'No reviews found for this product')
+    if store is not None:
+        texts = store.review_texts(rows)
+    else:
+        texts = [str(row['review']).strip() for row in rows if len(str(row.get('review', '')).strip()) > 5]
+    if not texts:
+        return _summary(productId, 'Review tersedia tetapi konten tidak dapat diproses.', 'No valid review content found')
+    if store is None:
+        return _summary(productId, _fallback_summary(texts))
+
+    try:
+        summary = await run_cpu(store.summarize_texts, texts)
+    except ServerBusy:
+        raise
+    except Exception:
+        log.exception('summary generation failed, using fallback', extra={'product': productId})
+        return _summary(productId, _fallback_summary(texts[:3]))
+    try:
+        await adb.saveSummary(productId, fingerprint, summary)
+    except Exception as e:
+        log.warning('could not store summary', extra={'product': productId, 'error': str(e)})
+    return _summary(productId, summary)
+
+
+async def fetchReviewsSumOfProducts(request):
+    # ?products=1,2,3
+    productIds = [value.strip() for value in request.query_params.get('products', '').split(',') if value.strip()]
+    if not productIds:
+        return invalid_query_args('At least one product ID is required')
+    if len(productIds) > MAX_SUMMARY_BATCH:
+        return invalid_query_args(f'At most {MAX_SUMMARY_BATCH} product IDs per request')
+    try:
+        productIds = [int(productId) for productId in productIds]
+    except ValueError:
+        return invalid_query_args('Invalid product ID format')
+    store = await load_subsystem(summarizer)
+    if store is None:
+        return envelope([], 'Review summarization is not available', error=True, status=503)
+
+    # Query sync di thread terpisah, LexRank di pool CPU; memakai satu slot CPU selama berjalan
+    pool = await run_in_threadpool(get_cpu_pool)
+    summaries = await run_cpu(store.summarize_products, productIds, pool, executor=_blocking_pool)
+    data = [{
+        'productId': str(productId),
+        'summary': summaries.get(productId) or 'Belum ada review tersedia untuk produk ini.'
+    } for productId in dict.fromkeys(productIds)]
+    return envelope(data, 'Review summaries generated successfully')
+
+
+async def health_check(request):
+    return envelope({
+        'status': 'ok',
+        'memory_usage': f"{rss_mb():.1f} MB",
+        'memory': memory_monitor.stats(),
+        'cache': cache_stats(),
+        'db_pool': adb.async_pool_stats(),
+        'cpu': {'workers': ASGI_CPU_WORKERS, 'slots': ASGI_CPU_SLOTS, **_cpu_stats},
+        'subsystems': {
+            'recommendation': recommender.status(),
+            'summarization': summarizer.status()
+        }
+    }, 'Backend is healthy')
+
+
+async def metrics(request):
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+
+async def server_busy(request, exc):
+    return envelope([], 'Server is busy, try again later', error=True, status=503)
+
+
+async def handle_exception(request, exc):
+    log.error('unhandled exception', exc_info=exc)
+    return envelope(None, f'Internal server error: {str(exc)}', error=True, status=500)
+
+
+def prepare():
+    """review_summary table, as main.create_app()"""
+    try:
+        from db.schema import ensure_tables
+        ensure_tables('review_summary')
+    except Exception as e:
+        log.warning('review summary store not ready, summaries will be computed per request', extra={'error': str(e)})
+
+
+def load_search_index():
+    from product_search.index import refresh_search_index
+    refresh_search_index()
+
+
+# Dimuat di latar setelah startup; index rekomendasi sendiri dimuat di worker CPU (preload_index)
+WARMUP_TASKS = [
+    ('product search index', load_search_index),
+    ('recommendation system', recommender.get),
+    ('review summarization', summarizer.get),
+    ('CPU worker pool', get_cpu_pool),
+]
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    global _cpu_slots, _cpu_pool
+    _cpu_slots = asyncio.Semaphore(ASGI_CPU_SLOTS)
+    memory_monitor.start()
+    await run_in_threadpool(prepare)
+    start_background_warmup(WARMUP_TASKS)
+    yield
+    await adb.close_async_pool()
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
+
+
+routes = [
+    Route('/', hello),
+    Route('/getAllProduct', fetchAllProduct),
+    Route('/getAllCategory', fetchAllCategory),
+    Route('/getAllReview', fetchAllReview),
+    Route('/getAllProductByCategory', fetchAllProductsByCategory),
+    Route('/getAllReviewByProduct', fetchAllReviewsByProduct),
+    Route('/getAllReviewByCategory', fetchAllReviewsByCategory),
+    Route('/getSentimentByProduct', fetchSentimentReviewsByProduct),
+    Route('/getSentimentTimeline', fetchSentimentTimeline),
+    Route('/getSentimentByRating', fetchSentimentByRating),
+    Route('/getAllProductsByName', fetchAllProductsByName),
+    Route('/getRecommendProducts', fetchRecommendProductsByName),
+    Route('/getReviewsSumOfProduct', fetchReviewsSumOfProduct),
+    Route('/getReviewsSumOfProducts', fetchReviewsSumOfProducts),
+    Route('/health', health_check),
+    Route('/metrics', metrics),
+]
+
+class RequestMetrics:
+    """Per-route latency histogram and access log, timed until the last body chunk is sent"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            # Router menulis route yang cocok ke scope; label memakai pola URL, bukan path
+            route = scope.get('route')
+            seconds = time.perf_counter() - started
+            REQUEST_SECONDS.observe(seconds, method=scope['method'], route=getattr(route, 'path', 'unmatched'), status=status)
+            log_request(scope['method'], scope['path'], status, seconds)
+
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(RequestMetrics),
+        Middleware(
+            CORSMiddleware,
+            allow_origins=['http://localhost:3000', 'http://127.0.0.1:3000'],
+            allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+            allow_headers=['Content-Type', 'Authorization']
+        ),
+    ],
+    exception_handlers={ServerBusy: server_busy, Exception: handle_exception},
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=int(os.getenv('ASGI_PORT', '5000')))
@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
+from scipy import sparse
+from sklearn.metrics.pairwise import cosine_similarity
+from recomm_system.neighbors import normalize_features, top_k, top_k_batch
+
+
+def synthetic_features(n_products, vocab_size=20000, terms_per_name=8, seed=42):
+  """TF-IDF-like sparse name features plus 4 scaled numeric columns, like prepare_data()."""
+  rng = np.random.default_rng(seed)
+  rows = np.repeat(np.arange(n_products), terms_per_name)
+  # Distribusi zipf supaya kata umum ("sepatu", "tas") sering muncul
+  cols = np.minimum(rng.zipf(1.3, size=n_products * terms_per_name) - 1, vocab_size - 1)
+  values = rng.random(n_products * terms_per_name).astype(np.float32)
+  names = sparse.csr_matrix((values, (rows, cols)), shape=(n_products, vocab_size))
+  numeric = sparse.csr_matrix(rng.random((n_products, 4)).astype(np.float32))
+  return sparse.hstack([names, numeric]).tocsr()
+
+
+def legacy_recommend(features, row, k):
+  """The pre-index recomend() path: full cosine matrix + Python sort."""
+  cos_sim = cosine_similarity(features)
+  similarities = list(enumerate(cos_sim[row]))
+  similar_products = sorted(similarities, key=lambda x: x[1], reverse=True)
+  return similar_products[:k + 1]
+
+
+def timed(fn, *args, **kwargs):
+  start = time.perf_counter()
+  result = fn(*args, **kwargs)
+  return time.perf_counter() - start, result
+
+
+def run(sizes, queries, batch_size, k, legacy_max):
+  print(f"{'products':>10} | {'legacy / query':>15} | {'top_k / query':>14} | {'batch / query':>14} | {'batch total':>12}")
+  print('-' * 78)
+  for n in sizes:
+    features = normalize_features(synthetic_features(n))
+    rng = np.random.default_rng(0)
+    query_rows = rng.integers(0, n, size=queries)
+    batch_rows = rng.integers(0, n, size=batch_size)
+
+    if n <= legacy_max:
+      legacy_time, _ = timed(legacy_recommend, features, int(query_rows[0]), k)
+      legacy = f"{legacy_time * 1000:12.1f} ms"
+    else:
+      legacy = f"{'skipped (N²)':>15}"
+
+    single_time = 0.0
+    for row in query_rows:
+      elapsed, _ = timed(top_k, features, int(row), k)
+      single_time += elapsed
+
+    batch_time, _ = timed(top_k_batch, features, batch_rows, k)
+
+    print(
+      f"{n:>10} | {legacy:>15} | {single_time / queries * 1000:11.2f} ms | "
+      f"{batch_time / batch_size * 1000:11.3f} ms | {batch_time * 1000:9.1f} ms"
+    )
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark recommendation neighbour search')
+  parser.add_argument('--sizes', default='1000,10000,100000', help='comma separated catalogue sizes')
+  parser.add_argument('--queries', type=int, default=50, help='single queries per size')
+  parser.add_argument('--batch-size', type=int, default=1000, help='product ids per batched call')
+  parser.add_argument('--k', type=int, default=5, help='neighbours per product')
+  parser.add_argument('--legacy-max', type=int, default=10000, help='largest size to run the full cosine matrix on')
+  args = parser.parse_args()
+
+  run([int(size) for size in args.sizes.split(',')], args.queries, args.batch_size, args.k, args.legacy_max)
@@ -0,0 +1,92 @@
+import sys
+import os
+import gc
+import time
+import argparse
+import threading
+import urllib.request
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flask import Flask, jsonify
+from monitoring.memory import MemoryMonitor, rss_mb
+
+
+def page_of_products(size=50):
+  return [{'id': i, 'name': f'Produk {i}', 'price': 10000 + i, 'rating': 4.5} for i in range(size)]
+
+
+def make_app(legacy):
+  """The same JSON route, with the old per-request RSS probe + gc.collect() hooks or the background monitor"""
+  app = Flask(f'bench_{"legacy" if legacy else "monitor"}')
+  if legacy:
+    @app.before_request
+    def before_request():
+      if rss_mb() > 500:
+        gc.collect()
+
+    @app.after_request
+    def after_request(response):
+      gc.collect()
+      return response
+  else:
+    MemoryMonitor(interval=5).start()
+
+  @app.route('/getAllProduct')
+  def products():
+    return jsonify({'error': False, 'message': 'Success', 'data': page_of_products()})
+  return app
+
+
+def load_test(request_once, requests, concurrency):
+  """Requests/second with `concurrency` threads sharing `requests` calls"""
+  per_thread = requests // concurrency
+
+  def worker():
+    for _ in range(per_thread):
+      request_once()
+
+  threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+  start = time.perf_counter()
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  return per_thread * concurrency / (time.perf_counter() - start)
+
+
+def client_request(app):
+  client = app.test_client()
+  return lambda: client.get('/getAllProduct')
+
+
+def url_request(url):
+  def request_once():
+    with urllib.request.urlopen(url, timeout=30) as response:
+      response.read()
+  return request_once
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Throughput with per-request GC hooks vs the background memory monitor')
+  parser.add_argument('--requests', type=int, default=2000)
+  parser.add_argument('--concurrency', type=int, default=8)
+  parser.add_argument('--heap-objects', type=int, default=2_000_000,
+                      help='live objects kept on the heap, like a server with the model and indexes loaded')
+  parser.add_argument('--url', help='load-test a running server instead (e.g. http://127.0.0.1:5000/getAllProduct)')
+  args = parser.parse_args()
+
+  if args.url:
+    rate = load_test(url_request(args.url), args.requests, args.concurrency)
+    print(f"{args.url}: {rate:.0f} req/s ({args.requests} requests, {args.concurrency} threads)")
+    sys.exit(0)
+
+  # Objek hidup membuat setiap gc.collect() penuh semakin mahal, seperti di server sungguhan
+  heap = [{'id': i} for i in range(args.heap_objects)]
+  print(f"heap: {args.heap_objects} live objects, RSS {rss_mb():.0f} MB")
+  print(f"{'hooks':>28} | {'req/s':>8}")
+  print('-' * 40)
+  results = {}
+  for legacy in (True, False):
+    name = 'per-request psutil + gc' if legacy else 'background monitor'
+    results[name] = load_test(client_request(make_app(legacy)), args.requests, args.concurrency)
+    print(f"{name:>28} | {results[name]:8.0f}")
+  print(f"speedup: {results['background monitor'] / results['per-request psutil + gc']:.1f}x")
@@ -0,0 +1,76 @@
+import sys
+import os
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from product_search.index import ProductSearchIndex
+
+# Kosakata nama produk Tokopedia (merek, jenis barang, varian)
+BRANDS = 'aerostreet adidas apple asus bitzen samsung xiaomi wardah erigo uniqlo eiger compass ventela'.split()
+ITEMS = (
+  'sepatu sandal sneakers kemeja kaos celana jaket tas dompet ikat pinggang iphone hp '
+  'lip liner serum toner masker vitamin hoodie rok blouse topi jam tangan'
+).split()
+VARIANTS = 'hitam putih navy army cherry natural pria wanita premium original murah 128gb 256gb 512gb 39 40 41 42 xl l m'.split()
+SYLLABLES = 'ka ra ma sa ta na la ba da pa ko ro mo so to no lo bo x z 1 2 3 5 7 9'.split()
+QUERIES = ['sepatu', 'sepatu hitam', 'aero', 'iphone 256gb', 'kemeja pria premium', 'jam tangan', 'ser', 'adidas sneakers 40']
+# Salah ketik yang tidak ditemukan oleh LIKE maupun pencarian exact/prefix
+FUZZY_QUERIES = ['sepatuu', 'kemja', 'snekers hitm', 'addidas', 'iphnoe 256gb', 'dompett pria', 'hodie', 'vitamn']
+
+
+def synthetic_products(n_products, seed=42):
+  rng = random.Random(seed)
+  products = []
+  for product_id in range(1, n_products + 1):
+    words = [rng.choice(BRANDS)] + rng.sample(ITEMS, 2) + rng.sample(VARIANTS, rng.randint(2, 6))
+    # Kode model/seri acak agar ukuran kosakata mendekati katalog asli
+    words.append(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    products.append({'id': product_id, 'name': ' '.join(words).title()})
+  return products
+
+
+def like_scan(names, query):
+  """Stand-in for WHERE LOWER(name) LIKE '%query%': a substring test on every row"""
+  term = query.lower()
+  return [i for i, name in enumerate(names) if term in name]
+
+
+def time_per_query(function, queries=QUERIES, repeat=20):
+  start = time.perf_counter()
+  for _ in range(repeat):
+    for query in queries:
+      function(query)
+  return (time.perf_counter() - start) * 1000 / (repeat * len(queries))
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark product name search')
+  parser.add_argument('--sizes', default='10000,100000', help='comma separated catalogue sizes')
+  parser.add_argument('--limit', type=int, default=50, help='results per query')
+  args = parser.parse_args()
+
+  print(f"{'products':>9} | {'build ms':>9} | {'add 1k ms':>9} | {'LIKE scan ms':>12} | {'index ms':>9} | {'fuzzy ms':>9} | {'fuzzy hits':>10}")
+  print('-' * 88)
+  for size in [int(value) for value in args.sizes.split(',')]:
+    products = synthetic_products(size + 1000)
+    names = [product['name'].lower() for product in products[:size]]
+
+    start = time.perf_counter()
+    index = ProductSearchIndex(products[:size])
+    index.search('warmup')
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    index.add(products[size:])
+    index.search('warmup')
+    add_ms = (time.perf_counter() - start) * 1000
+    index.remove(range(size + 1, size + 1001))
+
+    like_ms = time_per_query(lambda query: like_scan(names, query))
+    index_ms = time_per_query(lambda query: index.search(query, args.limit))
+    # Query pertama membangun index trigram kosakata
+    index.search(FUZZY_QUERIES[0], args.limit, fuzzy=True)
+    fuzzy_ms = time_per_query(lambda query: index.search(query, args.limit, fuzzy=True), FUZZY_QUERIES)
+    hits = sum(bool(index.search(query, args.limit, fuzzy=True)) for query in FUZZY_QUERIES)
+    print(f"{size:>9} | {build_ms:9.0f} | {add_ms:9.1f} | {like_ms:12.2f} | {index_ms:9.2f} | {fuzzy_ms:9.2f} | {hits:>4}/{len(FUZZY_QUERIES)}")
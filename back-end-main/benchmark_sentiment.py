@@ -0,0 +1,53 @@
+import sys
+import os
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
+from ai_model.predict import model, encode_texts, predict_proba
+
+# Kosakata contoh dari review Tokopedia
+WORDS = (
+  'barang sesuai pesanan bagus banget pengiriman cepat packing aman seller ramah '
+  'kualitas mantap harga murah recommended kecewa rusak lambat jelek original '
+  'terima kasih bahan tebal ukuran pas warna cantik respon'
+).split()
+
+
+def synthetic_reviews(n_reviews, seed=42):
+  rng = random.Random(seed)
+  return [' '.join(rng.choices(WORDS, k=rng.randint(3, 25))) for _ in range(n_reviews)]
+
+
+def per_review_throughput(reviews):
+  """Old predict_batch_sentiment(): one model.predict() per 1 x max_length tensor."""
+  encoded = encode_texts(reviews)
+  start = time.perf_counter()
+  for row in encoded:
+    model.predict(row[np.newaxis, :], verbose=0)
+  return len(reviews) / (time.perf_counter() - start)
+
+
+def batched_throughput(reviews, batch_size):
+  start = time.perf_counter()
+  predict_proba(reviews, batch_size)
+  return len(reviews) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark sentiment inference throughput')
+  parser.add_argument('--reviews', type=int, default=5000, help='number of synthetic reviews')
+  parser.add_argument('--per-review', type=int, default=300, help='reviews to time on the per-review path')
+  parser.add_argument('--batch-sizes', default='32,128,256,512,1024', help='comma separated batch sizes')
+  args = parser.parse_args()
+
+  reviews = synthetic_reviews(args.reviews)
+  # Pemanasan agar graph TensorFlow sudah terbentuk
+  predict_proba(reviews[:64], 64)
+
+  print(f"{'mode':>20} | {'reviews/s':>10}")
+  print('-' * 34)
+  print(f"{'per review':>20} | {per_review_throughput(reviews[:args.per_review]):10.1f}")
+  for batch_size in [int(size) for size in args.batch_sizes.split(',')]:
+    print(f"{f'batch {batch_size}':>20} | {batched_throughput(reviews, batch_size):10.1f}")
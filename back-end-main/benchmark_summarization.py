@@ -0,0 +1,71 @@
+import sys
+import os
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from review_summarization.lexrank import lexrank_scores
+from review_summarization.segment import summary_units
+
+# Potongan kalimat review Tokopedia yang sering berulang
+WORDS = (
+  'barang sesuai pesanan bagus banget pengiriman cepat packing aman seller ramah '
+  'kualitas mantap harga murah recommended kecewa rusak lambat jelek original '
+  'terima kasih bahan tebal ukuran pas warna cantik respon'
+).split()
+
+
+def synthetic_sentences(n_sentences, seed=42):
+  rng = random.Random(seed)
+  return [' '.join(rng.choices(WORDS, k=rng.randint(3, 15))) for _ in range(n_sentences)]
+
+
+def synthetic_reviews(n_reviews, distinct=300, seed=42):
+  """Reviews drawn from a small pool of phrasings, as on popular products"""
+  rng = random.Random(seed)
+  pool = [' '.join(rng.choices(WORDS, k=rng.randint(3, 10))).capitalize() for _ in range(distinct)]
+  return [rng.choice(pool) + rng.choice(['', '.', '!', '!!', ' kak']) for _ in range(n_reviews)]
+
+
+def networkx_scores(tfidf_matrix, threshold):
+  """The previous path: dense cosine matrix, networkx graph, pure-Python pagerank"""
+  import networkx as nx
+  graph = nx.from_numpy_array(cosine_similarity(tfidf_matrix) > threshold)
+  return nx.pagerank(graph, max_iter=100, tol=1e-4)
+
+
+def elapsed_ms(function):
+  start = time.perf_counter()
+  function()
+  return (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark LexRank scoring')
+  parser.add_argument('--sizes', default='50,500,2000,10000', help='comma separated sentence counts')
+  parser.add_argument('--reviews', type=int, default=5000, help='reviews for the deduplication run')
+  parser.add_argument('--networkx-max', type=int, default=2000, help='largest size to run networkx on')
+  args = parser.parse_args()
+
+  print(f"{'sentences':>9} | {'networkx ms':>11} | {'sparse ms':>9} | {'continuous ms':>13}")
+  print('-' * 52)
+  for size in [int(value) for value in args.sizes.split(',')]:
+    matrix = TfidfVectorizer(ngram_range=(1, 2), max_features=1000).fit_transform(synthetic_sentences(size))
+    legacy = f"{elapsed_ms(lambda: networkx_scores(matrix, 0.1)):11.1f}" if size <= args.networkx_max else f"{'-':>11}"
+    sparse_ms = elapsed_ms(lambda: lexrank_scores(matrix, 0.1))
+    continuous_ms = elapsed_ms(lambda: lexrank_scores(matrix, 0.1, continuous=True))
+    print(f"{size:>9} | {legacy} | {sparse_ms:9.1f} | {continuous_ms:13.1f}")
+
+  # Masukan dengan banyak review berulang: graf per kalimat vs graf setelah deduplikasi
+  reviews = synthetic_reviews(args.reviews)
+  vectorizer = TfidfVectorizer(ngram_range=(1, 2), max_features=1000)
+  start = time.perf_counter()
+  raw_scores = lexrank_scores(vectorizer.fit_transform(reviews), 0.1)
+  raw_ms = (time.perf_counter() - start) * 1000
+  start = time.perf_counter()
+  units = summary_units(reviews)
+  dedup_scores = lexrank_scores(vectorizer.fit_transform([unit.normalized for unit in units]), 0.1, weights=[unit.weight for unit in units])
+  dedup_ms = (time.perf_counter() - start) * 1000
+  print(f"\n{args.reviews} reviews: {len(reviews)} graph nodes in {raw_ms:.1f} ms, {len(units)} after dedup in {dedup_ms:.1f} ms (incl. MinHash)")
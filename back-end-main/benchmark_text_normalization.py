@@ -0,0 +1,100 @@
+import sys
+import os
+import re
+import time
+import string
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from nltk.corpus import stopwords
+from text_processing.slang import fix_slangwords
+from text_processing.normalize import TextNormalizer
+
+# Kosakata contoh dari review Tokopedia, ditambah noise yang dibersihkan praproses
+WORDS = (
+  'barang sesuai pesanan bagus banget bgt pengiriman cepat packing aman seller ramah '
+  'kualitas mantap harga murah recommended kecewa rusak lambat jelek original '
+  'terima kasih bahan tebal ukuran pas warna cantik respon gw syukaa yg udh'
+).split()
+NOISE = ['@toko', '#promo', 'https://tokopedia.link/x', '100%', '!!!', '😍', ':)', '\n']
+
+
+def synthetic_reviews(n_reviews, distinct, seed=42):
+  """n_reviews reviews drawn from `distinct` unique texts (review data repeats a lot)"""
+  rng = random.Random(seed)
+  unique = []
+  for _ in range(distinct):
+    words = rng.choices(WORDS, k=rng.randint(3, 25))
+    if rng.random() < 0.3:
+      words.insert(rng.randrange(len(words) + 1), rng.choice(NOISE))
+    unique.append(' '.join(words).capitalize())
+  return [rng.choice(unique) for _ in range(n_reviews)]
+
+
+# Praproses lama (per panggilan): regex di-compile dan stopword dibangun ulang setiap review
+def legacy_cleaning(text):
+  text = re.sub(r'@[A-Za-z0-9]+', '', text)
+  text = re.sub(r'#[A-Za-z0-9]+', '', text)
+  text = re.sub(r'RT[\s]', '', text)
+  text = re.sub(r"http\S+", '', text)
+  text = re.sub(r'[0-9]+', '', text)
+  text = re.sub(r'[^\w\s]', '', text)
+  text = text.replace('\n', ' ')
+  text = text.translate(str.maketrans('', '', string.punctuation))
+  text = text.strip(' ')
+  emoji_pattern = re.compile(
+    "["
+    u"\U0001F600-\U0001F64F"
+    u"\U0001F300-\U0001F5FF"
+    u"\U0001F680-\U0001F6FF"
+    u"\U0001F1E0-\U0001F1FF"
+    u"\U00002700-\U000027BF"
+    u"\U000024C2-\U0001F251"
+    "]+", flags=re.UNICODE)
+  return emoji_pattern.sub(r'', text)
+
+
+def legacy_filtering(words):
+  listStopwords = set(stopwords.words('indonesian'))
+  listStopwords.update(['iya','yaa','nya','na','sih','ku',"di","ya","loh","kah","woi","woii","woy", "nih", "trus", "tuh",
+                        "yah", "ajah", "lagi", "lah", "aj", "aja", "jg", "juga", "jga", "jugaa", "yng", 'apa', "cuman", "deh",
+                        "min", "gak", "cuma", "si", "an", "dikit", "langsung"])
+  return [word for word in words if word not in listStopwords]
+
+
+def legacy_preprocess(text, stem=None):
+  text = legacy_cleaning(text).lower()
+  if stem is not None:
+    text = ' '.join(stem(word) for word in text.split())
+  return ' '.join(legacy_filtering(fix_slangwords(text).split()))
+
+
+def throughput(function, reviews):
+  start = time.perf_counter()
+  function(reviews)
+  return len(reviews) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark text normalisation throughput')
+  parser.add_argument('--reviews', type=int, default=20000, help='number of synthetic reviews')
+  parser.add_argument('--distinct', type=int, default=5000, help='number of distinct review texts')
+  parser.add_argument('--stem', action='store_true', help='include Sastrawi stemming (ai_model pipeline)')
+  args = parser.parse_args()
+
+  stem = None
+  if args.stem:
+    from ai_model.util import stem_cache
+    stem = stem_cache.stem
+
+  reviews = synthetic_reviews(args.reviews, args.distinct)
+  normalizer = TextNormalizer(stem=stem)
+  # Hasil harus identik dengan praproses lama
+  mismatches = sum(legacy_preprocess(text, stem) != normalizer.normalize(text) for text in reviews[:1000])
+
+  print(f"{'mode':>24} | {'reviews/s':>10}")
+  print('-' * 38)
+  print(f"{'legacy per call':>24} | {throughput(lambda texts: [legacy_preprocess(t, stem) for t in texts], reviews):10.1f}")
+  print(f"{'normalize per call':>24} | {throughput(lambda texts: [normalizer.normalize(t) for t in texts], reviews):10.1f}")
+  print(f"{'normalize_many':>24} | {throughput(normalizer.normalize_many, reviews):10.1f}")
+  print(f"mismatches vs legacy (first 1000): {mismatches}")
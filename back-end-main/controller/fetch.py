@@ -1,54 +1,53 @@
 import sys
 import os
-import traceback
+import logging
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from db.util import *
 from flask import jsonify
+from controller.stream import stream_response, STREAM_MODES
+from controller.params import MAX_SUMMARY_BATCH
+from controller.lazy import LazySubsystem
 
-# Enhanced imports with error handling
-try:
+log = logging.getLogger(__name__)
+
+# Jumlah hasil pencarian nama produk (sama dengan LIMIT query LIKE lama)
+SEARCH_RESULT_LIMIT = 500
+
+# Sistem ML dimuat saat pertama dipakai (atau oleh warmup di background),
+# sehingga endpoint katalog sudah siap sebelum sklearn/nltk selesai diimport
+def _load_recommender():
     from recomm_system.main import recomend
-    RECOMMEND_SYSTEM_AVAILABLE = True
-    print("✅ Recommendation system loaded successfully")
-except ImportError as e:
-    print(f"⚠️ Recommendation system not available: {e}")
-    RECOMMEND_SYSTEM_AVAILABLE = False
+    return recomend
 
-try:
-    from review_summarization.main import lexrank_summarizer
-    SUMMARIZATION_AVAILABLE = True
-    print("✅ Review summarization loaded successfully")
-except ImportError as e:
-    print(f"⚠️ Review summarization not available: {e}")
-    SUMMARIZATION_AVAILABLE = False
-    
-    # Fallback summarizer
-    def lexrank_summarizer(reviews, num_sentences=3, threshold=0.1):
-        if not reviews:
-            return "Tidak ada review tersedia."
-        
-        # Simple fallback
-        combined = " ".join(str(review) for review in reviews[:3] if review)
-        if len(combined) > 200:
-            return combined[:200] + "..."
-        return combined
+def _load_summarizer():
+    import review_summarization.main  # memuat korpus NLTK; gagal di sini jika tidak tersedia
+    from review_summarization import store
+    return store
+
+recommender = LazySubsystem('Recommendation system', _load_recommender)
+summarizer = LazySubsystem('Review summarization', _load_summarizer)
 
-def getAllProducts():
+def getAllProducts(after_id=None, limit=PRODUCT_PAGE_SIZE):
     try:
-        result = getAllProduct()
+        result, next_cursor = getProductPage(after_id, limit)
         return jsonify({
             'error': False,
             'message': 'Data fetched successfully',
-            'data': result
+            'data': result,
+            'next_cursor': next_cursor
         }), 200
     except Exception as e:
-        print('Error fetching the data', e)
+        log.exception('getAllProducts failed')
         return jsonify({
             'error': True,
             'message': 'Error fetching data',
             'data': None
         }), 500
 
+def getAllProductsStream(after_id=None, mode='ndjson'):
+    # Seluruh product setelah after_id, tanpa batas halaman, dibaca per batch dari cursor server-side
+    return stream_response(streamAllProducts(after_id), mode, 'Data fetched successfully')
+
 def getAllCategories():
     try:
         result = getAllCategory()
@@ -58,35 +57,38 @@ def getAllCategories():
             'data': result
         }), 200
     except Exception as e:
-        print('Error fetching the data', e)
+        log.exception('getAllCategories failed')
         return jsonify({
             'error': True,
             'message': 'Error fetching categories',
             'data': None
         }), 500
 
-def getAllReviews():
+def getAllReviews(after_id=None, limit=REVIEW_PAGE_SIZE):
     try:
-        result = getAllReview()
+        result, next_cursor = getReviewPage(after_id, limit)
         return jsonify({
             'error': False,
             'message': 'Reviews fetched successfully',
-            'data': result
+            'data': result,
+            'next_cursor': next_cursor
         }), 200
     except Exception as e:
-        print('Error fetching the data', e)
+        log.exception('getAllReviews failed')
         return jsonify({
             'error': True,
             'message': 'Error fetching reviews',
             'data': None
         }), 500
 
+def getAllReviewsStream(after_id=None, mode='ndjson'):
+    return stream_response(streamAllReviews(after_id), mode, 'Reviews fetched successfully')
+
 def getAllProductsByCategory(categoryId):
     try:
-        print(f"🔍 Controller: Getting products for category {categoryId}")
         from db.util import getProductsByCategory
         result = getProductsByCategory(categoryId)
-        print(f"✅ DB result: Found {len(result) if result else 0} products")
+        log.debug('products by category', extra={'category': categoryId, 'count': len(result) if result else 0})
         
         # Return plain dict - NO jsonify here
         return {
@@ -96,9 +98,7 @@ def getAllProductsByCategory(categoryId):
         }
         
     except Exception as e:
-        print(f'❌ Controller error: {str(e)}')
-        import traceback
-        traceback.print_exc()
+        log.exception('getAllProductsByCategory failed', extra={'category': categoryId})
         
         # Return error dict - NO jsonify here
         return {
@@ -109,10 +109,9 @@ def getAllProductsByCategory(categoryId):
 
 def getAllReviewsByProduct(productId):
     try:
-        print(f"🔍 Controller: Getting reviews for product {productId}")
         from db.util import getReviewsByProduct
         result = getReviewsByProduct(productId)
-        print(f"✅ DB result: Found {len(result) if result else 0} reviews")
+        log.debug('reviews by product', extra={'product': productId, 'count': len(result) if result else 0})
         
         return {
             'error': False,
@@ -120,7 +119,7 @@ def getAllReviewsByProduct(productId):
             'data': result if result else []
         }
     except Exception as e:
-        print(f'❌ Controller error: {str(e)}')
+        log.exception('getAllReviewsByProduct failed', extra={'product': productId})
         return {
             'error': True,
             'message': f'Error fetching reviews by product: {str(e)}',
@@ -129,10 +128,9 @@ def getAllReviewsByProduct(productId):
 
 def getAllReviewsByCategory(categoryId):
     try:
-        print(f"🔍 Controller: Getting reviews for category {categoryId}")
         from db.util import getReviewsByCategory
         result = getReviewsByCategory(categoryId)
-        print(f"✅ DB result: Found {len(result) if result else 0} reviews")
+        log.debug('reviews by category', extra={'category': categoryId, 'count': len(result) if result else 0})
         
         return {
             'error': False,
@@ -140,19 +138,25 @@ def getAllReviewsByCategory(categoryId):
             'data': result if result else []
         }
     except Exception as e:
-        print(f'❌ Controller error: {str(e)}')
+        log.exception('getAllReviewsByCategory failed', extra={'category': categoryId})
         return {
             'error': True,
             'message': f'Error fetching reviews by category: {str(e)}',
             'data': []
         }
 
-def getSentimentPrediction(productId):
+def getAllReviewsByCategoryStream(categoryId, mode='ndjson'):
+    return stream_response(streamReviewsByCategory(categoryId), mode, 'Reviews by category fetched successfully')
+
+def getSentimentPrediction(productId, start=None, end=None):
     try:
-        print(f"🔍 Controller: Getting sentiment for product {productId}")
-        from db.util import getSentimentByProduct
-        result = getSentimentByProduct(productId)
-        print(f"✅ DB result: Found {len(result) if result else 0} sentiment records")
+        if start is not None or end is not None:
+            # Rentang tanggal: dijumlahkan dari rollup harian
+            result = getSentimentInWindow(productId, start, end)
+        else:
+            from db.util import getSentimentByProduct
+            result = getSentimentByProduct(productId)
+        log.debug('sentiment by product', extra={'product': productId, 'count': len(result) if result else 0})
         
         return {
             'error': False,
@@ -160,19 +164,56 @@ def getSentimentPrediction(productId):
             'data': result if result else []
         }
     except Exception as e:
-        print(f'❌ Controller error: {str(e)}')
+        log.exception('getSentimentPrediction failed', extra={'product': productId})
         return {
             'error': True,
             'message': f'Error fetching sentiment analysis: {str(e)}',
             'data': []
         }
 
-def getProductsByName(name):
+def getSentimentTimelineByProduct(productId, start=None, end=None, bucket='day'):
+    try:
+        result = getSentimentTimeline(productId, start, end, bucket)
+        return {
+            'error': False,
+            'message': 'Sentiment timeline fetched successfully',
+            'data': result
+        }
+    except Exception as e:
+        log.exception('getSentimentTimelineByProduct failed', extra={'product': productId})
+        return {
+            'error': True,
+            'message': f'Error fetching sentiment timeline: {str(e)}',
+            'data': []
+        }
+
+def getSentimentRatingByProduct(productId):
     try:
-        print(f"🔍 Controller: Searching products by name: {name}")
-        from db.util import getAllProductsByName
-        result = getAllProductsByName(name.lower())
-        print(f"✅ DB result: Found {len(result) if result else 0} products")
+        result = getSentimentByRating(productId)
+        return {
+            'error': False,
+            'message': 'Sentiment by rating fetched successfully',
+            'data': result
+        }
+    except Exception as e:
+        log.exception('getSentimentRatingByProduct failed', extra={'product': productId})
+        return {
+            'error': True,
+            'message': f'Error fetching sentiment by rating: {str(e)}',
+            'data': []
+        }
+
+def getProductsByName(name, fuzzy='auto'):
+    try:
+        try:
+            from product_search.index import search_products
+            result = search_products(name, SEARCH_RESULT_LIMIT, fuzzy)
+        except Exception as e:
+            # Index pencarian belum bisa dibangun: kembali ke LIKE (full scan)
+            log.warning('product search index unavailable, falling back to LIKE', extra={'error': str(e)})
+            from db.util import getAllProductsByName
+            result = getAllProductsByName(name.lower())
+        log.debug('products by name', extra={'query': name, 'count': len(result) if result else 0})
         
         return {
             'error': False,
@@ -180,7 +221,7 @@ def getProductsByName(name):
             'data': result if result else []
         }
     except Exception as e:
-        print(f'❌ Controller error: {str(e)}')
+        log.exception('getProductsByName failed', extra={'query': name})
         return {
             'error': True,
             'message': f'Error fetching products by name: {str(e)}',
@@ -190,8 +231,6 @@ def getProductsByName(name):
 # ✅ Enhanced recommendation function with comprehensive error handling
 def recomend_products(productId):
     try:
-        print(f"🔍 Getting recommendations for product ID: {productId}")
-        
         # Validate productId
         if not productId:
             return jsonify({
@@ -211,11 +250,12 @@ def recomend_products(productId):
             }), 400
         
         # Check if recommendation system is available
-        if not RECOMMEND_SYSTEM_AVAILABLE:
-            print("⚠️ Recommendation system not available, returning fallback")
+        recomend = recommender.get()
+        if recomend is None:
+            log.warning('recommendation system not available, returning fallback')
             # Return some sample products as fallback
             try:
-                all_products = getAllProduct()
+                all_products = getAllProduct(limit=5)
                 if all_products and len(all_products) > 0:
                     # Return first 5 products as fallback recommendations
                     fallback_recommendations = all_products[:5]
@@ -231,7 +271,7 @@ def recomend_products(productId):
                         'data': []
                     }), 200
             except Exception as e:
-                print(f"❌ Error getting fallback recommendations: {e}")
+                log.exception('fallback recommendations failed')
                 return jsonify({
                     'error': True,
                     'message': 'Recommendation system unavailable and fallback failed',
@@ -241,14 +281,12 @@ def recomend_products(productId):
         # Call recommendation system
         try:
             result = recomend(productId)
-            print(f"🔍 Recommendation system returned: {type(result)} with length {len(result) if result else 0}")
         except Exception as e:
-            print(f"❌ Recommendation system error: {e}")
-            traceback.print_exc()
+            log.exception('recommendation system error', extra={'product': productId})
             
             # Try fallback
             try:
-                all_products = getAllProduct()
+                all_products = getAllProduct(limit=6)
                 if all_products and len(all_products) > 0:
                     fallback_recommendations = [p for p in all_products if p.get('id') != productId][:5]
                     return jsonify({
@@ -263,13 +301,21 @@ def recomend_products(productId):
                         'data': []
                     }), 200
             except Exception as fallback_error:
-                print(f"❌ Fallback also failed: {fallback_error}")
+                log.error('fallback recommendations failed', extra={'error': str(fallback_error)})
                 return jsonify({
                     'error': True,
                     'message': f'Recommendation failed: {str(e)}',
                     'data': []
                 }), 500
         
+        # Product is not in the recommendation index (unknown id or not yet indexed)
+        if result is None:
+            return jsonify({
+                'error': True,
+                'message': 'Product not found in recommendation index',
+                'data': []
+            }), 404
+
         # Handle empty results
         if not result or len(result) == 0:
             return jsonify({
@@ -280,14 +326,14 @@ def recomend_products(productId):
         
         # Ensure result is a list
         if not isinstance(result, list):
-            print(f"⚠️ Recommendation result is not a list: {type(result)}")
+            log.warning('recommendation result is not a list', extra={'type': type(result).__name__})
             return jsonify({
                 'error': False,
                 'message': 'No valid recommendations found',
                 'data': []
             }), 200
         
-        print(f"✅ Successfully retrieved {len(result)} recommendations")
+        log.debug('recommendations', extra={'product': productId, 'count': len(result)})
         return jsonify({
             'error': False,
             'message': 'Product recommendations fetched successfully',
@@ -295,8 +341,7 @@ def recomend_products(productId):
         }), 200
         
     except Exception as e:
-        print(f'❌ Error fetching recommendations for product {productId}:', str(e))
-        traceback.print_exc()
+        log.exception('recomend_products failed', extra={'product': productId})
         
         return jsonify({
             'error': True,
@@ -307,8 +352,6 @@ def recomend_products(productId):
 # ✅ Enhanced review summary function with comprehensive error handling
 def getReviewsSumByProduct(productId):
     try:
-        print(f"🔍 Getting review summary for product ID: {productId}")
-        
         # Validate productId
         if not productId:
             return jsonify({
@@ -327,12 +370,26 @@ def getReviewsSumByProduct(productId):
                 'data': None
             }), 400
         
-        # Get reviews for the product
+        # Get the review-set fingerprint and the reviews for the product
+        store = summarizer.get()
         try:
-            reviews_result = getReviewsByProduct(productId)
-            print(f"🔍 Found {len(reviews_result) if reviews_result else 0} reviews")
+            fingerprint = getReviewFingerprint(productId)
+            if store is not None and fingerprint[0] > 0:
+                # Review tidak berubah sejak rangkuman terakhir: tidak perlu LexRank lagi
+                stored_summary = store.get_stored_summary(productId, fingerprint)
+                if stored_summary is not None:
+                    return jsonify({
+                        'error': False,
+                        'message': 'Review summary generated successfully',
+                        'data': {
+                            'productId': str(productId),
+                            'summary': stored_summary
+                        }
+                    }), 200
+            # Tanpa cache baca: rangkuman yang disimpan harus sesuai dengan fingerprint di atas
+            reviews_result = getReviewsByProduct.uncached(productId) if fingerprint[0] > 0 else []
         except Exception as e:
-            print(f"❌ Error getting reviews: {e}")
+            log.exception('could not read reviews for summary', extra={'product': productId})
             return jsonify({
                 'error': True,
                 'message': f'Error fetching reviews: {str(e)}',
@@ -353,14 +410,11 @@ def getReviewsSumByProduct(productId):
             }), 200
         
         # Extract review content
-        reviews = []
-        for item in reviews_result:
-            if isinstance(item, dict) and 'review' in item:
-                review_text = str(item['review']).strip()
-                if review_text and len(review_text) > 5:  # Minimum review length
-                    reviews.append(review_text)
-        
-        print(f"🔍 Extracted {len(reviews)} valid review texts")
+        if store is not None:
+            reviews = store.review_texts(reviews_result)
+        else:
+            reviews = [str(item['review']).strip() for item in reviews_result
+                       if isinstance(item, dict) and len(str(item.get('review', '')).strip()) > 5]
         
         if not reviews:
             return jsonify({
@@ -374,8 +428,9 @@ def getReviewsSumByProduct(productId):
         
         # Generate summary
         try:
-            if SUMMARIZATION_AVAILABLE:
-                summary = lexrank_summarizer(reviews, num_sentences=3, threshold=0.1)
+            if store is not None:
+                summary = store.summarize_texts(reviews)
+                store.store_summary(productId, fingerprint, summary)
             else:
                 # Simple fallback summarization
                 combined_reviews = " ".join(reviews[:5])  # Take first 5 reviews
@@ -384,11 +439,10 @@ def getReviewsSumByProduct(productId):
                 else:
                     summary = combined_reviews
             
-            print(f"✅ Generated summary: {summary[:100]}...")
+            log.debug('summary generated', extra={'product': productId, 'reviews': len(reviews)})
             
         except Exception as e:
-            print(f"⚠️ Error generating summary: {e}")
-            traceback.print_exc()
+            log.exception('summary generation failed, using fallback', extra={'product': productId})
             
             # Ultra-simple fallback
             try:
@@ -410,8 +464,7 @@ def getReviewsSumByProduct(productId):
         }), 200
         
     except Exception as e:
-        print(f'❌ Error generating review summary for product {productId}:', str(e))
-        traceback.print_exc()
+        log.exception('getReviewsSumByProduct failed', extra={'product': productId})
         
         return jsonify({
             'error': True,
@@ -420,4 +473,54 @@ def getReviewsSumByProduct(productId):
                 'productId': str(productId) if productId else 'unknown',
                 'summary': 'Gagal membuat rangkuman review karena masalah teknis.'
             }
-        }), 500
\ No newline at end of file
+        }), 500
+def getReviewsSumByProducts(productIds):
+    """Summaries of several products: one review query, LexRank across the summary worker pool"""
+    try:
+        if not productIds:
+            return jsonify({
+                'error': True,
+                'message': 'At least one product ID is required',
+                'data': []
+            }), 400
+        if len(productIds) > MAX_SUMMARY_BATCH:
+            return jsonify({
+                'error': True,
+                'message': f'At most {MAX_SUMMARY_BATCH} product IDs per request',
+                'data': []
+            }), 400
+        try:
+            productIds = [int(productId) for productId in productIds]
+        except ValueError:
+            return jsonify({
+                'error': True,
+                'message': 'Invalid product ID format',
+                'data': []
+            }), 400
+
+        store = summarizer.get()
+        if store is None:
+            return jsonify({
+                'error': True,
+                'message': 'Review summarization is not available',
+                'data': []
+            }), 503
+
+        summaries = store.summarize_products(productIds, store.get_summary_pool())
+        data = [{
+            'productId': str(productId),
+            'summary': summaries.get(productId) or 'Belum ada review tersedia untuk produk ini.'
+        } for productId in dict.fromkeys(productIds)]
+        return jsonify({
+            'error': False,
+            'message': 'Review summaries generated successfully',
+            'data': data
+        }), 200
+
+    except Exception as e:
+        log.exception('getReviewsSumByProducts failed', extra={'products': len(productIds)})
+        return jsonify({
+            'error': True,
+            'message': f'Error generating review summaries: {str(e)}',
+            'data': []
+        }), 500
@@ -0,0 +1,73 @@
+import time
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class LazySubsystem:
+    """
+    An ML subsystem imported on first use instead of when the server
+    starts. `loader` imports what is needed and returns the object the
+    controllers call; the result, or the import failure, is kept so a
+    broken subsystem is not re-imported on every request.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+        self.error = None
+        self.load_seconds = None
+
+    def get(self):
+        """The loaded subsystem, or None when it cannot be imported"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    start = time.perf_counter()
+                    try:
+                        self._value = self._loader()
+                        log.info('subsystem loaded', extra={'subsystem': self.name, 'seconds': round(time.perf_counter() - start, 2)})
+                    except Exception as e:
+                        # ImportError, atau LookupError saat korpus NLTK tidak tersedia
+                        self.error = e
+                        log.warning('subsystem not available', extra={'subsystem': self.name, 'error': str(e)})
+                    self.load_seconds = round(time.perf_counter() - start, 3)
+                    self._loaded = True
+        return self._value
+
+    @property
+    def loaded(self):
+        """True once the loader has run, whether or not it succeeded"""
+        return self._loaded
+
+    def available(self):
+        return self.get() is not None
+
+    def status(self):
+        if not self._loaded:
+            return {'state': 'not loaded'}
+        if self.error is not None:
+            return {'state': 'unavailable', 'error': str(self.error), 'load_seconds': self.load_seconds}
+        return {'state': 'ready', 'load_seconds': self.load_seconds}
+
+
+def run_warmup(tasks):
+    """Run (name, callable) warmup tasks in order; a failing task does not stop the others"""
+    start = time.perf_counter()
+    for name, task in tasks:
+        try:
+            task()
+        except Exception:
+            log.warning('warmup failed, it will load on first use', extra={'task': name}, exc_info=True)
+    log.info('warmup finished', extra={'seconds': round(time.perf_counter() - start, 2)})
+
+
+def start_background_warmup(tasks):
+    """run_warmup() on a daemon thread, so requests are served while the ML stack loads"""
+    thread = threading.Thread(target=run_warmup, args=(list(tasks),), name='ml-warmup', daemon=True)
+    thread.start()
+    return thread
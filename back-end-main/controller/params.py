@@ -0,0 +1,61 @@
+from datetime import date
+from controller.stream import STREAM_MODES
+
+# Validasi query parameter yang dipakai bersama oleh main.py (Flask) dan asgi.py (Starlette);
+# `args` adalah mapping query string (request.args / request.query_params)
+
+# Product per request pada endpoint rangkuman batch
+MAX_SUMMARY_BATCH = 50
+
+
+def _optional_int(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return False
+
+
+def parse_page_args(args):
+    """after_id/limit query parameters for keyset-paginated endpoints"""
+    after_id = _optional_int(args, 'after_id')
+    limit = _optional_int(args, 'limit')
+    if after_id is False or limit is False:
+        raise ValueError('after_id and limit must be valid numbers')
+    if (after_id is not None and after_id < 0) or (limit is not None and limit < 1):
+        raise ValueError('after_id must be >= 0 and limit must be >= 1')
+    return after_id, limit
+
+
+def parse_stream_mode(args):
+    """Value of the `stream` query parameter (ndjson/json), or None for a normal response"""
+    mode = args.get('stream')
+    if mode is None:
+        return None
+    if mode not in STREAM_MODES:
+        raise ValueError(f"stream must be one of: {', '.join(STREAM_MODES)}")
+    return mode
+
+
+def parse_date_window(args):
+    """start/end query parameters (YYYY-MM-DD, inclusive) for sentiment queries"""
+    window = []
+    for name in ('start', 'end'):
+        value = args.get(name)
+        try:
+            window.append(date.fromisoformat(value) if value else None)
+        except ValueError:
+            raise ValueError(f'{name} must be a date in YYYY-MM-DD format')
+    if window[0] and window[1] and window[0] > window[1]:
+        raise ValueError('start must not be after end')
+    return tuple(window)
+
+
+def parse_fuzzy(args):
+    """fuzzy: auto (default, toleransi salah ketik jika tidak ada hasil), true, atau false"""
+    fuzzy = args.get('fuzzy', 'auto').lower()
+    if fuzzy not in ('auto', 'true', 'false'):
+        raise ValueError('fuzzy must be one of: auto, true, false')
+    return {'auto': 'auto', 'true': True, 'false': False}[fuzzy]
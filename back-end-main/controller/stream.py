@@ -0,0 +1,67 @@
+import json
+import logging
+from flask import Response, stream_with_context
+
+log = logging.getLogger(__name__)
+
+# Jumlah baris yang diserialisasi per chunk yang dikirim ke client
+STREAM_CHUNK_ROWS = 500
+
+STREAM_MODES = ('ndjson', 'json')
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+def _chunks(rows, chunk_rows):
+    chunk = []
+    for row in rows:
+        chunk.append(_dumps(row))
+        if len(chunk) == chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ndjson_stream(rows, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    One JSON object per line. If the query fails mid-stream, a final
+    {"error": true, ...} line is written since the status is already sent.
+    """
+    try:
+        for chunk in _chunks(rows, chunk_rows):
+            yield '\n'.join(chunk) + '\n'
+    except Exception as e:
+        log.exception('error while streaming rows')
+        yield _dumps({'error': True, 'message': f'Error while streaming data: {str(e)}'}) + '\n'
+
+
+def json_array_stream(rows, message, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    The usual {error, message, data} envelope, written incrementally. data
+    comes first so that a failure mid-stream can still close the document
+    with "error": true.
+    """
+    yield '{"data":['
+    first = True
+    try:
+        for chunk in _chunks(rows, chunk_rows):
+            yield ('' if first else ',') + ','.join(chunk)
+            first = False
+    except Exception as e:
+        log.exception('error while streaming rows')
+        yield '],"error":true,"message":' + _dumps(f'Error while streaming data: {str(e)}') + '}'
+        return
+    yield '],"error":false,"message":' + _dumps(message) + '}'
+
+
+def stream_response(rows, mode, message):
+    """Flask response that serialises `rows` (an iterator) chunk by chunk"""
+    if mode == 'ndjson':
+        body, mimetype = ndjson_stream(rows), 'application/x-ndjson'
+    else:
+        body, mimetype = json_array_stream(rows, message), 'application/json'
+    # stream_with_context: generator tetap punya akses ke request context selama streaming
+    return Response(stream_with_context(body), mimetype=mimetype)
@@ -0,0 +1,197 @@
+import sys
+import os
+import asyncio
+import logging
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import aiomysql
+from dotenv import load_dotenv
+from db.cache import cached
+from monitoring.metrics import timed_query
+from db.util import (
+    CATEGORY_CACHE_TTL, CATALOGUE_CACHE_TTL, PRODUCT_PAGE_SIZE, REVIEW_PAGE_SIZE, MAX_PAGE_SIZE,
+    PRODUCT_COLUMNS, REVIEW_COLUMNS, REVIEW_FINGERPRINT_COLUMNS, SENTIMENT_BY_PRODUCT_QUERY,
+    SENTIMENT_RATING_QUERY, UPSERT_SUMMARY, _product_lists, _one_product, _product_row, _review_row,
+    _prediction_row, _sentiment_row, _sentiment_window_query, _sentiment_timeline_query, _fingerprint
+)
+
+# Versi async (aiomysql) dari reader db.util untuk asgi.py. Query, konversi baris dan
+# tag cache sama dengan versi sync, sehingga respons kedua mode server identik.
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', '10'))
+
+_pool = None
+_pool_lock = None
+
+
+async def get_async_pool():
+    """aiomysql pool of the running event loop, created on first use"""
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await aiomysql.create_pool(
+                minsize=1,
+                maxsize=ASYNC_DB_POOL_SIZE,
+                host=os.getenv('DB_HOST', 'localhost'),
+                user=os.getenv('DB_USERNAME', 'root'),
+                password=os.getenv('DB_PASSWORD', ''),
+                db=os.getenv('DB_NAME', 'yapin_db'),
+                charset='utf8mb4',
+                autocommit=True
+            )
+            log.info('async database pool created', extra={'pool_size': ASYNC_DB_POOL_SIZE})
+    return _pool
+
+
+async def close_async_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+def async_pool_stats():
+    if _pool is None:
+        return {'size': 0, 'free': 0, 'max': ASYNC_DB_POOL_SIZE}
+    return {'size': _pool.size, 'free': _pool.freesize, 'max': _pool.maxsize}
+
+
+async def fetch_all(query, params=(), dictionary=True):
+    pool = await get_async_pool()
+    async with pool.acquire() as connection:
+        async with connection.cursor(aiomysql.DictCursor if dictionary else aiomysql.Cursor) as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchall()
+
+
+async def fetch_one(query, params=(), dictionary=True):
+    pool = await get_async_pool()
+    async with pool.acquire() as connection:
+        async with connection.cursor(aiomysql.DictCursor if dictionary else aiomysql.Cursor) as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchone()
+
+
+async def _rows_or_empty(name, query, params, convert):
+    # Sama seperti db.util: reader list mengembalikan [] saat query gagal
+    try:
+        return [convert(row) for row in await fetch_all(query, params)]
+    except Exception:
+        log.exception('query failed', extra={'function': name})
+        return []
+
+
+async def _keyset_page(columns, table, convert, after_id, limit):
+    """(rows, next_cursor), as db.util._keyset_page"""
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    rows = await fetch_all(f"SELECT {columns} FROM {table} WHERE id > %s ORDER BY id LIMIT %s", (after_id or 0, limit + 1))
+    rows = [convert(row) for row in rows]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]['id']
+    return rows, None
+
+
+@cached(CATALOGUE_CACHE_TTL, tags=_product_lists)
+@timed_query
+async def getProductPage(after_id=None, limit=PRODUCT_PAGE_SIZE):
+    return await _keyset_page(PRODUCT_COLUMNS, 'product', _product_row, after_id, limit)
+
+
+@timed_query
+async def getReviewPage(after_id=None, limit=REVIEW_PAGE_SIZE):
+    return await _keyset_page(REVIEW_COLUMNS, 'review', _review_row, after_id, limit)
+
+
+@cached(CATEGORY_CACHE_TTL)
+@timed_query
+async def getAllCategory():
+    return await _rows_or_empty('getAllCategory', "SELECT id, name FROM category LIMIT 100", (),
+                                lambda row: {'id': row['id'], 'name': row['name']})
+
+
+@cached(CATALOGUE_CACHE_TTL, tags=_product_lists)
+@timed_query
+async def getProductsByCategory(categoryId):
+    return await _rows_or_empty('getProductsByCategory',
+                                f"SELECT {PRODUCT_COLUMNS} FROM product WHERE categoryId = %s LIMIT 1000",
+                                (categoryId,), _product_row)
+
+
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
+async def getReviewsByProduct(productId):
+    return await _rows_or_empty('getReviewsByProduct',
+                                f"SELECT {REVIEW_COLUMNS} FROM review WHERE productId = %s LIMIT 1000",
+                                (productId,), _review_row)
+
+
+@cached(CATALOGUE_CACHE_TTL, tags=_product_lists)
+@timed_query
+async def getReviewsByCategory(categoryId):
+    return await _rows_or_empty('getReviewsByCategory', """
+        SELECT rv.id, rv.review, rv.rating, rv.tanggal, rv.productId FROM category ct
+        JOIN product pr ON ct.id = pr.categoryId
+        JOIN review rv ON rv.productId = pr.id
+        WHERE ct.id = %s LIMIT 1000
+    """, (categoryId,), _review_row)
+
+
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
+async def getSentimentByProduct(productId):
+    return await _rows_or_empty('getSentimentByProduct', SENTIMENT_BY_PRODUCT_QUERY, (productId,), _prediction_row)
+
+
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
+async def getSentimentInWindow(productId, start=None, end=None):
+    rows = await fetch_all(*_sentiment_window_query(productId, start, end))
+    return [{'productId': int(productId), **_sentiment_row(row)} for row in rows]
+
+
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
+async def getSentimentTimeline(productId, start=None, end=None, bucket='day'):
+    rows = await fetch_all(*_sentiment_timeline_query(productId, start, end, bucket))
+    return [{'period': str(row['period']), **_sentiment_row(row)} for row in rows]
+
+
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
+async def getSentimentByRating(productId):
+    rows = await fetch_all(SENTIMENT_RATING_QUERY, [productId])
+    return [{'rating': int(row['rating']), **_sentiment_row(row)} for row in rows]
+
+
+@timed_query
+async def getReviewFingerprint(productId):
+    row = await fetch_one(f"SELECT {REVIEW_FINGERPRINT_COLUMNS} FROM review WHERE productId = %s", (productId,), dictionary=False)
+    return _fingerprint(row)
+
+
+@timed_query
+async def getStoredSummary(productId):
+    row = await fetch_one("""
+        SELECT review_count, max_review_id, id_checksum, summary, updated_at
+        FROM review_summary WHERE productId = %s
+    """, (productId,), dictionary=False)
+    if row is None:
+        return None
+    return {'fingerprint': _fingerprint(row[:3]), 'summary': row[3], 'updated_at': row[4]}
+
+
+@timed_query
+async def saveSummary(productId, fingerprint, summary):
+    pool = await get_async_pool()
+    async with pool.acquire() as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute(UPSERT_SUMMARY, (productId, *fingerprint, summary))
@@ -0,0 +1,264 @@
+import os
+import time
+import pickle
+import inspect
+import logging
+import threading
+import functools
+from collections import OrderedDict
+from dotenv import load_dotenv
+from monitoring.metrics import CACHE_LOOKUPS, registry
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+# Konfigurasi cache lewat environment (lihat Readme)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+CACHE_DEFAULT_TTL = float(os.getenv('CACHE_TTL_SECONDS', '300'))
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+CACHE_NAMESPACE = 'yapin:cache:'
+
+# Tag untuk entry yang berisi banyak product sekaligus (daftar, halaman, per kategori)
+PRODUCT_LISTS_TAG = 'products'
+
+
+def product_tag(product_id):
+    # '12' dan 12 (query string vs ETL) harus menghasilkan tag yang sama
+    try:
+        product_id = int(product_id)
+    except (TypeError, ValueError):
+        pass
+    return f'product:{product_id}'
+
+
+class MemoryBackend:
+    """
+    In-process LRU with a per-entry TTL. Entries can carry tags so that
+    invalidate_tag() drops every entry that depends on, e.g., one product.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}  # tag -> set(key)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        """(found, value); expired entries count as missing"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                self._discard(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def set(self, key, value, ttl, tags=()):
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate_tag(self, tag):
+        with self._lock:
+            keys = self._tags.pop(tag, set())
+            for key in keys:
+                self._discard(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+            return removed
+
+    def size(self):
+        return len(self._entries)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisBackend:
+    """
+    Same interface backed by a Redis-compatible server, so every worker
+    (and the ETL process) shares one cache. Eviction is left to the server's
+    maxmemory policy; tags are Redis sets of keys.
+    """
+
+    def __init__(self, url=CACHE_REDIS_URL, namespace=CACHE_NAMESPACE):
+        # redis hanya dibutuhkan kalau backend ini dipilih
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+        self.namespace = namespace
+        self.evictions = 0
+
+    def get(self, key):
+        raw = self.client.get(self.namespace + key)
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    def set(self, key, value, ttl, tags=()):
+        full_key = self.namespace + key
+        pipe = self.client.pipeline()
+        pipe.set(full_key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), px=int(ttl * 1000))
+        for tag in tags:
+            tag_key = self.namespace + 'tag:' + tag
+            pipe.sadd(tag_key, full_key)
+            # Set tag tidak boleh hidup lebih lama dari entry terpanjang yang dirujuknya
+            pipe.pexpire(tag_key, int(max(ttl, CACHE_DEFAULT_TTL) * 1000))
+        pipe.execute()
+
+    def invalidate_tag(self, tag):
+        tag_key = self.namespace + 'tag:' + tag
+        keys = self.client.smembers(tag_key)
+        if keys:
+            self.client.delete(*keys)
+        self.client.delete(tag_key)
+        return len(keys)
+
+    def clear(self):
+        removed = 0
+        for key in self.client.scan_iter(match=self.namespace + '*', count=500):
+            removed += self.client.delete(key)
+        return removed
+
+    def size(self):
+        return sum(1 for _ in self.client.scan_iter(match=self.namespace + '*', count=500))
+
+
+class ReadThroughCache:
+    """Wraps read functions and keeps hit/miss/invalidation counters"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def cached(self, ttl=CACHE_DEFAULT_TTL, tags=None):
+        """
+        Decorator keyed by function name and arguments. `tags` maps the call
+        arguments to the tags of the entry. Empty results are not stored:
+        the db.util readers return [] / None on database errors.
+        """
+        def decorator(function):
+            name = f'{function.__module__}.{function.__qualname__}'
+
+            def lookup(args, kwargs):
+                key = name + ':' + repr(args) + ':' + repr(sorted(kwargs.items()))
+                found, value = self.backend.get(key)
+                self._count('hits' if found else 'misses')
+                CACHE_LOOKUPS.inc(function=name, result='hit' if found else 'miss')
+                return key, found, value
+
+            def store(key, value, args, kwargs):
+                if not _is_empty(value):
+                    entry_tags = tags(*args, **kwargs) if tags else ()
+                    self.backend.set(key, value, ttl, entry_tags)
+                return value
+
+            if inspect.iscoroutinefunction(function):
+                # Reader async (db/async_util.py); tag-nya sama sehingga invalidate() dari ETL juga berlaku
+                @functools.wraps(function)
+                async def wrapper(*args, **kwargs):
+                    key, found, value = lookup(args, kwargs)
+                    if found:
+                        return value
+                    return store(key, await function(*args, **kwargs), args, kwargs)
+            else:
+                @functools.wraps(function)
+                def wrapper(*args, **kwargs):
+                    key, found, value = lookup(args, kwargs)
+                    if found:
+                        return value
+                    return store(key, function(*args, **kwargs), args, kwargs)
+
+            wrapper.uncached = function
+            return wrapper
+        return decorator
+
+    def invalidate(self, product_id):
+        """Drop everything that may contain `product_id` (its rows and all product lists)"""
+        removed = self.backend.invalidate_tag(product_tag(product_id))
+        removed += self.backend.invalidate_tag(PRODUCT_LISTS_TAG)
+        self._count('invalidations', removed)
+        return removed
+
+    def invalidate_all(self):
+        removed = self.backend.clear()
+        self._count('invalidations', removed)
+        return removed
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': self.backend.size(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.backend.evictions,
+            'invalidations': self.invalidations,
+        }
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+
+def _is_empty(value):
+    if value is None:
+        return True
+    if isinstance(value, tuple):
+        return not value[0]
+    return isinstance(value, list) and not value
+
+
+def create_backend(name=CACHE_BACKEND):
+    if name == 'redis':
+        try:
+            return RedisBackend()
+        except Exception as e:
+            log.warning('redis cache unavailable, falling back to memory', extra={'error': str(e)})
+    return MemoryBackend()
+
+
+cache = ReadThroughCache(create_backend())
+cached = cache.cached
+invalidate = cache.invalidate
+invalidate_all = cache.invalidate_all
+cache_stats = cache.stats
+
+
+@registry.register_collector
+def cache_metrics():
+    stats = cache.stats()
+    backend = {'backend': stats['backend']}
+    return [
+        ('yapin_cache_entries', 'gauge', 'Entries in the read-through cache', [(backend, stats['entries'])]),
+        ('yapin_cache_evictions_total', 'counter', 'LRU evictions', [(backend, stats['evictions'])]),
+        ('yapin_cache_invalidations_total', 'counter', 'Entries dropped by invalidate()', [(backend, stats['invalidations'])]),
+    ]
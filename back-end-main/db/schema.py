@@ -0,0 +1,170 @@
+import sys
+import os
+import logging
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db.util import get_db_connection, close_connection
+
+log = logging.getLogger(__name__)
+
+# Tabel yang dibuat oleh proses back-end (tidak ada pada db.sql).
+# {table} diganti dengan nama tabel, sehingga DDL yang sama dipakai untuk tabel staging.
+TABLES = {
+    'prediction': """
+        CREATE TABLE IF NOT EXISTS {table} (
+            productId INT NOT NULL,
+            sentiment_positive INT NOT NULL DEFAULT 0,
+            sentiment_negative INT NOT NULL DEFAULT 0,
+            sentiment_neutral INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (productId)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+    """,
+    'etl_state': """
+        CREATE TABLE IF NOT EXISTS {table} (
+            name VARCHAR(64) NOT NULL,
+            last_review_id INT NOT NULL DEFAULT 0,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (name)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+    """,
+    # Hasil model per review. label: indeks mapped_class (0 negative, 1 neutral, 2 positive);
+    # probabilitas disimpan x10000 (SMALLINT) agar baris tetap kecil.
+    # rating dan tanggal disalin dari review sehingga rollup tidak perlu join.
+    'review_sentiment': """
+        CREATE TABLE IF NOT EXISTS {table} (
+            reviewId INT NOT NULL,
+            productId INT NOT NULL,
+            rating TINYINT NOT NULL,
+            tanggal DATETIME NOT NULL,
+            label TINYINT NOT NULL,
+            p_negative SMALLINT UNSIGNED NOT NULL,
+            p_neutral SMALLINT UNSIGNED NOT NULL,
+            p_positive SMALLINT UNSIGNED NOT NULL,
+            PRIMARY KEY (reviewId),
+            KEY idx_product_tanggal (productId, tanggal)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+    """,
+    # Rollup dari review_sentiment; confidence_sum = jumlah probabilitas label terpilih (x10000)
+    'sentiment_daily': """
+        CREATE TABLE IF NOT EXISTS {table} (
+            productId INT NOT NULL,
+            day DATE NOT NULL,
+            sentiment_positive INT NOT NULL DEFAULT 0,
+            sentiment_negative INT NOT NULL DEFAULT 0,
+            sentiment_neutral INT NOT NULL DEFAULT 0,
+            confidence_sum BIGINT UNSIGNED NOT NULL DEFAULT 0,
+            PRIMARY KEY (productId, day)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+    """,
+    'sentiment_rating': """
+        CREATE TABLE IF NOT EXISTS {table} (
+            productId INT NOT NULL,
+            rating TINYINT NOT NULL,
+            sentiment_positive INT NOT NULL DEFAULT 0,
+            sentiment_negative INT NOT NULL DEFAULT 0,
+            sentiment_neutral INT NOT NULL DEFAULT 0,
+            confidence_sum BIGINT UNSIGNED NOT NULL DEFAULT 0,
+            PRIMARY KEY (productId, rating)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+    """,
+    # Rangkuman LexRank per product beserta fingerprint review yang dirangkum
+    'review_summary': """
+        CREATE TABLE IF NOT EXISTS {table} (
+            productId INT NOT NULL,
+            review_count INT NOT NULL,
+            max_review_id INT NOT NULL,
+            id_checksum BIGINT UNSIGNED NOT NULL,
+            summary TEXT NOT NULL,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (productId)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+    """,
+}
+
+def ensure_tables(*names):
+    """Create the given tables (default: all) if they do not exist yet"""
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        for name in names or TABLES.keys():
+            cursor.execute(TABLES[name].format(table=name))
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+def has_primary_key(table):
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(f"SHOW KEYS FROM {table} WHERE Key_name = 'PRIMARY'")
+        return len(cursor.fetchall()) > 0
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+def create_staging_table(name, staging_name):
+    """Drop and recreate an empty copy of table `name` under `staging_name`"""
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {staging_name}")
+        cursor.execute(TABLES[name].format(table=staging_name))
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+def swap_tables(pairs):
+    """
+    Atomically replace every `name` with its `staging_name`, given as
+    (name, staging_name) pairs, in one RENAME TABLE, so readers see either
+    all old tables or all complete new ones.
+    """
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        renames = []
+        for name, staging_name in pairs:
+            cursor.execute(f"DROP TABLE IF EXISTS {name}_old")
+            renames.append(f"{name} TO {name}_old, {staging_name} TO {name}")
+        cursor.execute(f"RENAME TABLE {', '.join(renames)}")
+        for name, staging_name in pairs:
+            cursor.execute(f"DROP TABLE {name}_old")
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+def ensure_fulltext_index(table='product', column='name', index_name='ft_product_name'):
+    """Add the FULLTEXT index used by the MySQL product search backend, if missing"""
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(f"SHOW INDEX FROM {table} WHERE Key_name = %s", (index_name,))
+        if cursor.fetchall():
+            return False
+        cursor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX {index_name} ({column})")
+        return True
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+if __name__ == '__main__':
+    from monitoring.logs import configure_logging
+    configure_logging()
+    ensure_tables()
+    log.info('tables ensured', extra={'tables': ', '.join(TABLES)})
+    ensure_fulltext_index()
+    log.info('full-text index on product.name ensured')
@@ -2,9 +2,14 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 # ❌ HAPUS BARIS INI: from .setup import *
+import logging
 import mysql.connector
 from mysql.connector import pooling
 from dotenv import load_dotenv
+from db.cache import cached, product_tag, PRODUCT_LISTS_TAG
+from monitoring.metrics import timed_query
+
+log = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -12,6 +17,16 @@ load_dotenv()
 # ✅ Use connection pooling to prevent memory leaks
 connection_pool = None
 
+# TTL cache per jenis data; kategori hampir tidak pernah berubah
+CATEGORY_CACHE_TTL = 3600
+CATALOGUE_CACHE_TTL = 300
+
+def _product_lists(*args, **kwargs):
+    return (PRODUCT_LISTS_TAG,)
+
+def _one_product(productId, *args, **kwargs):
+    return (product_tag(productId),)
+
 def get_connection_pool():
     global connection_pool
     if connection_pool is None:
@@ -28,19 +43,32 @@ def get_connection_pool():
                 collation='utf8mb4_unicode_ci',
                 autocommit=True
             )
-            print("✅ Database connection pool created")
+            log.info('database connection pool created', extra={'pool_size': 5})
         except Exception as e:
-            print(f"❌ Error creating connection pool: {e}")
+            log.error('could not create connection pool', extra={'error': str(e)})
             raise
     return connection_pool
 
+_inherited_pools = []
+
+def reset_connection_pool():
+    """
+    Forget the pool inherited from the parent process (called after fork).
+    The parent's connections stay referenced, never closed, so the child
+    does not send a QUIT over sockets the parent is still using.
+    """
+    global connection_pool
+    if connection_pool is not None:
+        _inherited_pools.append(connection_pool)
+    connection_pool = None
+
 def get_db_connection():
     try:
         pool = get_connection_pool()
         connection = pool.get_connection()
         return connection
     except Exception as e:
-        print(f"❌ Error getting database connection: {e}")
+        log.error('could not get database connection', extra={'error': str(e)})
         raise
 
 def close_connection(connection):
@@ -48,47 +76,57 @@ def close_connection(connection):
         if connection and connection.is_connected():
             connection.close()
     except Exception as e:
-        print(f"⚠️ Error closing connection: {e}")
+        log.warning('could not close connection', extra={'error': str(e)})
+
+# Ukuran halaman default sama dengan LIMIT lama, maksimum dibatasi agar satu request tetap kecil
+PRODUCT_PAGE_SIZE = 1000
+REVIEW_PAGE_SIZE = 5000
+MAX_PAGE_SIZE = 5000
+
+def _keyset_page(columns, table, convert, after_id, limit):
+    """
+    One page of `table` ordered by id, starting after `after_id`.
 
-# ✅ Enhanced getAllProduct with memory management
-def getAllProduct():
+    Returns (rows, next_cursor); next_cursor is the id to pass as after_id
+    for the next page, or None on the last page. One extra row is read to
+    tell whether another page exists.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
     connection = None
     cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
-        
-        query = "SELECT * FROM product LIMIT 1000"  # Limit results to prevent memory overflow
-        cursor.execute(query)
-        
-        results = cursor.fetchall()
-        
-        # Convert to list to ensure JSON serialization
-        products = []
-        for row in results:
-            products.append({
-                'id': row['id'],
-                'name': row['name'],
-                'currentPrice': float(row['currentPrice']) if row['currentPrice'] else 0,
-                'originalPrice': float(row['originalPrice']) if row['originalPrice'] else 0,
-                'imgUrl': row['imgUrl'] or '',
-                'stock': int(row['stock']) if row['stock'] else 0,
-                'categoryId': int(row['categoryId']) if row['categoryId'] else 0,
-                'discount': float(row['discount']) if row['discount'] else 0
-            })
-        
-        print(f"✅ Retrieved {len(products)} products from database")
-        return products
-        
-    except Exception as e:
-        print(f"❌ Error in getAllProduct: {e}")
-        return []
+        # WHERE id > %s ORDER BY id memakai primary key, biaya per halaman tetap berapa pun offset-nya
+        query = f"SELECT {columns} FROM {table} WHERE id > %s ORDER BY id LIMIT %s"
+        cursor.execute(query, (after_id or 0, limit + 1))
+        rows = [convert(row) for row in cursor.fetchall()]
     finally:
         if cursor:
             cursor.close()
         close_connection(connection)
 
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]['id']
+    return rows, None
+
+# ✅ Keyset pagination instead of a truncated LIMIT 1000
+def getAllProduct(after_id=None, limit=PRODUCT_PAGE_SIZE):
+    products, next_cursor = getProductPage(after_id, limit)
+    return products
+
+@cached(CATALOGUE_CACHE_TTL, tags=_product_lists)
+@timed_query
+def getProductPage(after_id=None, limit=PRODUCT_PAGE_SIZE):
+    """(products, next_cursor) for products with id > after_id"""
+    products, next_cursor = _keyset_page(PRODUCT_COLUMNS, 'product', _product_row, after_id, limit)
+    log.debug('products retrieved', extra={'count': len(products), 'after_id': after_id})
+    return products, next_cursor
+
 # ✅ Add similar fixes for other functions
+@cached(CATEGORY_CACHE_TTL)
+@timed_query
 def getAllCategory():
     connection = None
     cursor = None
@@ -107,55 +145,35 @@ def getAllCategory():
                 'name': row['name']
             })
         
-        print(f"✅ Retrieved {len(categories)} categories from database")
+        log.debug('categories retrieved', extra={'count': len(categories)})
         return categories
         
     except Exception as e:
-        print(f"❌ Error in getAllCategory: {e}")
+        log.error('getAllCategory failed', extra={'error': str(e)})
         return []
     finally:
         if cursor:
             cursor.close()
         close_connection(connection)
 
-def getAllReview():
-    connection = None
-    cursor = None
-    try:
-        connection = get_db_connection()
-        cursor = connection.cursor(dictionary=True)
-        
-        query = "SELECT * FROM review LIMIT 5000"
-        cursor.execute(query)
-        
-        results = cursor.fetchall()
-        reviews = []
-        for row in results:
-            reviews.append({
-                'id': row['id'],
-                'review': row['review'] or '',
-                'rating': int(row['rating']) if row['rating'] else 0,
-                'tanggal': str(row['tanggal']) if row['tanggal'] else '',
-                'productId': int(row['productId']) if row['productId'] else 0
-            })
-        
-        print(f"✅ Retrieved {len(reviews)} reviews from database")
-        return reviews
-        
-    except Exception as e:
-        print(f"❌ Error in getAllReview: {e}")
-        return []
-    finally:
-        if cursor:
-            cursor.close()
-        close_connection(connection)
+def getAllReview(after_id=None, limit=REVIEW_PAGE_SIZE):
+    reviews, next_cursor = getReviewPage(after_id, limit)
+    return reviews
+
+@timed_query
+def getReviewPage(after_id=None, limit=REVIEW_PAGE_SIZE):
+    """(reviews, next_cursor) for reviews with id > after_id"""
+    reviews, next_cursor = _keyset_page(REVIEW_COLUMNS, 'review', _review_row, after_id, limit)
+    log.debug('reviews retrieved', extra={'count': len(reviews), 'after_id': after_id})
+    return reviews, next_cursor
 
+@cached(CATALOGUE_CACHE_TTL, tags=_product_lists)
+@timed_query
 def getProductsByCategory(categoryId):
     """Get products by category ID"""
     connection = None
     cursor = None
     try:
-        print(f"🔍 DB: Getting products for category {categoryId}")
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
@@ -176,25 +194,24 @@ def getProductsByCategory(categoryId):
                 'discount': float(row['discount']) if row['discount'] else 0
             })
         
-        print(f"✅ DB: Retrieved {len(products)} products for category {categoryId}")
+        log.debug('products retrieved', extra={'count': len(products), 'category': categoryId})
         return products
         
-    except Exception as e:
-        print(f"❌ DB Error in getProductsByCategory: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception('getProductsByCategory failed', extra={'category': categoryId})
         return []
     finally:
         if cursor:
             cursor.close()
         close_connection(connection)
 
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
 def getReviewsByProduct(productId):
     """Get reviews by product ID"""
     connection = None
     cursor = None
     try:
-        print(f"🔍 DB: Getting reviews for product {productId}")
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
@@ -212,25 +229,24 @@ def getReviewsByProduct(productId):
                 'productId': int(row['productId']) if row['productId'] else 0
             })
         
-        print(f"✅ DB: Retrieved {len(reviews)} reviews for product {productId}")
+        log.debug('reviews retrieved', extra={'count': len(reviews), 'product': productId})
         return reviews
         
-    except Exception as e:
-        print(f"❌ DB Error in getReviewsByProduct: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception('getReviewsByProduct failed', extra={'product': productId})
         return []
     finally:
         if cursor:
             cursor.close()
         close_connection(connection)
 
+@cached(CATALOGUE_CACHE_TTL, tags=_product_lists)
+@timed_query
 def getReviewsByCategory(categoryId):
     """Get reviews by category ID"""
     connection = None
     cursor = None
     try:
-        print(f"🔍 DB: Getting reviews for category {categoryId}")
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
@@ -253,69 +269,157 @@ def getReviewsByCategory(categoryId):
                 'productId': int(row['productId']) if row['productId'] else 0
             })
         
-        print(f"✅ DB: Retrieved {len(reviews)} reviews for category {categoryId}")
+        log.debug('reviews retrieved', extra={'count': len(reviews), 'category': categoryId})
         return reviews
         
-    except Exception as e:
-        print(f"❌ DB Error in getReviewsByCategory: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception('getReviewsByCategory failed', extra={'category': categoryId})
         return []
     finally:
         if cursor:
             cursor.close()
         close_connection(connection)
 
+SENTIMENT_BY_PRODUCT_QUERY = "SELECT productId, sentiment_positive, sentiment_negative, sentiment_neutral FROM prediction WHERE productId = %s"
+
+def _prediction_row(row):
+    return {
+        'productId': int(row['productId']),
+        'sentiment_positive': float(row['sentiment_positive']),
+        'sentiment_negative': float(row['sentiment_negative']),
+        'sentiment_neutral': float(row['sentiment_neutral'])
+    }
+
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
 def getSentimentByProduct(productId):
     """Get sentiment analysis by product ID"""
     connection = None
     cursor = None
     try:
-        print(f"🔍 DB: Getting sentiment for product {productId}")
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
         # Query data sentiment dari tabel prediction
-        query = "SELECT productId, sentiment_positive, sentiment_negative, sentiment_neutral FROM prediction WHERE productId = %s"
-        cursor.execute(query, (productId,))
+        cursor.execute(SENTIMENT_BY_PRODUCT_QUERY, (productId,))
         
         results = cursor.fetchall()
-        print(f"🔍 DEBUG: Found {len(results)} sentiment records for product {productId}")
         
         if not results:
-            print(f"⚠️ No sentiment data found for product {productId}")
+            log.debug('no sentiment data', extra={'product': productId})
             return []
         
-        sentiments = []
-        for row in results:
-            sentiment_data = {
-                'productId': int(row['productId']),
-                'sentiment_positive': float(row['sentiment_positive']),
-                'sentiment_negative': float(row['sentiment_negative']),
-                'sentiment_neutral': float(row['sentiment_neutral'])
-            }
-            sentiments.append(sentiment_data)
-            print(f"✅ Retrieved sentiment: {sentiment_data}")
-        
-        print(f"✅ DB: Retrieved {len(sentiments)} sentiment records for product {productId}")
+        sentiments = [_prediction_row(row) for row in results]
+        log.debug('sentiment retrieved', extra={'count': len(sentiments), 'product': productId})
         return sentiments
         
-    except Exception as e:
-        print(f"❌ DB Error in getSentimentByProduct: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception('getSentimentByProduct failed', extra={'product': productId})
         return []
     finally:
         if cursor:
             cursor.close()
         close_connection(connection)
 
+# Bucket waktu untuk getSentimentTimeline (ekspresi atas kolom day di sentiment_daily)
+SENTIMENT_BUCKETS = {
+    'day': "day",
+    'week': "DATE_SUB(day, INTERVAL WEEKDAY(day) DAY)",
+    # %% karena query dijalankan dengan parameter
+    'month': "DATE_FORMAT(day, '%%Y-%%m-01')",
+}
+
+def _sentiment_row(row):
+    total = int(row['sentiment_positive']) + int(row['sentiment_negative']) + int(row['sentiment_neutral'])
+    result = {
+        'sentiment_positive': int(row['sentiment_positive']),
+        'sentiment_negative': int(row['sentiment_negative']),
+        'sentiment_neutral': int(row['sentiment_neutral']),
+    }
+    if 'confidence_sum' in row:
+        # Rata-rata probabilitas label terpilih
+        result['avg_confidence'] = round(float(row['confidence_sum']) / total / PROBABILITY_SCALE, 4) if total else 0.0
+    return result
+
+def _day_window(start, end):
+    conditions = []
+    params = []
+    if start is not None:
+        conditions.append("day >= %s")
+        params.append(start)
+    if end is not None:
+        conditions.append("day <= %s")
+        params.append(end)
+    return ''.join(f" AND {condition}" for condition in conditions), params
+
+def _fetch_sentiment(query, params):
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+def _sentiment_window_query(productId, start, end):
+    window, params = _day_window(start, end)
+    return f"""
+        SELECT COALESCE(SUM(sentiment_positive), 0) AS sentiment_positive,
+               COALESCE(SUM(sentiment_negative), 0) AS sentiment_negative,
+               COALESCE(SUM(sentiment_neutral), 0) AS sentiment_neutral,
+               COALESCE(SUM(confidence_sum), 0) AS confidence_sum
+        FROM sentiment_daily WHERE productId = %s{window}
+    """, [productId, *params]
+
+def _sentiment_timeline_query(productId, start, end, bucket):
+    period = SENTIMENT_BUCKETS[bucket]
+    window, params = _day_window(start, end)
+    return f"""
+        SELECT {period} AS period,
+               SUM(sentiment_positive) AS sentiment_positive,
+               SUM(sentiment_negative) AS sentiment_negative,
+               SUM(sentiment_neutral) AS sentiment_neutral,
+               SUM(confidence_sum) AS confidence_sum
+        FROM sentiment_daily WHERE productId = %s{window}
+        GROUP BY period ORDER BY period
+    """, [productId, *params]
+
+SENTIMENT_RATING_QUERY = """
+    SELECT rating, sentiment_positive, sentiment_negative, sentiment_neutral, confidence_sum
+    FROM sentiment_rating WHERE productId = %s ORDER BY rating
+"""
+
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
+def getSentimentInWindow(productId, start=None, end=None):
+    """Sentiment counts of reviews dated start..end (inclusive dates), summed from sentiment_daily"""
+    rows = _fetch_sentiment(*_sentiment_window_query(productId, start, end))
+    return [{'productId': int(productId), **_sentiment_row(row)} for row in rows]
+
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
+def getSentimentTimeline(productId, start=None, end=None, bucket='day'):
+    """Sentiment counts per day/week/month, oldest first"""
+    rows = _fetch_sentiment(*_sentiment_timeline_query(productId, start, end, bucket))
+    return [{'period': str(row['period']), **_sentiment_row(row)} for row in rows]
+
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
+def getSentimentByRating(productId):
+    """Sentiment counts per star rating"""
+    rows = _fetch_sentiment(SENTIMENT_RATING_QUERY, [productId])
+    return [{'rating': int(row['rating']), **_sentiment_row(row)} for row in rows]
+
+@timed_query
 def getAllProductsByName(name):
     """Search products by name"""
     connection = None
     cursor = None
     try:
-        print(f"🔍 DB: Searching products by name: {name}")
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
@@ -337,19 +441,19 @@ def getAllProductsByName(name):
                 'discount': float(row['discount']) if row['discount'] else 0
             })
         
-        print(f"✅ DB: Found {len(products)} products with name '{name}'")
+        log.debug('products found by name', extra={'count': len(products), 'query': name})
         return products
         
-    except Exception as e:
-        print(f"❌ DB Error in getAllProductsByName: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception('getAllProductsByName failed', extra={'query': name})
         return []
     finally:
         if cursor:
             cursor.close()
         close_connection(connection)
 
+@cached(CATALOGUE_CACHE_TTL, tags=_one_product)
+@timed_query
 def getProductById(productId):
     """Get single product by ID"""
     connection = None
@@ -376,9 +480,513 @@ def getProductById(productId):
         return None
         
     except Exception as e:
-        print(f"❌ Error in getProductById: {e}")
+        log.error('getProductById failed', extra={'product': productId, 'error': str(e)})
         return None
     finally:
         if cursor:
             cursor.close()
         close_connection(connection)
+
+PRODUCT_COLUMNS = "id, name, currentPrice, originalPrice, imgUrl, stock, categoryId, discount"
+
+def _product_row(row):
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'currentPrice': float(row['currentPrice']) if row['currentPrice'] else 0,
+        'originalPrice': float(row['originalPrice']) if row['originalPrice'] else 0,
+        'imgUrl': row['imgUrl'] or '',
+        'stock': int(row['stock']) if row['stock'] else 0,
+        'categoryId': int(row['categoryId']) if row['categoryId'] else 0,
+        'discount': float(row['discount']) if row['discount'] else 0
+    }
+
+REVIEW_COLUMNS = "id, review, rating, tanggal, productId"
+
+def _review_row(row):
+    return {
+        'id': row['id'],
+        'review': row['review'] or '',
+        'rating': int(row['rating']) if row['rating'] else 0,
+        'tanggal': str(row['tanggal']) if row['tanggal'] else '',
+        'productId': int(row['productId']) if row['productId'] else 0
+    }
+
+@timed_query
+def iterProducts(batch_size=1000, after_id=0):
+    """
+    Every product (with id > after_id) ordered by id, read page by page with
+    keyset pagination (WHERE id > last_id), so the whole catalogue is covered
+    without LIMIT truncation and only one page is held at a time.
+    """
+    last_id = after_id
+    while True:
+        connection = None
+        cursor = None
+        try:
+            connection = get_db_connection()
+            cursor = connection.cursor(dictionary=True)
+            query = f"SELECT {PRODUCT_COLUMNS} FROM product WHERE id > %s ORDER BY id LIMIT %s"
+            cursor.execute(query, (last_id, batch_size))
+            rows = cursor.fetchall()
+        finally:
+            if cursor:
+                cursor.close()
+            close_connection(connection)
+
+        for row in rows:
+            yield _product_row(row)
+        if len(rows) < batch_size:
+            break
+        last_id = rows[-1]['id']
+
+@timed_query
+def getProductStats():
+    """(count, max id) of the product table, a cheap staleness check for in-memory indexes"""
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM product")
+        count, max_id = cursor.fetchone()
+        return int(count), int(max_id)
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+@timed_query
+def searchProductsFulltext(query, limit=20):
+    """
+    Products matching a MySQL BOOLEAN MODE full-text query on name, best
+    match first. Needs the ft_product_name index (db.schema.ensure_fulltext_index).
+    """
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        sql = f"""
+        SELECT {PRODUCT_COLUMNS}, MATCH(name) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM product
+        WHERE MATCH(name) AGAINST (%s IN BOOLEAN MODE)
+        ORDER BY score DESC, id
+        LIMIT %s
+        """
+        cursor.execute(sql, (query, query, limit))
+        return [_product_row(row) for row in cursor.fetchall()]
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+def streamQuery(query, params=(), convert=None, batch_size=1000):
+    """
+    Yield rows of `query` through an unbuffered (server-side) cursor,
+    fetching batch_size rows at a time, so memory does not grow with the
+    result size. The connection is held until the generator finishes or
+    is closed.
+    """
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        cursor.execute(query, tuple(params))
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield convert(row) if convert else row
+
+    finally:
+        if connection is not None and connection.unread_result:
+            # Generator dihentikan sebelum semua baris terbaca
+            connection.consume_results()
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+@timed_query
+def iterReviewsOrderedByProduct(batch_size=1000, after_id=None, until_id=None):
+    """
+    Stream reviews ordered by productId, batch_size rows at a time. Memory
+    use depends on batch_size, not on the size of the review table.
+    after_id/until_id restrict the stream to reviews with
+    after_id < id <= until_id.
+    """
+    conditions = []
+    params = []
+    if after_id is not None:
+        conditions.append("id > %s")
+        params.append(after_id)
+    if until_id is not None:
+        conditions.append("id <= %s")
+        params.append(until_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    # Tanpa filter, ORDER BY productId, id dilayani index fk_product_id tanpa filesort
+    query = f"SELECT id, productId, review, rating, tanggal FROM review {where} ORDER BY productId, id"
+    return streamQuery(query, params, batch_size=batch_size)
+
+@timed_query
+def streamAllProducts(after_id=None, batch_size=1000):
+    query = f"SELECT {PRODUCT_COLUMNS} FROM product WHERE id > %s ORDER BY id"
+    return streamQuery(query, (after_id or 0,), _product_row, batch_size)
+
+@timed_query
+def streamAllReviews(after_id=None, batch_size=1000):
+    query = f"SELECT {REVIEW_COLUMNS} FROM review WHERE id > %s ORDER BY id"
+    return streamQuery(query, (after_id or 0,), _review_row, batch_size)
+
+@timed_query
+def streamReviewsByCategory(categoryId, batch_size=1000):
+    """Every review of a category (no LIMIT), streamed"""
+    query = """
+    SELECT rv.id, rv.review, rv.rating, rv.tanggal, rv.productId FROM product pr
+    JOIN review rv ON rv.productId = pr.id
+    WHERE pr.categoryId = %s
+    """
+    return streamQuery(query, (categoryId,), _review_row, batch_size)
+
+@timed_query
+def getMaxReviewId():
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM review")
+        return int(cursor.fetchone()[0])
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+@timed_query
+def getEtlState(name):
+    """High-water mark of an ETL job, or None if the job never finished a run"""
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT name, last_review_id, updated_at FROM etl_state WHERE name = %s", (name,))
+        return cursor.fetchone()
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+def _set_etl_state(cursor, name, last_review_id):
+    cursor.execute("""
+        INSERT INTO etl_state (name, last_review_id, updated_at) VALUES (%s, %s, NOW())
+        ON DUPLICATE KEY UPDATE last_review_id = VALUES(last_review_id), updated_at = VALUES(updated_at)
+    """, (name, last_review_id))
+
+@timed_query
+def setEtlState(name, last_review_id):
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        _set_etl_state(cursor, name, last_review_id)
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+@timed_query
+def clearEtlState(name):
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM etl_state WHERE name = %s", (name,))
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+# Probabilitas disimpan sebagai SMALLINT: nilai x PROBABILITY_SCALE
+PROBABILITY_SCALE = 10000
+
+UPSERT_REVIEW_SENTIMENT = """
+INSERT INTO {table} (reviewId, productId, rating, tanggal, label, p_negative, p_neutral, p_positive)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    productId = VALUES(productId),
+    rating = VALUES(rating),
+    tanggal = VALUES(tanggal),
+    label = VALUES(label),
+    p_negative = VALUES(p_negative),
+    p_neutral = VALUES(p_neutral),
+    p_positive = VALUES(p_positive)
+"""
+
+@timed_query
+def upsertReviewSentiments(rows, table='review_sentiment'):
+    """
+    Write per-review predictions, (reviewId, productId, rating, tanggal,
+    label, p_negative, p_neutral, p_positive) tuples. Keyed on reviewId, so
+    rescoring a review overwrites its row instead of adding a second one.
+    """
+    if not rows:
+        return 0
+
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.executemany(UPSERT_REVIEW_SENTIMENT.format(table=table), rows)
+        return len(rows)
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+# Tabel rollup dari review_sentiment: (kolom key, ekspresi GROUP BY, punya confidence_sum)
+SENTIMENT_ROLLUPS = {
+    'prediction': ('productId', 'productId', False),
+    'sentiment_daily': ('productId, day', 'productId, DATE(tanggal)', True),
+    'sentiment_rating': ('productId, rating', 'productId, rating', True),
+}
+
+ROLLUP_SENTIMENT = """
+INSERT INTO {table} ({keys}, sentiment_positive, sentiment_negative, sentiment_neutral{confidence_column})
+SELECT {group}, SUM(label = 2), SUM(label = 0), SUM(label = 1){confidence_value}
+FROM {source} {where}
+GROUP BY {group}
+ON DUPLICATE KEY UPDATE
+    sentiment_positive = sentiment_positive + VALUES(sentiment_positive),
+    sentiment_negative = sentiment_negative + VALUES(sentiment_negative),
+    sentiment_neutral = sentiment_neutral + VALUES(sentiment_neutral){confidence_update}
+"""
+
+def _rollup_query(table, suffix, where):
+    keys, group, confidence = SENTIMENT_ROLLUPS[table]
+    return ROLLUP_SENTIMENT.format(
+        table=f"{table}{suffix}",
+        keys=keys,
+        group=group,
+        source=f"review_sentiment{suffix}",
+        where=where,
+        confidence_column=', confidence_sum' if confidence else '',
+        confidence_value=', SUM(GREATEST(p_negative, p_neutral, p_positive))' if confidence else '',
+        confidence_update=',\n    confidence_sum = confidence_sum + VALUES(confidence_sum)' if confidence else '',
+    )
+
+@timed_query
+def rollupSentiment(suffix='', after_id=None, until_id=None, state_name=None):
+    """
+    Add the review_sentiment rows with after_id < reviewId <= until_id to
+    every rollup table (prediction, sentiment_daily, sentiment_rating) and
+    move the ETL high-water mark, in one transaction. With a suffix such as
+    '_staging' the staging copies of all these tables are used instead.
+
+    Rows are upserted per review before this runs, so a run that failed
+    before its rollup can be repeated without counting a review twice.
+    """
+    conditions = []
+    params = []
+    if after_id is not None:
+        conditions.append("reviewId > %s")
+        params.append(after_id)
+    if until_id is not None:
+        conditions.append("reviewId <= %s")
+        params.append(until_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        connection.start_transaction()
+        cursor = connection.cursor()
+        for table in SENTIMENT_ROLLUPS:
+            cursor.execute(_rollup_query(table, suffix, where), params)
+        if state_name is not None:
+            _set_etl_state(cursor, state_name, until_id)
+        connection.commit()
+    except Exception:
+        if connection is not None:
+            connection.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+# Fingerprint himpunan review sebuah product: (jumlah, id terbesar, XOR dari CRC32 setiap id).
+# Review baru mengubah jumlah dan id terbesar; checksum menangkap review yang dihapus lalu diganti.
+REVIEW_FINGERPRINT_COLUMNS = "COUNT(*), COALESCE(MAX(id), 0), COALESCE(BIT_XOR(CRC32(id)), 0)"
+
+def _fingerprint(row):
+    return (int(row[0]), int(row[1]), int(row[2]))
+
+@timed_query
+def getReviewFingerprint(productId):
+    """(count, max_id, checksum) of the reviews of one product, read from the productId index"""
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT {REVIEW_FINGERPRINT_COLUMNS} FROM review WHERE productId = %s", (productId,))
+        return _fingerprint(cursor.fetchone())
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+def _in_clause(values):
+    """'IN (%s, %s, ...)' and its parameters for a non-empty list of ids"""
+    values = [int(value) for value in values]
+    return f"IN ({', '.join(['%s'] * len(values))})", tuple(values)
+
+@timed_query
+def getReviewFingerprints(productIds=None):
+    """
+    {productId: fingerprint} in one grouped query, for every product that
+    has reviews or only for `productIds` (products without reviews are absent)
+    """
+    if productIds is not None and not productIds:
+        return {}
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        if productIds is None:
+            cursor.execute(f"SELECT productId, {REVIEW_FINGERPRINT_COLUMNS} FROM review GROUP BY productId")
+        else:
+            clause, params = _in_clause(productIds)
+            cursor.execute(f"SELECT productId, {REVIEW_FINGERPRINT_COLUMNS} FROM review WHERE productId {clause} GROUP BY productId", params)
+        return {int(row[0]): _fingerprint(row[1:]) for row in cursor.fetchall()}
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+@timed_query
+def getStoredSummary(productId):
+    """Stored summary row of a product ({'fingerprint', 'summary', 'updated_at'}) or None"""
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT review_count, max_review_id, id_checksum, summary, updated_at
+            FROM review_summary WHERE productId = %s
+        """, (productId,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return {'fingerprint': _fingerprint(row[:3]), 'summary': row[3], 'updated_at': row[4]}
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+@timed_query
+def getStoredSummaries(productIds):
+    """{productId: {'fingerprint', 'summary'}} of the stored summaries of `productIds`, in one query"""
+    if not productIds:
+        return {}
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        clause, params = _in_clause(productIds)
+        cursor.execute(f"""
+            SELECT productId, review_count, max_review_id, id_checksum, summary
+            FROM review_summary WHERE productId {clause}
+        """, params)
+        return {int(row[0]): {'fingerprint': _fingerprint(row[1:4]), 'summary': row[4]} for row in cursor.fetchall()}
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+@timed_query
+def getStoredSummaryFingerprints():
+    """{productId: fingerprint} of every stored summary"""
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("SELECT productId, review_count, max_review_id, id_checksum FROM review_summary")
+        return {int(row[0]): _fingerprint(row[1:]) for row in cursor.fetchall()}
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+UPSERT_SUMMARY = """
+INSERT INTO review_summary (productId, review_count, max_review_id, id_checksum, summary, updated_at)
+VALUES (%s, %s, %s, %s, %s, NOW())
+ON DUPLICATE KEY UPDATE
+    review_count = VALUES(review_count),
+    max_review_id = VALUES(max_review_id),
+    id_checksum = VALUES(id_checksum),
+    summary = VALUES(summary),
+    updated_at = VALUES(updated_at)
+"""
+
+def saveSummary(productId, fingerprint, summary):
+    saveSummaries([(productId, fingerprint, summary)])
+
+@timed_query
+def saveSummaries(summaries):
+    """Upsert (productId, fingerprint, summary) tuples in one executemany"""
+    if not summaries:
+        return 0
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.executemany(UPSERT_SUMMARY, [(productId, *fingerprint, summary) for productId, fingerprint, summary in summaries])
+        return len(summaries)
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
+
+# Sama dengan LIMIT pada getReviewsByProduct
+REVIEWS_PER_PRODUCT = 1000
+
+@timed_query
+def getReviewsByProducts(productIds, per_product=REVIEWS_PER_PRODUCT):
+    """
+    {productId: [review rows]} for several products from one
+    WHERE productId IN (...) query, at most `per_product` reviews each
+    """
+    if not productIds:
+        return {}
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        clause, params = _in_clause(productIds)
+        cursor.execute(f"SELECT {REVIEW_COLUMNS} FROM review WHERE productId {clause} ORDER BY productId, id", params)
+        reviews = {int(productId): [] for productId in productIds}
+        for row in cursor:
+            rows = reviews[int(row['productId'])]
+            if len(rows) < per_product:
+                rows.append(_review_row(row))
+        return reviews
+    finally:
+        if cursor:
+            cursor.close()
+        close_connection(connection)
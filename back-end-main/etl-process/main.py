@@ -1,53 +1,217 @@
 import sys
 import os
-import pandas as pd
+import argparse
+import queue
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from db.setup import *
-from db.util import getAllProduct, getReviewsByProduct, getAllReview
-from ai_model.predict import predict_batch_sentiment
+import numpy as np
+from db.util import (
+  iterReviewsOrderedByProduct, getMaxReviewId, getEtlState, setEtlState, clearEtlState,
+  upsertReviewSentiments, rollupSentiment, SENTIMENT_ROLLUPS, PROBABILITY_SCALE
+)
+from db.schema import ensure_tables, has_primary_key, create_staging_table, swap_tables
+from db.cache import invalidate, invalidate_all
+from monitoring.logs import configure_logging
+from ai_model.util import (
+  preprocess_batch_with_stems, init_stem_tracking, default_batch_size, stem_cache, save_stem_cache
+)
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
 
 load_dotenv()
 
-# MYSQL connection URL
-DATABASE_URL = f'mysql+pymysql://{os.getenv("DB_USERNAME")}:{os.getenv("DB_PASSWORD")}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}'
-
-all_products = getAllProduct()
-all_products = pd.DataFrame.from_dict(all_products)
-all_products = all_products[['id']]
-
-all_reviews = getAllReview()
-all_reviews = pd.DataFrame.from_dict(all_reviews)
-corpus = all_reviews[['review']]
-
-prediction_reports = []
-
-for productId in all_products['id']:
-    reviews = getReviewsByProduct(productId)
-    if len(reviews) != 0:
-        reviews = pd.DataFrame.from_dict(reviews)
-        reviews = reviews['review']
-        prediction_report = predict_batch_sentiment(corpus, reviews)
-        prediction_report['productId'] = productId
-        prediction_reports.append(prediction_report)
-    
-
-engine = create_engine(DATABASE_URL)
-prediction_reports = pd.DataFrame.from_dict(prediction_reports)
-prediction_reports = prediction_reports.drop('Unnamed: 0', axis=1)
-prediction_reports.rename(
-  columns={
-    'positive': 'sentiment_positive',
-    'negative': 'sentiment_negative',
-    'neutral': 'sentiment_neutral'
-  },
-  inplace=True
-)
-prediction_reports.to_sql('prediction', engine, if_exists='append', index=False)
+log = logging.getLogger(__name__)
+
+# Jumlah baris prediksi per INSERT
+WRITE_BATCH_SIZE = 500
+# Nama high-water mark ETL ini pada tabel etl_state. Berbeda dari nama lama
+# ('sentiment_prediction') sehingga run pertama setelah upgrade otomatis full
+# dan mengisi review_sentiment beserta rollup-nya untuk seluruh review.
+STATE_NAME = 'review_sentiment'
+# Tabel hasil ETL: baris per review dan rollup-nya (prediction, sentiment_daily, sentiment_rating)
+SENTIMENT_TABLES = ['review_sentiment', *SENTIMENT_ROLLUPS]
+# Full run menulis ke salinan <tabel>_staging lalu menukar semuanya sekaligus
+STAGING_SUFFIX = '_staging'
+# Sentinel akhir stream pada antrean worker
+_END = object()
+
+
+def stream_review_batches(batch_size, after_id=None, until_id=None):
+  """Batches of at most batch_size reviews, in productId order, from one server-side cursor"""
+  batch = []
+  for row in iterReviewsOrderedByProduct(batch_size, after_id, until_id):
+    batch.append(row)
+    if len(batch) == batch_size:
+      yield batch
+      batch = []
+  if batch:
+    yield batch
+
+
+def parallel_preprocess(batches, workers, queue_size=None):
+  """
+  Preprocess review batches on a pool of worker processes.
+
+  A producer thread reads batches and submits them to the pool; the
+  caller (the single inference consumer) receives (batch, preprocessed
+  texts) in the original stream order. The bounded queue caps how many
+  batches are in flight, so memory stays proportional to
+  workers x batch size. Stems learned by the workers are merged into
+  the parent's stem cache so save_stem_cache() persists them.
+  """
+  pending = queue.Queue(maxsize=queue_size or workers * 2)
+  stop = threading.Event()
+
+  def put(item):
+    while not stop.is_set():
+      try:
+        pending.put(item, timeout=0.5)
+        return True
+      except queue.Full:
+        continue
+    return False
+
+  # spawn: worker tidak mewarisi TensorFlow/model dari proses utama
+  context = multiprocessing.get_context('spawn')
+  with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_stem_tracking) as executor:
+    def produce():
+      try:
+        for batch in batches:
+          future = executor.submit(preprocess_batch_with_stems, [row['review'] for row in batch])
+          if not put((batch, future)):
+            return
+        put((_END, None))
+      except BaseException as e:
+        put((_END, e))
+
+    producer = threading.Thread(target=produce, name='etl-producer', daemon=True)
+    producer.start()
+    try:
+      while True:
+        batch, item = pending.get()
+        if batch is _END:
+          if item is not None:
+            raise item
+          break
+        preprocessed, new_stems = item.result()
+        stem_cache.update(new_stems)
+        yield batch, preprocessed
+    finally:
+      stop.set()
+      producer.join()
+
+
+def predicted_batches(batch_size, after_id=None, until_id=None, workers=0):
+  """(batch, class probabilities) pairs in stream order, preprocessing in-process or on workers"""
+  from ai_model.predict import predict_batch_sentiment
+
+  batches = stream_review_batches(batch_size, after_id, until_id)
+  if workers <= 0:
+    for batch in batches:
+      yield batch, predict_batch_sentiment([row['review'] for row in batch], batch_size)['probabilities']
+    return
+
+  for batch, preprocessed in parallel_preprocess(batches, workers):
+    yield batch, predict_batch_sentiment(preprocessed, batch_size, preprocessed=True)['probabilities']
+
+
+def sentiment_rows(batch_size, after_id=None, until_id=None, workers=0):
+  """
+  Yield one review_sentiment row per review: (reviewId, productId, rating,
+  tanggal, label, p_negative, p_neutral, p_positive), label being the
+  mapped_class index and probabilities scaled to PROBABILITY_SCALE.
+  """
+  for batch, probabilities in predicted_batches(batch_size, after_id, until_id, workers):
+    labels = np.argmax(probabilities, axis=1)
+    scaled = np.rint(np.asarray(probabilities) * PROBABILITY_SCALE).astype(int)
+    for row, label, (negative, neutral, positive) in zip(batch, labels, scaled):
+      yield (row['id'], row['productId'], row['rating'], row['tanggal'], int(label), int(negative), int(neutral), int(positive))
+
+
+def write_sentiment_rows(rows, table='review_sentiment', write_batch_size=WRITE_BATCH_SIZE):
+  """Upsert rows in batches; returns the set of productIds written"""
+  pending = []
+  products = set()
+  for row in rows:
+    pending.append(row)
+    products.add(row[1])
+    if len(pending) == write_batch_size:
+      upsertReviewSentiments(pending, table)
+      pending = []
+  if pending:
+    upsertReviewSentiments(pending, table)
+  return products
+
+
+def run_full(batch_size, workers=0):
+  """
+  Rescore every review into staging copies of review_sentiment and its
+  rollups, then swap all of them in with one RENAME TABLE. Readers keep
+  seeing the previous data until the swap, and a crash leaves the live
+  tables untouched.
+  """
+  until_id = getMaxReviewId()
+  # Hapus high-water mark dulu: jika run ini gagal sebelum selesai, run berikutnya kembali full
+  clearEtlState(STATE_NAME)
+  for table in SENTIMENT_TABLES:
+    create_staging_table(table, table + STAGING_SUFFIX)
+
+  products = write_sentiment_rows(
+    sentiment_rows(batch_size, until_id=until_id, workers=workers), 'review_sentiment' + STAGING_SUFFIX
+  )
+  rollupSentiment(STAGING_SUFFIX)
+  # Tabel lama (termasuk tabel to_sql tanpa primary key) diganti seluruhnya
+  swap_tables([(table, table + STAGING_SUFFIX) for table in SENTIMENT_TABLES])
+  setEtlState(STATE_NAME, until_id)
+  # Seluruh tabel sentimen berganti; hanya berpengaruh ke server bila CACHE_BACKEND=redis (cache bersama)
+  invalidate_all()
+  log.info('full sentiment ETL finished', extra={'products': len(products), 'until_id': until_id})
+
+
+def run_incremental(batch_size, workers=0):
+  """Score only reviews newer than the high-water mark and add them to the rollups"""
+  state = getEtlState(STATE_NAME)
+  if state is None or not has_primary_key('prediction'):
+    log.warning('no previous sentiment ETL run recorded, running a full pass')
+    return run_full(batch_size, workers)
+
+  after_id = state['last_review_id']
+  until_id = getMaxReviewId()
+  if until_id <= after_id:
+    log.info('no new reviews', extra={'after_id': after_id})
+    return
 
+  # Baris per review di-upsert dulu (idempoten), lalu rollup + high-water mark dalam satu transaksi
+  products = write_sentiment_rows(sentiment_rows(batch_size, after_id, until_id, workers))
+  rollupSentiment(after_id=after_id, until_id=until_id, state_name=STATE_NAME)
+  for productId in products:
+    invalidate(productId)
+  log.info('incremental sentiment ETL finished', extra={
+    'products': len(products), 'after_id': after_id, 'until_id': until_id
+  })
 
 
+def run(batch_size=default_batch_size, full=False, workers=0):
+  ensure_tables('etl_state', *SENTIMENT_TABLES)
+  if full:
+    run_full(batch_size, workers)
+  else:
+    run_incremental(batch_size, workers)
 
+  # Pada mode worker, hit/miss dihitung di worker; cache induk berisi hasil merge
+  log.info('stem cache', extra=stem_cache.stats())
+  path = save_stem_cache()
+  if path:
+    log.info('stem cache saved', extra={'path': path})
 
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Score review sentiment per review and update the sentiment rollups')
+  parser.add_argument('--batch-size', type=int, default=default_batch_size, help='reviews per inference batch')
+  parser.add_argument('--full', action='store_true', help='rescore every review instead of only new ones')
+  parser.add_argument('--workers', type=int, default=0, help='preprocessing worker processes (0 = in-process, 1 or more = process pool)')
+  args = parser.parse_args()
 
+  configure_logging()
+  run(args.batch_size, args.full, args.workers)
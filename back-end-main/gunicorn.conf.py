@@ -0,0 +1,52 @@
+import os
+import fcntl
+import multiprocessing
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# gunicorn -c gunicorn.conf.py wsgi:app
+bind = os.getenv('WEB_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_WORKERS', str(min(4, multiprocessing.cpu_count()))))
+threads = int(os.getenv('WEB_THREADS', '4'))
+worker_class = 'gthread'
+# LexRank dan rekomendasi pada product besar bisa lebih dari 30 detik default
+timeout = int(os.getenv('WEB_TIMEOUT', '120'))
+# wsgi.py (model, tokenizer, index, stopwords) dimuat sekali di master lalu dibagi copy-on-write
+preload_app = True
+# Worker diganti secara berkala agar fragmentasi heap tidak menumpuk (0 = nonaktif)
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+# Hanya satu worker yang menjalankan precompute rangkuman di latar (SUMMARY_PRECOMPUTE_SECONDS)
+PRECOMPUTE_LOCK_PATH = os.getenv('SUMMARY_PRECOMPUTE_LOCK', '/tmp/yapin-summary-precompute.lock')
+_precompute_lock = None
+
+
+def _claim_precompute():
+    """True in the one worker holding the lock; it is released when that worker exits"""
+    global _precompute_lock
+    fd = os.open(PRECOMPUTE_LOCK_PATH, os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return False
+    _precompute_lock = fd
+    return True
+
+
+def post_fork(server, worker):
+    # Koneksi dan thread milik master tidak boleh dipakai ulang di worker
+    from db.util import reset_connection_pool
+    from main import start_memory_monitor, start_summary_precompute
+    reset_connection_pool()
+    start_memory_monitor()
+    if _claim_precompute():
+        start_summary_precompute()
+
+
+def post_worker_init(worker):
+    # Berjalan sebelum worker menerima request
+    from wsgi import warmup
+    warmup()
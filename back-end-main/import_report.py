@@ -0,0 +1,75 @@
+import sys
+import os
+import json
+import argparse
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Stack ML yang tidak boleh ikut terimport saat server start (dimuat oleh controller.lazy)
+HEAVY_MODULES = ['sklearn', 'pandas', 'nltk', 'tensorflow']
+
+
+def import_times(module):
+  """[(name, depth, self_us, cumulative_us)] for `import module`, from `python -X importtime`"""
+  result = subprocess.run(
+    [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+    cwd=BASE_DIR, capture_output=True, text=True
+  )
+  if result.returncode != 0:
+    raise RuntimeError(f'import {module} failed:\n{result.stderr[-2000:]}')
+  rows = []
+  for line in result.stderr.splitlines():
+    # import time: self [us] | cumulative | imported package
+    if not line.startswith('import time:') or 'imported package' in line:
+      continue
+    self_us, cumulative_us, name = line[len('import time:'):].split('|')
+    depth = (len(name) - len(name.lstrip(' '))) // 2
+    rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+  return rows
+
+
+def report(module, top=20):
+  rows = import_times(module)
+  loaded = {name for name, _, _, _ in rows}
+  return {
+    'module': module,
+    'total_seconds': round(sum(cumulative for _, depth, _, cumulative in rows if depth == 0) / 1e6, 3),
+    'modules_imported': len(rows),
+    'heavy_modules_imported': [name for name in HEAVY_MODULES if name in loaded],
+    'slowest': [
+      {'module': name, 'self_ms': round(self_us / 1000, 1), 'cumulative_ms': round(cumulative_us / 1000, 1)}
+      for name, _, self_us, cumulative_us in sorted(rows, key=lambda row: row[3], reverse=True)[:top]
+    ],
+  }
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Startup import time of the backend, per module (python -X importtime)')
+  parser.add_argument('--module', default='main', help='module to import (main, asgi, controller.fetch, ...)')
+  parser.add_argument('--top', type=int, default=20, help='number of slowest modules to list')
+  parser.add_argument('--json', action='store_true', help='machine-readable output for CI')
+  parser.add_argument('--max-seconds', type=float, help='exit 1 when the import takes longer than this')
+  parser.add_argument('--forbid-heavy', action='store_true',
+                      help=f'exit 1 when any of {", ".join(HEAVY_MODULES)} is imported at startup')
+  args = parser.parse_args()
+
+  result = report(args.module, args.top)
+  if args.json:
+    print(json.dumps(result, indent=2))
+  else:
+    print(f"import {result['module']}: {result['total_seconds']:.3f}s, {result['modules_imported']} modules")
+    print(f"heavy modules imported: {', '.join(result['heavy_modules_imported']) or 'none'}")
+    print(f"{'module':>40} | {'self ms':>8} | {'cumul. ms':>9}")
+    print('-' * 64)
+    for row in result['slowest']:
+      print(f"{row['module']:>40} | {row['self_ms']:8.1f} | {row['cumulative_ms']:9.1f}")
+
+  failed = False
+  if args.max_seconds is not None and result['total_seconds'] > args.max_seconds:
+    print(f"import {args.module} took {result['total_seconds']:.3f}s, budget is {args.max_seconds:.3f}s", file=sys.stderr)
+    failed = True
+  if args.forbid_heavy and result['heavy_modules_imported']:
+    print(f"import {args.module} loaded {', '.join(result['heavy_modules_imported'])} eagerly", file=sys.stderr)
+    failed = True
+  sys.exit(1 if failed else 0)
@@ -1,19 +1,27 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
-import traceback
 import sys
 import os
-import gc  # Garbage collector
+import time
+import logging
 
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from monitoring.logs import configure_logging, log_request
+from monitoring.metrics import REQUEST_SECONDS, CONTENT_TYPE, render_metrics
+from db.cache import cache_stats
+from monitoring.memory import memory_monitor, rss_mb
+from controller.params import parse_page_args, parse_stream_mode, parse_date_window, parse_fuzzy
+from controller.lazy import run_warmup, start_background_warmup
+
+configure_logging()
 
 try:
     from controller.fetch import *
-    print("✅ Controller imported successfully")
-except ImportError as e:
-    print(f"❌ Error importing controller: {e}")
-    traceback.print_exc()
+except ImportError:
+    logging.getLogger(__name__).exception('error importing controller')
+
+log = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
@@ -26,11 +34,7 @@ CORS(app,
 # ✅ Add error handler for all exceptions
 @app.errorhandler(Exception)
 def handle_exception(e):
-    print(f"❌ Unhandled exception: {e}")
-    traceback.print_exc()
-    
-    # Force garbage collection to free memory
-    gc.collect()
+    log.exception('unhandled exception')
     
     return jsonify({
         'error': True,
@@ -38,48 +42,49 @@ def handle_exception(e):
         'data': None
     }), 500
 
-# ✅ Add memory monitoring
-def log_memory_usage():
-    import psutil
-    process = psutil.Process(os.getpid())
-    memory_mb = process.memory_info().rss / 1024 / 1024
-    print(f"📊 Memory usage: {memory_mb:.1f} MB")
-
+# ✅ RSS dan GC dipantau oleh thread latar (monitoring/memory.py), bukan per request
 @app.before_request
 def before_request():
-    try:
-        # Log request info
-        print(f"📨 {request.method} {request.path}")
-        
-        # Check memory usage
-        import psutil
-        process = psutil.Process(os.getpid())
-        memory_mb = process.memory_info().rss / 1024 / 1024
-        
-        if memory_mb > 500:  # If memory > 500MB
-            print(f"⚠️ High memory usage: {memory_mb:.1f} MB - forcing garbage collection")
-            gc.collect()
-            
-    except Exception as e:
-        print(f"⚠️ Error in before_request: {e}")
+    g.request_started = time.perf_counter()
+
+def observe_request(method, path, route, status, started):
+    seconds = time.perf_counter() - started
+    REQUEST_SECONDS.observe(seconds, method=method, route=route, status=status)
+    log_request(method, path, status, seconds)
 
 @app.after_request
 def after_request(response):
-    try:
-        print(f"✅ {request.method} {request.path} - {response.status_code}")
-        
-        # Force garbage collection after each request
-        gc.collect()
-        
-    except Exception as e:
-        print(f"⚠️ Error in after_request: {e}")
-    
+    started = g.get('request_started')
+    if started is None:
+        return response
+    # Label route = pola URL (bukan path) agar jumlah series tetap kecil
+    args = (request.method, request.path, request.url_rule.rule if request.url_rule else 'unmatched', response.status_code, started)
+    if response.is_streamed:
+        # Respons streaming selesai saat body terakhir terkirim, bukan di sini
+        response.call_on_close(lambda: observe_request(*args))
+    else:
+        observe_request(*args)
     return response
 
+def get_page_args():
+    return parse_page_args(request.args)
+
+def get_stream_mode():
+    return parse_stream_mode(request.args)
+
+def get_date_window():
+    return parse_date_window(request.args)
+
+def invalid_query_args(e):
+    return jsonify({
+        'error': True,
+        'message': str(e),
+        'data': []
+    }), 400
+
 @app.route('/')
 def hello():
     try:
-        log_memory_usage()
         return jsonify({
             'error': False,
             'message': 'YAPin API is running!',
@@ -91,13 +96,13 @@ def hello():
                     '/getAllCategory', 
                     '/getAllReview',
                     '/getRecommendProducts',
-                    '/getReviewsSumOfProduct'
+                    '/getReviewsSumOfProduct',
+                    '/getReviewsSumOfProducts'
                 ]
             }
         })
     except Exception as e:
-        print(f"❌ Error in hello endpoint: {e}")
-        traceback.print_exc()
+        log.exception('error in hello endpoint')
         return jsonify({
             'error': True,
             'message': str(e),
@@ -107,29 +112,27 @@ def hello():
 @app.route('/getAllProduct', methods=['GET'])
 def fetchAllProduct():
     try:
-        print("📦 Fetching all products...")
-        log_memory_usage()
-        
-        response = getAllProducts()
-        
-        # Force cleanup after large data operations
-        gc.collect()
+        try:
+            after_id, limit = get_page_args()
+            stream = get_stream_mode()
+        except ValueError as e:
+            return invalid_query_args(e)
+        if stream:
+            return getAllProductsStream(after_id, stream)
+        response = getAllProducts(after_id, limit or PRODUCT_PAGE_SIZE)
         
-        print("✅ Products fetched successfully")
         return response
         
     except MemoryError:
-        print("❌ Memory error in fetchAllProduct - forcing cleanup")
-        gc.collect()
+        log.error('memory error in fetchAllProduct, forcing gc')
+        memory_monitor.collect('memory_error')
         return jsonify({
             'error': True,
             'message': 'Memory error - try again',
             'data': []
         }), 500
     except Exception as e:
-        print(f"❌ Error fetching products: {e}")
-        traceback.print_exc()
-        gc.collect()
+        log.exception('error fetching products')
         return jsonify({
             'error': True,
             'message': f'Error fetching products: {str(e)}',
@@ -139,15 +142,10 @@ def fetchAllProduct():
 @app.route('/getAllCategory', methods=['GET'])
 def fetchAllCategory():
     try:
-        print("📂 Fetching all categories...")
         response = getAllCategories()
-        gc.collect()
-        print("✅ Categories fetched successfully")
         return response
     except Exception as e:
-        print(f"❌ Error fetching categories: {e}")
-        traceback.print_exc()
-        gc.collect()
+        log.exception('error fetching categories')
         return jsonify({
             'error': True,
             'message': f'Error fetching categories: {str(e)}',
@@ -157,15 +155,17 @@ def fetchAllCategory():
 @app.route('/getAllReview', methods=['GET'])
 def fetchAllReview():
     try:
-        print("💬 Fetching all reviews...")
-        response = getAllReviews()
-        gc.collect()
-        print("✅ Reviews fetched successfully")
+        try:
+            after_id, limit = get_page_args()
+            stream = get_stream_mode()
+        except ValueError as e:
+            return invalid_query_args(e)
+        if stream:
+            return getAllReviewsStream(after_id, stream)
+        response = getAllReviews(after_id, limit or REVIEW_PAGE_SIZE)
         return response
     except Exception as e:
-        print(f"❌ Error fetching reviews: {e}")
-        traceback.print_exc()
-        gc.collect()
+        log.exception('error fetching reviews')
         return jsonify({
             'error': True,
             'message': f'Error fetching reviews: {str(e)}',
@@ -176,7 +176,6 @@ def fetchAllReview():
 def fetchAllProductsByCategory():
     try:
         categoryId = request.args.get('category')
-        print(f"🌐 API: Received request for category: {categoryId}")
         
         # Validation
         if not categoryId:
@@ -196,13 +195,11 @@ def fetchAllProductsByCategory():
             }), 400
         
         # Call controller function (returns dict)
-        print(f"🔄 API: Calling getAllProductsByCategory({categoryId})")
         response_dict = getAllProductsByCategory(categoryId)
-        print(f"🔄 API: Controller returned type: {type(response_dict)}")
         
         # Validate controller response
         if not isinstance(response_dict, dict):
-            print(f"❌ API: Invalid controller response type: {type(response_dict)}")
+            log.error('invalid controller response', extra={'type': type(response_dict).__name__})
             return jsonify({
                 'error': True,
                 'message': 'Internal server error: Invalid controller response',
@@ -211,20 +208,13 @@ def fetchAllProductsByCategory():
         
         # Check if controller returned error
         if response_dict.get('error', False):
-            print(f"❌ API: Controller error: {response_dict.get('message')}")
             return jsonify(response_dict), 500
         
-        # Success case
-        data_count = len(response_dict.get('data', []))
-        print(f"✅ API: Success with {data_count} products")
-        
         # Return success with jsonify
         return jsonify(response_dict), 200
         
     except Exception as e:
-        print(f"❌ API: Unexpected error in endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('error fetching products by category')
         
         return jsonify({
             'error': True,
@@ -236,7 +226,6 @@ def fetchAllProductsByCategory():
 def fetchAllReviewsByProduct():
     try:
         productId = request.args.get('product')
-        print(f"💬 Fetching reviews for product: {productId}")
         
         if not productId:
             return jsonify({
@@ -255,8 +244,6 @@ def fetchAllReviewsByProduct():
             }), 400
         
         response_data = getAllReviewsByProduct(productId)
-        gc.collect()
-        print("✅ Reviews by product fetched successfully")
         
         if response_data.get('error'):
             return jsonify(response_data), 500
@@ -264,9 +251,7 @@ def fetchAllReviewsByProduct():
             return jsonify(response_data), 200
         
     except Exception as e:
-        print(f"❌ Error fetching reviews by product: {e}")
-        traceback.print_exc()
-        gc.collect()
+        log.exception('error fetching reviews by product')
         return jsonify({
             'error': True,
             'message': f'Error fetching reviews by product: {str(e)}',
@@ -277,7 +262,6 @@ def fetchAllReviewsByProduct():
 def fetchAllReviewsByCategory():
     try:
         categoryId = request.args.get('category')
-        print(f"💬 Fetching reviews for category: {categoryId}")
         
         if not categoryId:
             return jsonify({
@@ -295,9 +279,14 @@ def fetchAllReviewsByCategory():
                 'data': []
             }), 400
         
+        try:
+            stream = get_stream_mode()
+        except ValueError as e:
+            return invalid_query_args(e)
+        if stream:
+            return getAllReviewsByCategoryStream(categoryId, stream)
+
         response_data = getAllReviewsByCategory(categoryId)
-        gc.collect()
-        print("✅ Reviews by category fetched successfully")
         
         if response_data.get('error'):
             return jsonify(response_data), 500
@@ -305,9 +294,7 @@ def fetchAllReviewsByCategory():
             return jsonify(response_data), 200
         
     except Exception as e:
-        print(f"❌ Error fetching reviews by category: {e}")
-        traceback.print_exc()
-        gc.collect()
+        log.exception('error fetching reviews by category')
         return jsonify({
             'error': True,
             'message': f'Error fetching reviews by category: {str(e)}',
@@ -318,7 +305,6 @@ def fetchAllReviewsByCategory():
 def fetchSentimentReviewsByProduct():
     try:
         productId = request.args.get('product')
-        print(f"😊 Fetching sentiment for product: {productId}")
         
         if not productId:
             return jsonify({
@@ -336,9 +322,12 @@ def fetchSentimentReviewsByProduct():
                 'data': []
             }), 400
         
-        response_data = getSentimentPrediction(productId)
-        gc.collect()
-        print("✅ Sentiment analysis fetched successfully")
+        try:
+            start, end = get_date_window()
+        except ValueError as e:
+            return invalid_query_args(e)
+        
+        response_data = getSentimentPrediction(productId, start, end)
         
         if response_data.get('error'):
             return jsonify(response_data), 500
@@ -346,20 +335,60 @@ def fetchSentimentReviewsByProduct():
             return jsonify(response_data), 200
         
     except Exception as e:
-        print(f"❌ Error fetching sentiment: {e}")
-        traceback.print_exc()
-        gc.collect()
+        log.exception('error fetching sentiment')
         return jsonify({
             'error': True,
             'message': f'Error fetching sentiment: {str(e)}',
             'data': []
         }), 500
 
+@app.route('/getSentimentTimeline', methods=['GET'])
+def fetchSentimentTimeline():
+    try:
+        productId = request.args.get('product', type=int)
+        bucket = request.args.get('bucket', 'day')
+        if productId is None:
+            return invalid_query_args('Product parameter is required and must be a valid number')
+        if bucket not in SENTIMENT_BUCKETS:
+            return invalid_query_args(f"bucket must be one of: {', '.join(SENTIMENT_BUCKETS)}")
+        try:
+            start, end = get_date_window()
+        except ValueError as e:
+            return invalid_query_args(e)
+
+        response_data = getSentimentTimelineByProduct(productId, start, end, bucket)
+        return jsonify(response_data), 500 if response_data.get('error') else 200
+
+    except Exception as e:
+        log.exception('error fetching sentiment timeline')
+        return jsonify({
+            'error': True,
+            'message': f'Error fetching sentiment timeline: {str(e)}',
+            'data': []
+        }), 500
+
+@app.route('/getSentimentByRating', methods=['GET'])
+def fetchSentimentByRating():
+    try:
+        productId = request.args.get('product', type=int)
+        if productId is None:
+            return invalid_query_args('Product parameter is required and must be a valid number')
+
+        response_data = getSentimentRatingByProduct(productId)
+        return jsonify(response_data), 500 if response_data.get('error') else 200
+
+    except Exception as e:
+        log.exception('error fetching sentiment by rating')
+        return jsonify({
+            'error': True,
+            'message': f'Error fetching sentiment by rating: {str(e)}',
+            'data': []
+        }), 500
+
 @app.route('/getAllProductsByName', methods=['GET'])
 def fetchAllProductsByName():
     try:
         name = request.args.get('name')
-        print(f"🔍 Searching products by name: {name}")
         
         if not name:
             return jsonify({
@@ -375,9 +404,12 @@ def fetchAllProductsByName():
                 'data': []
             }), 400
         
-        response_data = getProductsByName(name)
-        gc.collect()
-        print("✅ Products search completed successfully")
+        try:
+            fuzzy = parse_fuzzy(request.args)
+        except ValueError as e:
+            return invalid_query_args(e)
+
+        response_data = getProductsByName(name, fuzzy)
         
         if response_data.get('error'):
             return jsonify(response_data), 500
@@ -385,9 +417,7 @@ def fetchAllProductsByName():
             return jsonify(response_data), 200
         
     except Exception as e:
-        print(f"❌ Error searching products: {e}")
-        traceback.print_exc()
-        gc.collect()
+        log.exception('error searching products')
         return jsonify({
             'error': True,
             'message': f'Error searching products: {str(e)}',
@@ -399,29 +429,21 @@ def fetchAllProductsByName():
 def fetchRecommendProductsByName():
     try:
         productId = request.args.get('product')
-        print(f"🎯 API endpoint called for product recommendations: {productId}")
-        log_memory_usage()
         
         response = recomend_products(productId)
         
-        # Force cleanup after AI operations
-        gc.collect()
-        
-        print(f"✅ Recommendations API response ready")
         return response
         
     except MemoryError:
-        print("❌ Memory error in recommendations - forcing cleanup")
-        gc.collect()
+        log.error('memory error in recommendations, forcing gc')
+        memory_monitor.collect('memory_error')
         return jsonify({
             'error': True,
             'message': 'Memory error in recommendations - try again',
             'data': []
         }), 500
     except Exception as e:
-        print(f"❌ Error in recommendations endpoint: {e}")
-        traceback.print_exc()
-        gc.collect()
+        log.exception('error in recommendations endpoint')
         return jsonify({
             'error': True,
             'message': f'Error fetching recommendations: {str(e)}',
@@ -433,20 +455,14 @@ def fetchRecommendProductsByName():
 def fetchReviewsSumOfProduct():
     try:
         productId = request.args.get('product')
-        print(f"📝 Review summary endpoint called for product: {productId}")
-        log_memory_usage()
         
         response = getReviewsSumByProduct(productId)
         
-        # Force cleanup after AI operations
-        gc.collect()
-        
-        print(f"✅ Review summary response ready")
         return response
         
     except MemoryError:
-        print("❌ Memory error in review summary - forcing cleanup")
-        gc.collect()
+        log.error('memory error in review summary, forcing gc')
+        memory_monitor.collect('memory_error')
         return jsonify({
             'error': True,
             'message': 'Memory error in review summary - try again',
@@ -456,9 +472,7 @@ def fetchReviewsSumOfProduct():
             }
         }), 500
     except Exception as e:
-        print(f"❌ Error in review summary endpoint: {e}")
-        traceback.print_exc()
-        gc.collect()
+        log.exception('error in review summary endpoint')
         return jsonify({
             'error': True,
             'message': f'Error generating review summary: {str(e)}',
@@ -468,17 +482,40 @@ def fetchReviewsSumOfProduct():
             }
         }), 500
 
+@app.route('/getReviewsSumOfProducts', methods=['GET'])
+def fetchReviewsSumOfProducts():
+    try:
+        # ?products=1,2,3
+        productIds = [value.strip() for value in request.args.get('products', '').split(',') if value.strip()]
+
+        response = getReviewsSumByProducts(productIds)
+
+        return response
+
+    except Exception as e:
+        log.exception('error in batch review summary endpoint')
+        return jsonify({
+            'error': True,
+            'message': f'Error generating review summaries: {str(e)}',
+            'data': []
+        }), 500
+
 # ✅ Add health check endpoint
 @app.route('/health', methods=['GET'])
 def health_check():
     try:
-        log_memory_usage()
         return jsonify({
             'error': False,
             'message': 'Backend is healthy',
             'data': {
                 'status': 'ok',
-                'memory_usage': f"{psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024:.1f} MB"
+                'memory_usage': f"{rss_mb():.1f} MB",
+                'memory': memory_monitor.stats(),
+                'cache': cache_stats(),
+                'subsystems': {
+                    'recommendation': recommender.status(),
+                    'summarization': summarizer.status()
+                }
             }
         })
     except Exception as e:
@@ -488,22 +525,75 @@ def health_check():
             'data': None
         }), 500
 
+# ✅ Metrics dalam format teks Prometheus (latensi per route, query DB, inferensi model, cache)
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+def load_recommendation_index():
+    """Recommendation system plus its index (loaded, or built once)"""
+    if recommender.get() is not None:
+        from recomm_system.index import get_index
+        get_index()
+
+def load_search_index():
+    from product_search.index import refresh_search_index
+    refresh_search_index()
+
+# Urutan warmup: pencarian nama dulu (paling sering dipakai), lalu stack ML
+WARMUP_TASKS = [
+    ('product search index', load_search_index),
+    ('recommendation system', load_recommendation_index),
+    ('review summarization', summarizer.get),
+]
+
+def create_app(warmup='background'):
+    """
+    The Flask app with its tables ensured. The ML subsystems and indexes
+    load in a background thread (`warmup='background'`), so catalogue
+    endpoints answer immediately, or before returning (`warmup='sync'`),
+    which wsgi.py uses so the gunicorn master loads them once for every
+    worker (preload_app).
+    """
+    # ✅ Stored review summaries (served while a product's reviews are unchanged)
+    try:
+        from db.schema import ensure_tables
+        ensure_tables('review_summary')
+    except Exception as e:
+        log.warning('review summary store not ready, summaries will be computed per request', extra={'error': str(e)})
+
+    # ✅ Index dan model yang belum selesai dimuat akan dimuat saat pertama dipakai
+    if warmup == 'sync':
+        run_warmup(WARMUP_TASKS)
+    elif warmup == 'background':
+        start_background_warmup(WARMUP_TASKS)
+
+    return app
+
+def start_memory_monitor():
+    """Per-process background thread; under gunicorn it is started in every worker after fork"""
+    # ✅ Sampling RSS/GC di latar; GC penuh hanya saat memori melewati ambang
+    memory_monitor.start()
+
+def start_summary_precompute():
+    """Background summary precompute (SUMMARY_PRECOMPUTE_SECONDS), once per deployment"""
+    precompute_interval = int(os.getenv('SUMMARY_PRECOMPUTE_SECONDS', '0'))
+    if precompute_interval > 0 and summarizer.available():
+        from review_summarization.store import start_background_precompute
+        start_background_precompute(precompute_interval)
+
 if __name__ == '__main__':
-    print("🚀 Starting YAPin Backend Server...")
-    print("📡 CORS enabled for localhost:3000 and 127.0.0.1:3000")
-    print("🔗 API will be available at:")
-    print("   • http://127.0.0.1:5000")
-    print("   • http://localhost:5000")
+    log.info('starting YAPin backend server', extra={
+        'urls': 'http://127.0.0.1:5000, http://localhost:5000',
+        'cors': 'localhost:3000, 127.0.0.1:3000'
+    })
     
     try:
-        # Install psutil if not available
-        try:
-            import psutil
-        except ImportError:
-            print("📦 Installing psutil for memory monitoring...")
-            os.system("pip install psutil")
-            import psutil
-        
+        create_app()
+        start_memory_monitor()
+        start_summary_precompute()
+
+        # Server development; untuk produksi gunakan: gunicorn -c gunicorn.conf.py wsgi:app
         app.run(
             debug=False,  # ✅ Disable debug mode to prevent memory leaks
             host='0.0.0.0', 
@@ -512,5 +602,4 @@ if __name__ == '__main__':
             use_reloader=False  # ✅ Prevent double imports
         )
     except Exception as e:
-        print(f"❌ Failed to start server: {e}")
-        traceback.print_exc()
\ No newline at end of file
+        log.exception('failed to start server')
@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Level log global (DEBUG menampilkan log per request/query yang dimatikan secara default)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+# text (default) atau json (satu objek per baris)
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+# Level per logger, mis. "access=WARNING,db.util=ERROR" untuk mematikan log di jalur panas
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+
+# Atribut bawaan LogRecord; atribut lain berasal dari `extra=` dan ditulis sebagai field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+def record_fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    One line per record: `time level logger message key=value ...` or a
+    JSON object. Fields come from `extra={...}`, so a call such as
+    log.info('summary stored', extra={'product': 12}) stays greppable.
+    """
+
+    def __init__(self, fmt='text'):
+        super().__init__()
+        self.json = fmt == 'json'
+
+    def format(self, record):
+        fields = record_fields(record)
+        if record.exc_info:
+            fields['exception'] = self.formatException(record.exc_info)
+        timestamp = self.formatTime(record, '%Y-%m-%dT%H:%M:%S')
+        if self.json:
+            return json.dumps({
+                'time': timestamp,
+                'level': record.levelname,
+                'logger': record.name,
+                'message': record.getMessage(),
+                **fields
+            }, default=str)
+        exception = fields.pop('exception', None)
+        line = f'{timestamp} {record.levelname:<7} {record.name} {record.getMessage()}'
+        if fields:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        return line + ('\n' + exception if exception else '')
+
+
+def parse_levels(spec):
+    """{'access': 'WARNING', ...} from "access=WARNING,db.util=ERROR" """
+    levels = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+# Satu baris per request dari kedua server; matikan dengan LOG_LEVELS=access=WARNING
+access_log = logging.getLogger('access')
+
+
+def log_request(method, path, status, seconds):
+    if access_log.isEnabledFor(logging.INFO):
+        access_log.info('request', extra={
+            'method': method, 'path': path, 'status': status, 'duration_ms': round(seconds * 1000, 1)
+        })
+
+
+_handler = None
+
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, levels=LOG_LEVELS):
+    """Install the structured handler on the root logger (once per process)"""
+    global _handler
+    root = logging.getLogger()
+    if _handler is None:
+        _handler = logging.StreamHandler(sys.stderr)
+        root.addHandler(_handler)
+    _handler.setFormatter(StructuredFormatter(fmt))
+    root.setLevel(level.upper())
+    for name, logger_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(logger_level)
+    return root
@@ -0,0 +1,168 @@
+import os
+import gc
+import time
+import logging
+import threading
+from dotenv import load_dotenv
+from monitoring.metrics import registry
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+# Interval sampling RSS dan statistik GC (detik)
+MEMORY_SAMPLE_SECONDS = float(os.getenv('MEMORY_SAMPLE_SECONDS', '5'))
+# GC penuh dipicu hanya jika RSS di atas batas ini...
+MEMORY_GC_THRESHOLD_MB = float(os.getenv('MEMORY_GC_THRESHOLD_MB', '500'))
+# ...dan sudah naik sebanyak ini sejak GC paksa terakhir...
+MEMORY_GC_GROWTH_MB = float(os.getenv('MEMORY_GC_GROWTH_MB', '100'))
+# ...dan GC paksa terakhir sudah lewat selama ini (detik)
+MEMORY_GC_MIN_INTERVAL = float(os.getenv('MEMORY_GC_MIN_INTERVAL', '30'))
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss_mb():
+    """Resident set size of this process in MB (psutil when installed, else /proc)"""
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE / 1024 / 1024
+    except OSError:
+        import resource
+        # Tanpa psutil dan /proc (mis. macOS): puncak RSS, dalam byte di macOS dan KB di Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if peak > 1 << 32 else peak / 1024
+
+
+class MemoryMonitor:
+    """
+    Background sampler of RSS and garbage-collector activity. A full
+    collection is forced only when RSS is above the threshold, has grown
+    by at least `growth_mb` since the last forced collection, and the
+    last one is at least `min_interval` seconds old; requests never pay
+    for it.
+    """
+
+    def __init__(self, interval=MEMORY_SAMPLE_SECONDS, threshold_mb=MEMORY_GC_THRESHOLD_MB,
+                 growth_mb=MEMORY_GC_GROWTH_MB, min_interval=MEMORY_GC_MIN_INTERVAL, read_rss=rss_mb):
+        self.interval = interval
+        self.threshold_mb = threshold_mb
+        self.growth_mb = growth_mb
+        self.min_interval = min_interval
+        self.read_rss = read_rss
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._gc_started = None
+
+        self.rss_mb = 0.0
+        self.peak_rss_mb = 0.0
+        self.sampled_at = None
+        self.samples = 0
+        self.forced_collections = 0
+        self.forced_freed_mb = 0.0
+        self.last_forced_at = None
+        self._rss_at_last_collect = 0.0
+        # Diisi callback gc: jumlah dan total durasi semua collection (otomatis maupun paksa)
+        self.gc_collections = [0, 0, 0]
+        self.gc_pause_seconds = 0.0
+
+    def start(self):
+        """Start the sampler thread (once per process) and GC pause tracking"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            if self._gc_callback not in gc.callbacks:
+                gc.callbacks.append(self._gc_callback)
+            self._stop.clear()
+            self.sample()
+            self._thread = threading.Thread(target=self._run, name='memory-monitor', daemon=True)
+            self._thread.start()
+            return self
+
+    def stop(self):
+        self._stop.set()
+        if self._gc_callback in gc.callbacks:
+            gc.callbacks.remove(self._gc_callback)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                log.warning('memory sampling failed', extra={'error': str(e)})
+
+    def _gc_callback(self, phase, info):
+        if phase == 'start':
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            self.gc_pause_seconds += time.perf_counter() - self._gc_started
+            self.gc_collections[info['generation']] += 1
+            self._gc_started = None
+
+    def sample(self):
+        """Read RSS, then collect if the adaptive thresholds are crossed. Returns RSS in MB"""
+        rss = self.read_rss()
+        self.rss_mb = rss
+        self.peak_rss_mb = max(self.peak_rss_mb, rss)
+        self.sampled_at = time.time()
+        self.samples += 1
+        if self._should_collect(rss):
+            self.collect()
+        return rss
+
+    def _should_collect(self, rss):
+        if rss < self.threshold_mb or rss - self._rss_at_last_collect < self.growth_mb:
+            return False
+        return self.last_forced_at is None or time.monotonic() - self.last_forced_at >= self.min_interval
+
+    def collect(self, reason='threshold'):
+        """Force a full collection now and record how much RSS it released"""
+        before = self.read_rss()
+        gc.collect()
+        after = self.read_rss()
+        with self._lock:
+            self.forced_collections += 1
+            self.forced_freed_mb += max(0.0, before - after)
+            self.last_forced_at = time.monotonic()
+            self._rss_at_last_collect = after
+            self.rss_mb = after
+        log.info('forced gc', extra={'reason': reason, 'rss_before_mb': round(before, 1), 'rss_after_mb': round(after, 1)})
+        return before - after
+
+    def stats(self):
+        return {
+            'rss_mb': round(self.rss_mb, 1),
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+            'sampled_at': self.sampled_at,
+            'samples': self.samples,
+            'gc_threshold_mb': self.threshold_mb,
+            'gc_growth_mb': self.growth_mb,
+            'forced_collections': self.forced_collections,
+            'forced_freed_mb': round(self.forced_freed_mb, 1),
+            'gc_collections': list(self.gc_collections),
+            'gc_pause_ms': round(self.gc_pause_seconds * 1000, 1),
+            'gc_objects_pending': list(gc.get_count()),
+            'gc_uncollectable': sum(generation['uncollectable'] for generation in gc.get_stats()),
+        }
+
+
+memory_monitor = MemoryMonitor()
+
+
+@registry.register_collector
+def memory_metrics():
+    stats = memory_monitor.stats()
+    return [
+        ('yapin_process_rss_megabytes', 'gauge', 'RSS at the last memory monitor sample', [({}, stats['rss_mb'])]),
+        ('yapin_gc_collections_total', 'counter', 'Garbage collections per generation',
+         [({'generation': generation}, count) for generation, count in enumerate(stats['gc_collections'])]),
+        ('yapin_gc_pause_seconds_total', 'counter', 'Time spent in garbage collection', [({}, memory_monitor.gc_pause_seconds)]),
+        ('yapin_gc_forced_collections_total', 'counter', 'Full collections forced by the memory monitor',
+         [({}, stats['forced_collections'])]),
+    ]
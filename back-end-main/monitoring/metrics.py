@@ -0,0 +1,252 @@
+import time
+import bisect
+import inspect
+import threading
+import functools
+
+# Batas bucket histogram latensi (detik), sama dengan default klien Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Labelled series of one metric; values are kept per tuple of label values"""
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            series = sorted(self._series.items())
+            for key, value in series:
+                lines.extend(self._render_series(list(zip(self.labelnames, key)), value))
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels), 0)
+
+    def _render_series(self, labels, value):
+        return [f'{self.name}{_format_labels(labels)} {_format_value(value)}']
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        # Indeks bucket pertama dengan batas >= value; indeks terakhir = +Inf
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block"""
+        return _Timer(self, labels)
+
+    def count(self, **labels):
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def _render_series(self, labels, series):
+        counts, total, count = series
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{_format_labels(labels + [("le", _format_value(bound))])} {cumulative}')
+        lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}')
+        lines.append(f'{self.name}_count{_format_labels(labels)} {count}')
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Registry:
+    """
+    Metrics of this process in Prometheus text format. Collectors are
+    callables returning [(name, kind, documentation, [(labels, value)])]
+    for values that already live elsewhere (memory monitor, cache stats)
+    and are only read when /metrics is scraped.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'metric {metric.name} is already registered')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector):
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+        return collector
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        for collector in list(self._collectors):
+            for name, kind, documentation, samples in collector():
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    'yapin_http_request_duration_seconds', 'HTTP request latency per route',
+    ['method', 'route', 'status'])
+DB_QUERY_SECONDS = registry.histogram(
+    'yapin_db_query_duration_seconds', 'Time spent in each db.util / db.async_util query function',
+    ['function'])
+DB_QUERY_ERRORS = registry.counter(
+    'yapin_db_query_errors_total', 'Query functions that raised', ['function'])
+INFERENCE_SECONDS = registry.histogram(
+    'yapin_model_inference_duration_seconds', 'Model inference time (sentiment, summarization, recommendation)',
+    ['model'])
+CACHE_LOOKUPS = registry.counter(
+    'yapin_cache_lookups_total', 'Read-through cache lookups per cached function', ['function', 'result'])
+
+
+def timed(histogram, errors=None, **labels):
+    """
+    Decorator observing the call duration in `histogram` (and counting
+    exceptions in `errors`). Coroutines are timed until they return, and
+    functions returning a generator until it is exhausted or closed, as
+    the streaming readers hold their query open while the caller iterates.
+    """
+    def record(start, failed):
+        histogram.observe(time.perf_counter() - start, **labels)
+        if failed and errors is not None:
+            errors.inc(**labels)
+
+    def timed_iteration(generator, start):
+        failed = True
+        try:
+            yield from generator
+            failed = False
+        except GeneratorExit:
+            # Konsumen berhenti lebih awal (mis. klien streaming terputus)
+            failed = False
+            raise
+        finally:
+            record(start, failed)
+
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                start, failed = time.perf_counter(), True
+                try:
+                    result = await function(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    record(start, failed)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = function(*args, **kwargs)
+                except BaseException:
+                    record(start, True)
+                    raise
+                if inspect.isgenerator(result):
+                    # Reader streaming: query tetap berjalan selama pemanggil membaca baris
+                    return timed_iteration(result, start)
+                record(start, False)
+                return result
+        return wrapper
+    return decorator
+
+
+def timed_query(function):
+    """DB query timer labelled with the function name"""
+    return timed(DB_QUERY_SECONDS, DB_QUERY_ERRORS, function=function.__name__)(function)
+
+
+def timed_inference(model):
+    """Inference timer; in process pools each worker keeps its own counts"""
+    return timed(INFERENCE_SECONDS, model=model)
+
+
+def render_metrics():
+    return registry.render()
@@ -0,0 +1,365 @@
+import sys
+import os
+import time
+import bisect
+import logging
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from rapidfuzz import process, fuzz
+from text_processing.normalize import strip_punctuation
+
+log = logging.getLogger(__name__)
+
+# Parameter BM25; nama produk pendek sehingga tf hampir selalu 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Bobot token yang hanya cocok sebagai prefix (mis. "sepat" -> "sepatu")
+PREFIX_WEIGHT = 0.8
+# Batas ekspansi prefix per token query (token dengan df terbesar dipilih)
+MAX_PREFIX_EXPANSIONS = 64
+# Prefix lebih pendek dari ini hanya dicocokkan secara exact
+MIN_PREFIX_LENGTH = 2
+# Mode fuzzy: skor minimum fuzz.ratio (0-100) agar token dianggap salah ketik dari kata di katalog
+FUZZY_SCORE_CUTOFF = 80
+# Bobot kecocokan fuzzy dikali skor/100, selalu di bawah kecocokan exact/prefix
+FUZZY_WEIGHT = 0.6
+# Token query lebih pendek dari ini tidak dicari secara fuzzy
+MIN_FUZZY_LENGTH = 4
+# Jumlah kandidat kata (hasil saringan trigram) yang dinilai RapidFuzz per token
+FUZZY_CANDIDATES = 200
+# Kata kandidat per token yang dipakai sebagai ekspansi fuzzy
+FUZZY_EXPANSIONS = 5
+
+
+def trigrams(word):
+  padded = f' {word} '
+  return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def tokenize(text):
+  """Lowercase word tokens of a product name or query; digits are kept ("512gb", "15")"""
+  if not isinstance(text, str):
+    return []
+  return strip_punctuation(text).split()
+
+
+class ProductSearchIndex:
+  """
+  In-memory inverted index over normalised product names.
+
+  Every query token must match a name token exactly or as a prefix;
+  matches are ranked by BM25 (prefix matches weighted by PREFIX_WEIGHT).
+  Products can be added, updated and removed without a rebuild; removed
+  rows stay in the postings as tombstones (score 0) until the index is
+  rebuilt.
+
+  With fuzzy=True, query tokens also match vocabulary words within
+  FUZZY_SCORE_CUTOFF (RapidFuzz ratio), so "sepatuu" finds "sepatu".
+  Candidates are narrowed with a trigram index over the vocabulary
+  before RapidFuzz scores them in one batched call.
+  """
+
+  def __init__(self, products=()):
+    self._lock = threading.RLock()
+    self._postings = {}
+    self._arrays = {}
+    self._vocabulary = []
+    self._vocabulary_dirty = False
+    self._trigram_postings = None
+    self.records = []
+    self.product_ids = []
+    self.positions = {}
+    self._lengths = []
+    self._alive = []
+    self._norms = None
+    self.max_id = 0
+    self.add(products)
+
+  def __len__(self):
+    return len(self.positions)
+
+  def add(self, products):
+    """Add or replace products (dicts with at least id and name)"""
+    with self._lock:
+      for product in products:
+        product_id = int(product['id'])
+        if product_id in self.positions:
+          self._alive[self.positions.pop(product_id)] = False
+
+        position = len(self.records)
+        tokens = tokenize(product.get('name'))
+        self.records.append(product)
+        self.product_ids.append(product_id)
+        self.positions[product_id] = position
+        self.max_id = max(self.max_id, product_id)
+        self._lengths.append(len(tokens))
+        self._alive.append(True)
+        for token in set(tokens):
+          postings = self._postings.get(token)
+          if postings is None:
+            postings = self._postings[token] = []
+            self._vocabulary_dirty = True
+            self._trigram_postings = None
+          postings.append(position)
+          self._arrays.pop(token, None)
+      self._norms = None
+
+  def remove(self, product_ids):
+    with self._lock:
+      for product_id in product_ids:
+        position = self.positions.pop(int(product_id), None)
+        if position is not None:
+          self._alive[position] = False
+      self._norms = None
+
+  def _prepare(self):
+    if self._vocabulary_dirty:
+      self._vocabulary = sorted(self._postings)
+      self._vocabulary_dirty = False
+    if self._norms is None:
+      lengths = np.asarray(self._lengths, dtype=np.float32)
+      alive = np.asarray(self._alive, dtype=bool)
+      average = float(lengths[alive].mean()) if alive.any() else 1.0
+      # Faktor BM25 per dokumen dengan tf = 1
+      self._norms = (BM25_K1 + 1) / (1 + BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(average, 1.0)))
+      self._norms[~alive] = 0
+      self._alive_count = int(alive.sum())
+
+  def _prepare_fuzzy(self):
+    """Trigram -> vocabulary positions, built on first fuzzy query after the vocabulary changed"""
+    if self._trigram_postings is not None:
+      return
+    postings = {}
+    for position, word in enumerate(self._vocabulary):
+      for trigram in trigrams(word):
+        postings.setdefault(trigram, []).append(position)
+    self._trigram_postings = {trigram: np.asarray(positions, dtype=np.int64) for trigram, positions in postings.items()}
+    self._vocabulary_lengths = np.fromiter((len(word) for word in self._vocabulary), dtype=np.int64, count=len(self._vocabulary))
+
+  def _fuzzy_expansions(self, token, exclude):
+    """(word, weight) pairs for vocabulary words that look like a misspelling of `token`"""
+    if len(token) < MIN_FUZZY_LENGTH:
+      return []
+    self._prepare_fuzzy()
+    token_trigrams = [self._trigram_postings[t] for t in trigrams(token) if t in self._trigram_postings]
+    if not token_trigrams:
+      return []
+
+    # Jumlah trigram yang sama per kata; kata dengan panjang jauh berbeda dibuang
+    shared = np.bincount(np.concatenate(token_trigrams), minlength=len(self._vocabulary))
+    shared[np.abs(self._vocabulary_lengths - len(token)) > 2] = 0
+    candidates = np.flatnonzero(shared >= max(1, len(token) // 3))
+    if len(candidates) > FUZZY_CANDIDATES:
+      candidates = candidates[np.argpartition(-shared[candidates], FUZZY_CANDIDATES - 1)[:FUZZY_CANDIDATES]]
+
+    words = [self._vocabulary[i] for i in candidates if self._vocabulary[i] not in exclude]
+    matches = process.extract(
+      token, words, scorer=fuzz.ratio, score_cutoff=FUZZY_SCORE_CUTOFF, limit=FUZZY_EXPANSIONS
+    )
+    return [(word, FUZZY_WEIGHT * score / 100) for word, score, _ in matches]
+
+  def _postings_array(self, token):
+    array = self._arrays.get(token)
+    if array is None:
+      array = self._arrays[token] = np.asarray(self._postings[token], dtype=np.int64)
+    return array
+
+  def _expansions(self, token):
+    """(token, weight) pairs matching `token` exactly or as a prefix"""
+    expansions = []
+    if token in self._postings:
+      expansions.append((token, 1.0))
+    if len(token) < MIN_PREFIX_LENGTH:
+      return expansions
+
+    start = bisect.bisect_left(self._vocabulary, token)
+    candidates = []
+    for word in self._vocabulary[start:]:
+      if not word.startswith(token):
+        break
+      if word != token:
+        candidates.append(word)
+    if len(candidates) > MAX_PREFIX_EXPANSIONS:
+      candidates.sort(key=lambda word: len(self._postings[word]), reverse=True)
+      candidates = candidates[:MAX_PREFIX_EXPANSIONS]
+    return expansions + [(word, PREFIX_WEIGHT) for word in candidates]
+
+  def search_positions(self, query, limit=20, fuzzy=False):
+    """(positions, scores) of the best matching products, best first"""
+    tokens = list(dict.fromkeys(tokenize(query)))
+    limit = max(1, limit)
+    with self._lock:
+      self._prepare()
+      if not tokens or not self.records:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+      total = None
+      for token in tokens:
+        expansions = self._expansions(token)
+        if fuzzy:
+          expansions += self._fuzzy_expansions(token, {word for word, _ in expansions})
+        if not expansions:
+          return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Satu idf per token query (df gabungan semua ekspansi), sehingga kecocokan
+        # prefix yang langka tidak mengalahkan kecocokan exact
+        postings = [(self._postings_array(word), weight) for word, weight in expansions]
+        df = min(sum(len(docs) for docs, _ in postings), self._alive_count)
+        idf = np.log(1 + (self._alive_count - df + 0.5) / (df + 0.5))
+        term_scores = np.zeros(len(self.records), dtype=np.float32)
+        for docs, weight in postings:
+          # Posting satu token unik per dokumen, jadi fancy indexing aman (tanpa ufunc.at)
+          term_scores[docs] = np.maximum(term_scores[docs], weight * idf * self._norms[docs])
+        if total is None:
+          total = term_scores
+          matched = term_scores > 0
+        else:
+          total += term_scores
+          matched &= term_scores > 0
+
+    candidates = np.flatnonzero(matched)
+    if len(candidates) == 0:
+      return candidates, np.empty(0, dtype=np.float32)
+    scores = total[candidates]
+    if len(candidates) > limit:
+      top = np.argpartition(-scores, limit - 1)[:limit]
+      candidates, scores = candidates[top], scores[top]
+    # Skor tertinggi dulu, id terkecil dulu jika skor sama
+    order = np.lexsort((candidates, -scores))
+    return candidates[order], scores[order]
+
+  def search(self, query, limit=20, fuzzy=False):
+    positions, scores = self.search_positions(query, limit, fuzzy)
+    return [self.records[pos] for pos in positions]
+
+
+class MemorySearchBackend:
+  """ProductSearchIndex kept in sync with the product table"""
+
+  name = 'memory'
+
+  def __init__(self, refresh_interval=60):
+    self.refresh_interval = refresh_interval
+    self.index = None
+    self._checked_at = 0
+    self._lock = threading.Lock()
+
+  def build(self):
+    from db.util import iterProducts
+
+    index = ProductSearchIndex(iterProducts())
+    self.index = index
+    self._checked_at = time.monotonic()
+    log.info('product search index built', extra={'products': len(index)})
+    return index
+
+  def refresh(self):
+    """
+    Add products newer than the indexed max id. If the table has fewer
+    or more rows than expected after that (deletes or back-filled ids),
+    rebuild from scratch.
+    """
+    from db.util import iterProducts, getProductStats
+
+    with self._lock:
+      if self.index is None:
+        return self.build()
+      count, max_id = getProductStats()
+      if max_id > self.index.max_id:
+        self.index.add(iterProducts(after_id=self.index.max_id))
+      if count != len(self.index):
+        return self.build()
+      self._checked_at = time.monotonic()
+      return self.index
+
+  def upsert(self, products):
+    """Write hook: index new or renamed products without waiting for refresh()"""
+    if self.index is not None:
+      self.index.add(products)
+
+  def remove(self, product_ids):
+    if self.index is not None:
+      self.index.remove(product_ids)
+
+  def refresh_if_stale(self):
+    if self.index is None or time.monotonic() - self._checked_at > self.refresh_interval:
+      self.refresh()
+    return self.index
+
+  def search(self, query, limit=20, fuzzy=False):
+    """fuzzy: True, False, or 'auto' (fuzzy only when nothing matches exactly or by prefix)"""
+    index = self.refresh_if_stale()
+    if fuzzy == 'auto':
+      return index.search(query, limit) or index.search(query, limit, fuzzy=True)
+    return index.search(query, limit, fuzzy=bool(fuzzy))
+
+
+class MysqlFulltextBackend:
+  """MATCH ... AGAINST on the ft_product_name FULLTEXT index"""
+
+  name = 'mysql'
+
+  def __init__(self, refresh_interval=60):
+    # FULLTEXT tidak toleran salah ketik; mode fuzzy memakai index memori yang dibangun saat pertama dipakai
+    self.fuzzy_backend = MemorySearchBackend(refresh_interval)
+
+  def search(self, query, limit=20, fuzzy=False):
+    from db.util import searchProductsFulltext
+
+    if fuzzy is True:
+      return self.fuzzy_backend.search(query, limit, fuzzy=True)
+    tokens = tokenize(query)
+    if not tokens:
+      return []
+    # Semua token wajib ada (+), masing-masing boleh berupa prefix (*)
+    boolean_query = ' '.join(f'+{token}*' for token in tokens)
+    results = searchProductsFulltext(boolean_query, limit)
+    if not results and fuzzy == 'auto':
+      return self.fuzzy_backend.search(query, limit, fuzzy=True)
+    return results
+
+  # InnoDB memperbarui index FULLTEXT sendiri saat data berubah
+  def refresh(self):
+    if self.fuzzy_backend.index is not None:
+      self.fuzzy_backend.refresh()
+
+  def upsert(self, products):
+    self.fuzzy_backend.upsert(products)
+
+  def remove(self, product_ids):
+    self.fuzzy_backend.remove(product_ids)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_search_backend():
+  """Backend selected by PRODUCT_SEARCH_BACKEND (memory, the default, or mysql)"""
+  global _backend
+  if _backend is None:
+    with _backend_lock:
+      if _backend is None:
+        name = os.getenv('PRODUCT_SEARCH_BACKEND', 'memory')
+        refresh_interval = int(os.getenv('PRODUCT_SEARCH_REFRESH_SECONDS', 60))
+        if name == 'mysql':
+          _backend = MysqlFulltextBackend(refresh_interval)
+        else:
+          _backend = MemorySearchBackend(refresh_interval)
+  return _backend
+
+
+def search_products(query, limit=20, fuzzy='auto'):
+  return get_search_backend().search(query, limit, fuzzy)
+
+
+def refresh_search_index():
+  """Pick up inserted/deleted products now instead of after PRODUCT_SEARCH_REFRESH_SECONDS"""
+  return get_search_backend().refresh()
+
+
+if __name__ == '__main__':
+  from monitoring.logs import configure_logging
+  configure_logging()
+  get_search_backend().refresh()
@@ -0,0 +1,178 @@
+import sys
+import os
+import json
+import logging
+import tempfile
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from scipy import sparse
+from .neighbors import normalize_features, top_k as query_top_k, top_k_batch
+
+log = logging.getLogger(__name__)
+
+# Lokasi artifact index rekomendasi (features + tabel tetangga)
+INDEX_DIR = os.getenv(
+  'RECOMMENDATION_INDEX_DIR',
+  os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifacts')
+)
+# Jumlah tetangga yang disimpan per produk
+TOP_K = int(os.getenv('RECOMMENDATION_TOP_K', 20))
+# Jumlah baris yang dihitung sekaligus saat membangun tabel tetangga
+BUILD_CHUNK_SIZE = int(os.getenv('RECOMMENDATION_BUILD_CHUNK_SIZE', 512))
+
+FEATURES_FILE = 'features.npz'
+NEIGHBORS_FILE = 'neighbors.npz'
+PRODUCTS_FILE = 'products.json'
+
+_index = None
+_index_lock = threading.Lock()
+# Hanya satu build + save pada satu waktu
+_rebuild_lock = threading.Lock()
+
+
+class RecommendationIndex:
+  """Sparse feature matrix plus top-K neighbour table for every product."""
+
+  def __init__(self, features, product_ids, neighbor_indices, neighbor_scores, records):
+    self.features = features
+    self.product_ids = product_ids
+    self.neighbor_indices = neighbor_indices
+    self.neighbor_scores = neighbor_scores
+    self.records = records
+    self.positions = {int(pid): pos for pos, pid in enumerate(product_ids)}
+
+  def __len__(self):
+    return len(self.product_ids)
+
+  @property
+  def top_k(self):
+    return self.neighbor_indices.shape[1]
+
+  def neighbors(self, productId, top_n=5):
+    """Return up to top_n (position, score) pairs, excluding the product itself."""
+    position = self.positions.get(int(productId))
+    if position is None:
+      return None
+    if top_n <= self.top_k:
+      indices = self.neighbor_indices[position, :top_n]
+      scores = self.neighbor_scores[position, :top_n]
+    else:
+      # Lebih banyak dari tabel tersimpan: hitung langsung dari matriks fitur
+      indices, scores = query_top_k(self.features, position, top_n)
+    return [(int(i), float(s)) for i, s in zip(indices, scores) if i >= 0]
+
+  def neighbors_batch(self, productIds, top_n=5):
+    """neighbors() for many products; unknown ids map to None."""
+    positions = [self.positions.get(int(pid)) for pid in productIds]
+    known = [pos for pos in positions if pos is not None]
+    if top_n <= self.top_k:
+      indices = self.neighbor_indices[known, :top_n]
+      scores = self.neighbor_scores[known, :top_n]
+    else:
+      indices, scores = top_k_batch(self.features, known, top_n)
+
+    results = {}
+    row = 0
+    for pid, pos in zip(productIds, positions):
+      if pos is None:
+        results[pid] = None
+        continue
+      results[pid] = [(int(i), float(s)) for i, s in zip(indices[row], scores[row]) if i >= 0]
+      row += 1
+    return results
+
+
+def build_index(top_k=TOP_K):
+  from .main import prepare_data
+
+  features, knowledge_df = prepare_data()
+  # Setelah normalisasi L2, dot product = cosine similarity
+  features = normalize_features(features)
+  neighbor_indices, neighbor_scores = top_k_batch(features, k=top_k, chunk_size=BUILD_CHUNK_SIZE)
+  product_ids = knowledge_df['id'].to_numpy(dtype=np.int64)
+  records = knowledge_df.to_dict(orient='records')
+  log.info('recommendation index built', extra={'products': len(product_ids), 'top_k': neighbor_indices.shape[1]})
+  return RecommendationIndex(features, product_ids, neighbor_indices, neighbor_scores, records)
+
+
+def _write_atomic(directory, filename, write, mode='wb'):
+  """Write to a unique temp file in directory, then rename it over filename"""
+  encoding = None if 'b' in mode else 'utf-8'
+  with tempfile.NamedTemporaryFile(mode, dir=directory, prefix=f".{filename}.", suffix='.tmp',
+                                   delete=False, encoding=encoding) as file:
+    tmp_path = file.name
+    try:
+      write(file)
+    except BaseException:
+      file.close()
+      os.unlink(tmp_path)
+      raise
+  os.replace(tmp_path, os.path.join(directory, filename))
+
+
+def save_index(index, path=INDEX_DIR):
+  os.makedirs(path, exist_ok=True)
+  _write_atomic(path, FEATURES_FILE, lambda file: sparse.save_npz(file, index.features))
+  _write_atomic(path, NEIGHBORS_FILE, lambda file: np.savez(
+    file,
+    product_ids=index.product_ids,
+    neighbor_indices=index.neighbor_indices,
+    neighbor_scores=index.neighbor_scores
+  ))
+  _write_atomic(path, PRODUCTS_FILE, lambda file: json.dump(index.records, file, ensure_ascii=False), mode='w')
+  log.info('recommendation index saved', extra={'path': path})
+
+
+def load_index(path=INDEX_DIR):
+  features = sparse.load_npz(os.path.join(path, FEATURES_FILE)).tocsr()
+  with np.load(os.path.join(path, NEIGHBORS_FILE)) as neighbors:
+    product_ids = neighbors['product_ids']
+    neighbor_indices = neighbors['neighbor_indices']
+    neighbor_scores = neighbors['neighbor_scores']
+  with open(os.path.join(path, PRODUCTS_FILE), 'r', encoding='utf-8') as file:
+    records = json.load(file)
+  return RecommendationIndex(features, product_ids, neighbor_indices, neighbor_scores, records)
+
+
+def rebuild_index(path=INDEX_DIR, top_k=TOP_K):
+  global _index
+  with _rebuild_lock:
+    index = build_index(top_k)
+    save_index(index, path)
+    with _index_lock:
+      _index = index
+  return index
+
+
+def get_index(path=INDEX_DIR):
+  """Index from memory, else from disk, else build it once and persist it."""
+  global _index
+  if _index is not None:
+    return _index
+  with _rebuild_lock:
+    if _index is None:
+      try:
+        index = load_index(path)
+        log.info('recommendation index loaded', extra={'path': path, 'products': len(index)})
+      except FileNotFoundError:
+        log.warning('recommendation index not found, building it now', extra={'path': path})
+        index = build_index()
+        save_index(index, path)
+      with _index_lock:
+        _index = index
+  return _index
+
+
+def preload_index():
+  """Process pool initializer: load the index at worker start, leaving failures to the first request"""
+  try:
+    get_index()
+  except Exception as e:
+    log.warning('recommendation index not preloaded in worker', extra={'pid': os.getpid(), 'error': str(e)})
+
+
+if __name__ == '__main__':
+  from monitoring.logs import configure_logging
+  configure_logging()
+  rebuild_index()
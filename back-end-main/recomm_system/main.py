@@ -1,25 +1,27 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from db.util import getAllProduct
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics.pairwise import cosine_similarity
-from scipy.sparse import hstack
-from .text_preprocessing import preprocess_text
+from db.util import iterProducts
+from monitoring.metrics import timed_inference
 
 
 
 def prepare_data():
-  df = getAllProduct()
-  df = pd.DataFrame.from_dict(df)
+  # Hanya dipakai saat membangun index; recomend() cukup memuat index tanpa pandas/sklearn
+  import pandas as pd
+  from sklearn.feature_extraction.text import TfidfVectorizer
+  from sklearn.preprocessing import MinMaxScaler
+  from scipy.sparse import hstack
+  from .text_preprocessing import preprocess_many
+
+  # Seluruh katalog (tanpa batas LIMIT 1000 milik getAllProduct)
+  df = pd.DataFrame.from_records(list(iterProducts()))
   # Set original price = current price jika tidak ada discount
   df.loc[df['discount'] == 0.0, 'originalPrice'] = df['currentPrice']
 
   cleaned_df = df.copy()
-  cleaned_df['name'] = cleaned_df['name'].apply(preprocess_text)
-  new_df = cleaned_df.drop(columns=['categoryId', 'id'], axis=1)
+  cleaned_df['name'] = preprocess_many(cleaned_df['name'].tolist())
+  new_df = cleaned_df.drop(columns=['categoryId', 'id'])
   new_df['name'] = new_df['name'].fillna('').str.lower()
   tfidf = TfidfVectorizer()
 
@@ -37,19 +39,36 @@ def getScoreById(scores, ind):
       return score
   return 0
 
-def recomend(productId):
-  features, knowledge_df = prepare_data()
-  cos_sim = cosine_similarity(features)
-  print(cos_sim)
-  product_index = knowledge_df[knowledge_df['id'] == int(productId)].index[0]
-  similarities = list(enumerate(cos_sim[product_index]))
-  similar_products = sorted(similarities, key=lambda x: x[1], reverse=True)
-  # top 5 similar products
-  similar_products = similar_products[:6]
-  indices = [ind for (ind, _) in similar_products]
-  filtered_df = knowledge_df[knowledge_df['id'].isin(indices)]
-  filtered_df.loc[:, 'similarity_score'] = filtered_df['id'].apply(
-    lambda x: next((score for (i, score) in similar_products if i == (x - 1)), 0)
-  )
-  filtered_df = filtered_df.sort_values(by='similarity_score', ascending=False)
-  return filtered_df.to_dict(orient='records')
+def _to_recommendations(index, neighbors):
+  recommendations = []
+  for position, score in neighbors:
+    record = dict(index.records[position])
+    record['similarity_score'] = score
+    recommendations.append(record)
+  return recommendations
+
+@timed_inference('recommendation')
+def recomend(productId, top_n=5):
+  """
+  Recommendations for one product, or None when the product is not in the
+  index. Unknown ids never trigger a rebuild; new products appear after
+  the index is rebuilt (python -m recomm_system.index).
+  """
+  from .index import get_index
+
+  index = get_index()
+  neighbors = index.neighbors(productId, top_n)
+  if neighbors is None:
+    return None
+  return _to_recommendations(index, neighbors)
+
+def recomend_batch(productIds, top_n=5):
+  """Recommendations for many products in one call, keyed by product id."""
+  from .index import get_index
+
+  index = get_index()
+  batch = index.neighbors_batch(productIds, top_n)
+  return {
+    productId: _to_recommendations(index, neighbors) if neighbors is not None else []
+    for productId, neighbors in batch.items()
+  }
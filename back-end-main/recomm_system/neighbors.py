@@ -0,0 +1,77 @@
+import numpy as np
+from scipy import sparse
+
+# Jumlah baris query yang dihitung sekaligus pada mode batch.
+# Memori puncak kira-kira chunk_size x N float32.
+BATCH_CHUNK_SIZE = 512
+
+
+def normalize_features(features):
+  """CSR float32 copy of features with unit L2 rows, so dot product = cosine."""
+  features = sparse.csr_matrix(features, dtype=np.float32)
+  # Sama dengan sklearn normalize(norm='l2'), tanpa mengimpor sklearn di jalur serving; baris nol tetap nol
+  norms = np.sqrt(np.asarray(features.multiply(features).sum(axis=1), dtype=np.float32).ravel())
+  norms[norms == 0] = 1
+  return (sparse.diags(1 / norms) @ features).tocsr()
+
+
+def _select_top(scores, k):
+  """Indices and scores of the k largest entries of a 1-D array, best first."""
+  if k <= 0:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+  if k < len(scores):
+    top = np.argpartition(-scores, k - 1)[:k]
+  else:
+    top = np.arange(len(scores))
+  top_scores = scores[top]
+  order = np.argsort(-top_scores, kind='stable')
+  return top[order], top_scores[order]
+
+
+def top_k(features, row, k=5, exclude_self=True):
+  """
+  Top-k most similar rows to `row` using one sparse mat-vec.
+
+  `features` must already be L2-normalised (see normalize_features).
+  Returns (indices, scores) sorted by descending similarity.
+  """
+  # Sparse x dense: hasil langsung berupa vektor dense berukuran N
+  scores = np.asarray(features @ features[row].toarray().ravel()).ravel()
+  if exclude_self:
+    scores[row] = -np.inf
+    k = min(k, features.shape[0] - 1)
+  indices, top_scores = _select_top(scores, k)
+  valid = np.isfinite(top_scores)
+  return indices[valid], top_scores[valid]
+
+
+def top_k_batch(features, rows=None, k=5, exclude_self=True, chunk_size=BATCH_CHUNK_SIZE):
+  """
+  Top-k neighbours for many rows at once.
+
+  Rows are scored against the whole matrix in chunks of `chunk_size`,
+  so memory stays at chunk_size x N instead of N x N. Returns two
+  (len(rows), k) arrays; missing slots have index -1 and score 0.
+  """
+  n_rows = features.shape[0]
+  rows = np.arange(n_rows) if rows is None else np.asarray(rows, dtype=np.int64)
+  k = max(0, min(k, n_rows - 1 if exclude_self else n_rows))
+  neighbor_indices = np.full((len(rows), k), -1, dtype=np.int32)
+  neighbor_scores = np.zeros((len(rows), k), dtype=np.float32)
+  if k == 0 or len(rows) == 0:
+    return neighbor_indices, neighbor_scores
+
+  for start in range(0, len(rows), chunk_size):
+    chunk = rows[start:start + chunk_size]
+    # Sparse x dense (N x chunk). Kolom numerik membuat hampir semua pasangan
+    # mirip, jadi hasil sparse x sparse akan padat dan jauh lebih boros memori.
+    sims = np.ascontiguousarray((features @ features[chunk].T.toarray()).T)
+    if exclude_self:
+      sims[np.arange(len(chunk)), chunk] = -np.inf
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(sims, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    neighbor_indices[start:start + len(chunk)] = np.take_along_axis(top, order, axis=1)
+    neighbor_scores[start:start + len(chunk)] = np.take_along_axis(top_scores, order, axis=1)
+
+  return neighbor_indices, neighbor_scores
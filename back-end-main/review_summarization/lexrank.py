@@ -0,0 +1,71 @@
+import numpy as np
+import scipy.sparse as sp
+
+# Jumlah kalimat per blok saat menghitung similarity, agar matriks n x n tidak pernah dibuat padat
+SIMILARITY_BLOCK_ROWS = 1024
+
+def similarity_graph(tfidf_matrix, threshold=0.1, continuous=False, block_rows=SIMILARITY_BLOCK_ROWS):
+    """
+    Sparse sentence graph from an L2-normalised TF-IDF matrix (cosine
+    similarity is then a dot product). Edges are pairs with similarity
+    above `threshold`: weight 1 for classic LexRank, the similarity itself
+    for continuous LexRank. Self-loops are kept, as in the networkx graph
+    built from the thresholded matrix before.
+    """
+    matrix = sp.csr_matrix(tfidf_matrix, dtype=np.float64)
+    transposed = matrix.T.tocsc()
+    blocks = []
+    for start in range(0, matrix.shape[0], block_rows):
+        block = (matrix[start:start + block_rows] @ transposed).tocsr()
+        block.data[block.data <= threshold] = 0
+        block.eliminate_zeros()
+        if not continuous:
+            block.data[:] = 1.0
+        blocks.append(block)
+    return sp.vstack(blocks, format='csr')
+
+def pagerank(graph, damping=0.85, max_iter=100, tol=1e-4, personalization=None):
+    """
+    Power iteration on the row-normalised adjacency matrix. Rows without
+    edges spread their score like the teleport step (uniform, or by
+    `personalization`), as networkx.pagerank does, and the stopping rule
+    is the same (L1 change below n * tol).
+    """
+    n = graph.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    if personalization is None:
+        teleport = np.full(n, 1.0 / n)
+    else:
+        teleport = np.asarray(personalization, dtype=np.float64)
+        teleport = teleport / teleport.sum()
+
+    out_weight = np.asarray(graph.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inverse = np.zeros(n)
+    inverse[~dangling] = 1.0 / out_weight[~dangling]
+    # Transpose sekali agar setiap iterasi cukup satu perkalian matriks-vektor
+    transition_t = (sp.diags(inverse) @ graph).T.tocsr()
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        previous = scores
+        scores = damping * (transition_t @ previous + previous[dangling].sum() * teleport) + (1.0 - damping) * teleport
+        if np.abs(scores - previous).sum() < n * tol:
+            break
+    return scores
+
+def lexrank_scores(tfidf_matrix, threshold=0.1, continuous=False, damping=0.85, max_iter=100, tol=1e-4, weights=None):
+    """
+    LexRank centrality of every sentence (row) of `tfidf_matrix`.
+
+    weights[i] counts how often sentence i occurred before deduplication.
+    Edges into i and the teleport step are scaled by it, which gives the
+    same scores as the graph with every duplicate kept as its own node
+    (summed per sentence) at the size of the deduplicated graph.
+    """
+    graph = similarity_graph(tfidf_matrix, threshold, continuous)
+    if weights is None:
+        return pagerank(graph, damping, max_iter, tol)
+    weights = np.asarray(weights, dtype=np.float64)
+    return pagerank((graph @ sp.diags(weights)).tocsr(), damping, max_iter, tol, personalization=weights)
@@ -2,30 +2,31 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import re
+import logging
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import networkx as nx
+from text_processing.normalize import strip_punctuation
+from review_summarization.lexrank import lexrank_scores
+from review_summarization.segment import summary_units
+from monitoring.metrics import timed_inference
+
+log = logging.getLogger(__name__)
+
+# Dikompilasi sekali, bukan setiap pemanggilan
+WORD_PATTERN = re.compile(r'\b\w+\b')
 
 # Safe NLTK import with fallback
 try:
     import nltk
     from nltk.corpus import stopwords
-    from nltk.tokenize import sent_tokenize, word_tokenize
     
     # Download required data if not present
     try:
         nltk.data.find('corpora/stopwords')
     except LookupError:
-        print("Downloading NLTK stopwords...")
+        log.info('downloading NLTK stopwords')
         nltk.download('stopwords', quiet=True)
     
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        print("Downloading NLTK punkt...")
-        nltk.download('punkt', quiet=True)
-    
     # Get Indonesian stopwords with fallback
     try:
         INDONESIAN_STOPWORDS = set(stopwords.words('indonesian'))
@@ -33,10 +34,10 @@ try:
         INDONESIAN_STOPWORDS = set(stopwords.words('english'))  # fallback
         
     NLTK_AVAILABLE = True
-    print("✅ NLTK loaded successfully with stopwords")
+    log.info('NLTK stopwords loaded', extra={'stopwords': len(INDONESIAN_STOPWORDS)})
     
 except ImportError as e:
-    print(f"⚠️ NLTK not available: {e}")
+    log.warning('NLTK not available, using built-in stopwords', extra={'error': str(e)})
     NLTK_AVAILABLE = False
     # Fallback stopwords for Indonesian
     INDONESIAN_STOPWORDS = {
@@ -52,33 +53,8 @@ def preprocess_text(text):
     if not text or not isinstance(text, str):
         return ""
     
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove special characters but keep Indonesian characters
-    text = re.sub(r'[^\w\s]', ' ', text)
-    
-    # Remove extra whitespace
-    text = ' '.join(text.split())
-    
-    return text
-
-def simple_sentence_tokenize(text):
-    """Simple sentence tokenization fallback"""
-    if not text:
-        return []
-    
-    # Split by common sentence endings
-    sentences = re.split(r'[.!?]+', text)
-    
-    # Clean and filter sentences
-    cleaned_sentences = []
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if len(sentence) > 10:  # Minimum sentence length
-            cleaned_sentences.append(sentence)
-    
-    return cleaned_sentences
+    # Lowercase, ganti tanda baca dengan spasi dan rapikan spasi
+    return strip_punctuation(text)
 
 def simple_word_tokenize(text):
     """Simple word tokenization fallback"""
@@ -86,7 +62,7 @@ def simple_word_tokenize(text):
         return []
     
     # Simple word splitting
-    words = re.findall(r'\b\w+\b', text.lower())
+    words = WORD_PATTERN.findall(text.lower())
     return words
 
 def remove_stopwords(words):
@@ -97,48 +73,32 @@ def remove_stopwords(words):
     filtered_words = [word for word in words if word not in INDONESIAN_STOPWORDS and len(word) > 2]
     return filtered_words
 
-def lexrank_summarizer(reviews, num_sentences=3, threshold=0.1):
+@timed_inference('summarization')
+def lexrank_summarizer(reviews, num_sentences=3, threshold=0.1, continuous=False):
     """
     Enhanced LexRank algorithm for review summarization
-    with better error handling and fallbacks
+    with better error handling and fallbacks.
+    continuous=True weights edges by their cosine similarity.
     """
     try:
-        print(f"🔍 Starting summarization with {len(reviews)} reviews")
-        
         if not reviews or len(reviews) == 0:
             return "Tidak ada review yang tersedia untuk dirangkum."
         
-        # Combine all reviews into one text
-        combined_text = " ".join(str(review) for review in reviews if review)
+        # Segment each review separately (punctuation is still there), then collapse duplicates
+        units = summary_units(str(review) for review in reviews if review)
         
-        if not combined_text.strip():
+        if not units:
             return "Review tidak mengandung teks yang dapat dirangkum."
         
-        print(f"📝 Combined text length: {len(combined_text)} characters")
-        
-        # Preprocess the combined text
-        processed_text = preprocess_text(combined_text)
+        sentences = [unit.text for unit in units]
+        weights = [unit.weight for unit in units]
+        log.debug('summary units', extra={'reviews': len(reviews), 'sentences': sum(weights), 'unique': len(units)})
         
-        if len(processed_text) < 50:
+        if sum(len(unit.normalized) * unit.weight for unit in units) < 50:
             return "Review terlalu pendek untuk dirangkum."
         
-        # Tokenize into sentences
-        if NLTK_AVAILABLE:
-            try:
-                sentences = sent_tokenize(processed_text)
-            except:
-                sentences = simple_sentence_tokenize(processed_text)
-        else:
-            sentences = simple_sentence_tokenize(processed_text)
-        
-        print(f"📄 Found {len(sentences)} sentences")
-        
-        if len(sentences) < 2:
-            return processed_text[:200] + "..." if len(processed_text) > 200 else processed_text
-        
-        # Limit number of sentences for performance
-        if len(sentences) > 50:
-            sentences = sentences[:50]
+        if len(units) < 2:
+            return sentences[0][:200] + "..." if len(sentences[0]) > 200 else sentences[0]
         
         # Create TF-IDF matrix
         try:
@@ -152,44 +112,27 @@ def lexrank_summarizer(reviews, num_sentences=3, threshold=0.1):
                 max_df=0.85
             )
             
-            tfidf_matrix = vectorizer.fit_transform(sentences)
-            print(f"📊 TF-IDF matrix shape: {tfidf_matrix.shape}")
+            tfidf_matrix = vectorizer.fit_transform([unit.normalized for unit in units])
             
         except Exception as e:
-            print(f"⚠️ TF-IDF failed: {e}, using simpler approach")
+            log.warning('TF-IDF failed, using simple extractive summary', extra={'error': str(e)})
             # Fallback to simple word counting
             return simple_extractive_summary(sentences, num_sentences)
         
-        # Calculate cosine similarity
+        # Sparse similarity graph + power iteration (LexRank), tanpa matriks padat n x n
         try:
-            similarity_matrix = cosine_similarity(tfidf_matrix)
-            print(f"🔗 Similarity matrix shape: {similarity_matrix.shape}")
-        except Exception as e:
-            print(f"⚠️ Similarity calculation failed: {e}")
-            return simple_extractive_summary(sentences, num_sentences)
-        
-        # Apply threshold to create adjacency matrix
-        adjacency_matrix = similarity_matrix > threshold
-        
-        # Create graph using NetworkX
-        try:
-            graph = nx.from_numpy_array(adjacency_matrix)
-            
-            # Calculate PageRank scores (LexRank)
-            scores = nx.pagerank(graph, max_iter=100, tol=1e-4)
-            print(f"📈 PageRank scores calculated: {len(scores)} sentences")
+            # Jumlah kemunculan tiap kalimat menjadi bobotnya pada graf
+            scores = lexrank_scores(tfidf_matrix, threshold=threshold, continuous=continuous, max_iter=100, tol=1e-4, weights=weights)
             
         except Exception as e:
-            print(f"⚠️ NetworkX PageRank failed: {e}")
+            log.warning('LexRank scoring failed, using simple extractive summary', extra={'error': str(e)})
             return simple_extractive_summary(sentences, num_sentences)
         
         # Sort sentences by score and select top sentences
         try:
-            sorted_sentences = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-            
-            # Select top sentences (limit to available sentences)
+            # Select top sentences (limit to available sentences); stable sort keeps ties in original order
             num_sentences = min(num_sentences, len(sentences), 5)
-            top_sentence_indices = [idx for idx, score in sorted_sentences[:num_sentences]]
+            top_sentence_indices = [int(idx) for idx in np.argsort(-scores, kind='stable')[:num_sentences]]
             
             # Sort indices to maintain original order
             top_sentence_indices.sort()
@@ -202,17 +145,15 @@ def lexrank_summarizer(reviews, num_sentences=3, threshold=0.1):
             summary = summary.strip()
             if not summary.endswith('.'):
                 summary += '.'
-                
-            print(f"✅ Summary generated: {len(summary)} characters")
             
             return summary
             
         except Exception as e:
-            print(f"⚠️ Summary generation failed: {e}")
+            log.warning('summary selection failed, using simple extractive summary', extra={'error': str(e)})
             return simple_extractive_summary(sentences, num_sentences)
             
     except Exception as e:
-        print(f"❌ LexRank summarization failed: {e}")
+        log.exception('LexRank summarization failed')
         # Return a simple fallback summary
         return simple_fallback_summary(reviews)
 
@@ -246,7 +187,7 @@ def simple_extractive_summary(sentences, num_sentences=3):
         return summary.strip() + "."
         
     except Exception as e:
-        print(f"❌ Simple extractive summary failed: {e}")
+        log.exception('simple extractive summary failed')
         return "Gagal membuat rangkuman review."
 
 def simple_fallback_summary(reviews):
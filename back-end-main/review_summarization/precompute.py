@@ -0,0 +1,18 @@
+import sys
+import os
+import argparse
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db.schema import ensure_tables
+from review_summarization.store import precompute_summaries, PRECOMPUTE_BATCH_SIZE
+from monitoring.logs import configure_logging
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute LexRank review summaries for the whole catalogue')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='LexRank worker processes (0 = in-process)')
+    parser.add_argument('--batch-size', type=int, default=PRECOMPUTE_BATCH_SIZE, help='products per review query')
+    parser.add_argument('--full', action='store_true', help='resummarise every product, not only those whose reviews changed')
+    args = parser.parse_args()
+
+    configure_logging()
+    ensure_tables('review_summary')
+    precompute_summaries(args.workers, args.batch_size, args.full)
@@ -0,0 +1,122 @@
+import sys
+import os
+import re
+import zlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from text_processing.normalize import strip_punctuation
+
+# Dipecah per review, sebelum tanda baca dibuang
+SEGMENT_PATTERN = re.compile(r'[.!?\n]+')
+# Kalimat yang lebih pendek hanya dipakai jika tidak ada kalimat lain
+MIN_SENTENCE_WORDS = 2
+
+# MinHash atas shingle karakter; LSH 16 band x 4 baris menemukan pasangan dengan Jaccard sekitar >= 0.5
+SHINGLE_SIZE = 4
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+NEAR_DUPLICATE_THRESHOLD = 0.7
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(2024)
+_HASH_A = _rng.randint(1, 1 << 31, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+_HASH_B = _rng.randint(0, 1 << 31, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+
+
+class SummaryUnit:
+    """A distinct sentence: display text, normalised text and how many reviews said it"""
+
+    __slots__ = ('text', 'normalized', 'weight')
+
+    def __init__(self, text, normalized, weight):
+        self.text = text
+        self.normalized = normalized
+        self.weight = weight
+
+    def __repr__(self):
+        return f'SummaryUnit({self.text!r}, weight={self.weight})'
+
+
+def segment_review(review):
+    """(original sentence, normalised sentence) pairs of one review"""
+    pairs = []
+    for sentence in SEGMENT_PATTERN.split(str(review)):
+        sentence = ' '.join(sentence.split())
+        normalized = strip_punctuation(sentence)
+        if normalized:
+            pairs.append((sentence, normalized))
+    return pairs
+
+
+def minhash_signature(normalized):
+    """MinHash of the character shingles of a normalised sentence"""
+    padded = f' {normalized} '
+    shingles = {padded[i:i + SHINGLE_SIZE] for i in range(max(1, len(padded) - SHINGLE_SIZE + 1))}
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (a*h + b) mod p: a, b < 2^31 dan h < 2^32 sehingga tidak overflow uint64
+    return ((_HASH_A[:, None] * hashes[None, :] + _HASH_B[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+
+def _near_duplicate_groups(signatures):
+    """Union-find over LSH candidate pairs whose estimated Jaccard passes the threshold"""
+    parent = list(range(len(signatures)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    for band in range(LSH_BANDS):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            buckets.setdefault(signature[band * rows:(band + 1) * rows].tobytes(), []).append(i)
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                root_first, root_other = find(first), find(other)
+                if root_first == root_other:
+                    continue
+                if np.mean(signatures[first] == signatures[other]) >= NEAR_DUPLICATE_THRESHOLD:
+                    parent[root_other] = root_first
+
+    groups = {}
+    for i in range(len(signatures)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def summary_units(reviews, near_duplicates=True):
+    """
+    Segment every review separately, collapse exact duplicates (same
+    normalised text) and then near duplicates (MinHash), and return one
+    SummaryUnit per group with the number of occurrences as its weight.
+    The most frequent variant of a group is used as its text.
+    """
+    counts = {}
+    originals = {}
+    for review in reviews:
+        if not review:
+            continue
+        for sentence, normalized in segment_review(review):
+            counts[normalized] = counts.get(normalized, 0) + 1
+            originals.setdefault(normalized, sentence)
+
+    long_enough = [text for text in counts if len(text.split()) >= MIN_SENTENCE_WORDS]
+    distinct = long_enough or list(counts)
+    if not distinct:
+        return []
+
+    if near_duplicates and len(distinct) > 1:
+        signatures = [minhash_signature(text) for text in distinct]
+        groups = _near_duplicate_groups(signatures)
+    else:
+        groups = [[i] for i in range(len(distinct))]
+
+    units = []
+    for members in sorted(groups, key=min):
+        texts = [distinct[i] for i in members]
+        # Varian terbanyak mewakili grup; seri diputus oleh urutan kemunculan
+        representative = max(texts, key=lambda text: counts[text])
+        units.append(SummaryUnit(originals[representative], representative, sum(counts[text] for text in texts)))
+    return units
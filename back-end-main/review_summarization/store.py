@@ -0,0 +1,160 @@
+import sys
+import os
+import time
+import atexit
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db.util import (
+    getReviewsByProducts, getReviewFingerprints, getStoredSummary, getStoredSummaries,
+    getStoredSummaryFingerprints, saveSummary, saveSummaries
+)
+from review_summarization.main import lexrank_summarizer
+
+log = logging.getLogger(__name__)
+
+# Review lebih pendek dari ini tidak ikut dirangkum
+MIN_REVIEW_LENGTH = 5
+SUMMARY_SENTENCES = 3
+SUMMARY_THRESHOLD = 0.1
+# Worker LexRank untuk endpoint batch (0 = di proses server)
+SUMMARY_WORKERS = int(os.getenv('SUMMARY_WORKERS', '0'))
+# Product per putaran precompute (satu query IN per putaran)
+PRECOMPUTE_BATCH_SIZE = 100
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def review_texts(rows):
+    """Review strings worth summarising from db.util review rows"""
+    texts = []
+    for item in rows or []:
+        if isinstance(item, dict) and 'review' in item:
+            text = str(item['review']).strip()
+            if text and len(text) > MIN_REVIEW_LENGTH:
+                texts.append(text)
+    return texts
+
+def summarize_texts(texts):
+    return lexrank_summarizer(texts, num_sentences=SUMMARY_SENTENCES, threshold=SUMMARY_THRESHOLD)
+
+def get_stored_summary(productId, fingerprint):
+    """The stored summary if it was made from exactly this review set, else None"""
+    try:
+        stored = getStoredSummary(productId)
+    except Exception as e:
+        # Tabel review_summary belum dibuat atau DB bermasalah: rangkum ulang seperti biasa
+        log.warning('stored summary lookup failed', extra={'product': productId, 'error': str(e)})
+        return None
+    if stored is None or stored['fingerprint'] != tuple(fingerprint):
+        return None
+    return stored['summary']
+
+def store_summary(productId, fingerprint, summary):
+    try:
+        saveSummary(productId, fingerprint, summary)
+        return True
+    except Exception as e:
+        log.warning('could not store summary', extra={'product': productId, 'error': str(e)})
+        return False
+
+def create_pool(workers):
+    """Process pool for LexRank, or None for in-process summarisation"""
+    if workers <= 0:
+        return None
+    # spawn, seperti ETL: worker tidak mewarisi state proses server
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+def get_summary_pool():
+    """Pool shared by the batch endpoint, created on first use (SUMMARY_WORKERS)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None and SUMMARY_WORKERS > 0:
+            _pool = create_pool(SUMMARY_WORKERS)
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+def _summarize_all(texts_by_product, pool=None):
+    productIds = list(texts_by_product)
+    if pool is None:
+        summaries = [summarize_texts(texts_by_product[productId]) for productId in productIds]
+    else:
+        summaries = pool.map(summarize_texts, [texts_by_product[productId] for productId in productIds])
+    return dict(zip(productIds, summaries))
+
+def summarize_products(productIds, pool=None, force=False):
+    """
+    {productId: summary} for several products. Fingerprints, stored
+    summaries and reviews are each read with one IN query; only products
+    whose stored summary is missing or stale (every product with force=True)
+    are summarised, across `pool` when given, and written back in one
+    batch. Products without usable review text map to None.
+    """
+    productIds = list(dict.fromkeys(int(productId) for productId in productIds))
+    results = dict.fromkeys(productIds)
+    fingerprints = getReviewFingerprints(productIds)
+    stored = {}
+    if not force:
+        try:
+            stored = getStoredSummaries(list(fingerprints))
+        except Exception as e:
+            log.warning('stored summary lookup failed', extra={'products': len(fingerprints), 'error': str(e)})
+
+    stale = []
+    for productId, fingerprint in fingerprints.items():
+        entry = stored.get(productId)
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            results[productId] = entry['summary']
+        else:
+            stale.append(productId)
+    if not stale:
+        return results
+
+    reviews = getReviewsByProducts(stale)
+    texts = {productId: review_texts(reviews.get(productId)) for productId in stale}
+    summaries = _summarize_all({productId: t for productId, t in texts.items() if t}, pool)
+    results.update(summaries)
+    try:
+        saveSummaries([(productId, fingerprints[productId], summary) for productId, summary in summaries.items()])
+    except Exception as e:
+        log.warning('could not store summaries', extra={'summaries': len(summaries), 'error': str(e)})
+    return results
+
+def precompute_summaries(workers=0, batch_size=PRECOMPUTE_BATCH_SIZE, force=False):
+    """Summarise every product whose review set changed since its stored summary (all with force=True)"""
+    current = getReviewFingerprints()
+    stored = {} if force else getStoredSummaryFingerprints()
+    stale = [productId for productId, fingerprint in current.items() if stored.get(productId) != fingerprint]
+
+    start = time.perf_counter()
+    pool = create_pool(workers)
+    try:
+        for offset in range(0, len(stale), batch_size):
+            batch = stale[offset:offset + batch_size]
+            try:
+                summarize_products(batch, pool, force=True)
+            except Exception as e:
+                log.warning('summary precompute batch failed', extra={'first_product': batch[0], 'last_product': batch[-1], 'error': str(e)})
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    log.info('summary precompute finished', extra={
+        'refreshed': len(stale), 'products': len(current), 'seconds': round(time.perf_counter() - start, 1)
+    })
+    return len(stale)
+
+def start_background_precompute(interval):
+    """Run precompute_summaries() now and then every `interval` seconds on a daemon thread"""
+    def loop():
+        while True:
+            try:
+                precompute_summaries()
+            except Exception:
+                log.exception('summary precompute pass failed')
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name='summary-precompute', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,117 @@
+import sys
+import os
+import time
+import types
+import asyncio
+import importlib
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+httpx = pytest.importorskip('httpx')
+pytest.importorskip('starlette')
+pytest.importorskip('aiomysql')
+
+CATEGORIES = [{'id': 1, 'name': 'Elektronik'}]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # LexRank (dan korpus NLTK-nya) diganti stub seperti di test_summary_store
+    summarizer = types.ModuleType('review_summarization.main')
+    summarizer.lexrank_summarizer = lambda texts, num_sentences=3, threshold=0.1: ' '.join(texts)
+    monkeypatch.setitem(sys.modules, 'review_summarization.main', summarizer)
+    for name in ('review_summarization.store', 'controller.fetch', 'asgi'):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    asgi = importlib.import_module('asgi')
+
+    # Tanpa MySQL: reader async diganti stub, pekerjaan CPU berjalan di thread
+    async def categories():
+        return CATEGORIES
+
+    async def fingerprint(productId):
+        return (2, 10 * productId, productId)
+
+    async def no_summary(productId):
+        return None
+
+    async def save(productId, fingerprint, summary):
+        return None
+
+    async def reviews(productId):
+        return [{'review': 'barang sesuai pesanan'}, {'review': 'pengiriman cepat sekali'}]
+    reviews.uncached = reviews
+
+    monkeypatch.setattr(asgi.adb, 'getAllCategory', categories)
+    monkeypatch.setattr(asgi.adb, 'getReviewFingerprint', fingerprint)
+    monkeypatch.setattr(asgi.adb, 'getStoredSummary', no_summary)
+    monkeypatch.setattr(asgi.adb, 'saveSummary', save)
+    monkeypatch.setattr(asgi.adb, 'getReviewsByProduct', reviews)
+    monkeypatch.setattr(asgi, 'ASGI_CPU_WORKERS', 0)
+    monkeypatch.setattr(asgi, 'ASGI_CPU_WAIT_SECONDS', 5.0)
+    monkeypatch.setattr(asgi, '_cpu_slots', None)
+    store = asgi.summarizer.get()
+    monkeypatch.setattr(store, 'review_texts', lambda rows: [row['review'] for row in rows])
+    monkeypatch.setattr(store, 'summarize_texts', lambda texts: ' | '.join(texts))
+    return asgi
+
+
+def run(server, requests, slots=2, wait=5.0):
+    """Send (delay, path) requests concurrently; returns [(status, body, seconds)]"""
+    async def main():
+        server._cpu_slots = asyncio.Semaphore(slots)
+        server.ASGI_CPU_WAIT_SECONDS = wait
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            async def send(delay, path):
+                await asyncio.sleep(delay)
+                start = time.perf_counter()
+                response = await client.get(path)
+                return response.status_code, response.json(), time.perf_counter() - start
+            return await asyncio.gather(*(send(delay, path) for delay, path in requests))
+    return asyncio.run(main())
+
+
+def test_same_envelope_as_flask(server):
+    [(status, body, _)] = run(server, [(0, '/getAllCategory')])
+    assert status == 200
+    assert body == {'error': False, 'message': 'Categories fetched successfully', 'data': CATEGORIES}
+
+    [(status, body, _)] = run(server, [(0, '/getAllReviewByProduct?product=abc')])
+    assert status == 400
+    assert body == {'error': True, 'message': 'Product parameter must be a valid number', 'data': []}
+
+    [(status, body, _)] = run(server, [(0, '/getReviewsSumOfProduct?product=3')])
+    assert status == 200
+    assert body['data'] == {'productId': '3', 'summary': 'barang sesuai pesanan | pengiriman cepat sekali'}
+
+
+def test_slow_summaries_do_not_starve_catalogue_requests(server, monkeypatch):
+    def slow_summary(texts):
+        time.sleep(0.5)
+        return 'ringkas'
+    monkeypatch.setattr(server.summarizer.get(), 'summarize_texts', slow_summary)
+
+    summaries = [(0, f'/getReviewsSumOfProduct?product={productId}') for productId in range(1, 6)]
+    results = run(server, summaries + [(0.1, '/getAllCategory')], slots=2, wait=0.2)
+
+    *summary_results, (status, body, seconds) = results
+    assert status == 200 and body['data'] == CATEGORIES
+    assert seconds < 0.2
+    statuses = sorted(status for status, _, _ in summary_results)
+    # Dua rangkuman berjalan; sisanya ditolak dengan envelope yang sama, bukan menumpuk
+    assert statuses == [200, 200, 503, 503, 503]
+    busy = next(body for status, body, _ in summary_results if status == 503)
+    assert busy['error'] is True
+
+
+def test_metrics_are_labelled_by_route_pattern(server):
+    async def main():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            await client.get('/getAllCategory')
+            await client.get('/does-not-exist')
+            return await client.get('/metrics')
+    response = asyncio.run(main())
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert 'yapin_http_request_duration_seconds_count{method="GET",route="/getAllCategory",status="200"}' in response.text
+    assert 'route="unmatched",status="404"' in response.text
@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from db.cache import MemoryBackend, ReadThroughCache, product_tag, PRODUCT_LISTS_TAG
+
+
+def make_cache(max_entries=16):
+    return ReadThroughCache(MemoryBackend(max_entries))
+
+
+def test_second_call_is_served_from_cache():
+    cache = make_cache()
+    calls = []
+
+    @cache.cached(ttl=60)
+    def categories():
+        calls.append(1)
+        return [{'id': 1, 'name': 'Elektronik'}]
+
+    assert categories() == categories()
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = make_cache()
+    calls = []
+
+    @cache.cached(ttl=0)
+    def categories():
+        calls.append(1)
+        return [{'id': 1}]
+
+    categories()
+    categories()
+    assert len(calls) == 2
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = make_cache(max_entries=2)
+    calls = []
+
+    @cache.cached(ttl=60)
+    def reviews(productId):
+        calls.append(productId)
+        return [{'productId': productId}]
+
+    reviews(1)
+    reviews(2)
+    reviews(1)  # 1 jadi yang terbaru, 2 dikeluarkan saat 3 masuk
+    reviews(3)
+    reviews(1)
+    reviews(2)
+    assert calls == [1, 2, 3, 2]
+    assert cache.stats()['evictions'] == 2
+
+
+def test_empty_results_are_not_cached():
+    cache = make_cache()
+    calls = []
+
+    @cache.cached(ttl=60)
+    def page():
+        calls.append(1)
+        return [], None
+
+    page()
+    page()
+    assert len(calls) == 2
+    assert cache.stats()['entries'] == 0
+
+
+def test_invalidate_drops_product_entries_and_lists_only():
+    cache = make_cache()
+
+    @cache.cached(ttl=60, tags=lambda productId: (product_tag(productId),))
+    def reviews(productId):
+        return [{'productId': productId}]
+
+    @cache.cached(ttl=60, tags=lambda categoryId: (PRODUCT_LISTS_TAG,))
+    def products(categoryId):
+        return [{'categoryId': categoryId}]
+
+    @cache.cached(ttl=60)
+    def categories():
+        return [{'id': 1}]
+
+    reviews('7')
+    reviews(8)
+    products(1)
+    categories()
+    assert cache.invalidate(7) == 2
+    assert cache.stats()['entries'] == 2
+
+    assert cache.invalidate_all() == 2
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['invalidations'] == 4
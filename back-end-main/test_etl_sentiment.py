@@ -0,0 +1,93 @@
+import sys
+import os
+import types
+import importlib.util
+import numpy as np
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+ETL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'etl-process', 'main.py')
+
+
+def load_etl(monkeypatch, rows):
+    # Model sentimen diganti stub: label diambil dari teks review
+    predict = types.ModuleType('ai_model.predict')
+    predict.predict_batch_sentiment = lambda texts, batch_size, preprocessed=False: {
+        'labels': list(texts),
+        'probabilities': np.array([stub_probabilities(text) for text in texts]).reshape(-1, 3)
+    }
+    monkeypatch.setitem(sys.modules, 'ai_model.predict', predict)
+
+    spec = importlib.util.spec_from_file_location('etl_main', ETL_PATH)
+    etl = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(etl)
+    monkeypatch.setattr(etl, 'iterReviewsOrderedByProduct', lambda batch_size, after_id=None, until_id=None: iter(rows))
+    return etl
+
+
+CLASSES = ['negative', 'neutral', 'positive']
+
+
+def stub_probabilities(text):
+    probabilities = [0.1, 0.1, 0.1]
+    probabilities[CLASSES.index(text) if text in CLASSES else 1] = 0.8
+    return probabilities
+
+
+def review_rows(labels_by_product):
+    rows = []
+    for productId, labels in labels_by_product:
+        rows.extend({
+            'id': len(rows) + 1, 'productId': productId, 'review': label, 'rating': 5, 'tanggal': '2025-01-01 10:00:00'
+        } for label in labels)
+    return rows
+
+
+def test_every_review_gets_one_row_whatever_the_batch_size(monkeypatch):
+    rows = review_rows([
+        (1, ['positive', 'negative', 'positive']),
+        (2, ['neutral']),
+        (3, ['positive'] * 5),
+        (4, ['negative', 'neutral'])
+    ])
+    etl = load_etl(monkeypatch, rows)
+
+    for batch_size in (1, 2, 3, 4, 100):
+        sentiments = list(etl.sentiment_rows(batch_size))
+        assert [row[0] for row in sentiments] == [row['id'] for row in rows]
+        assert sentiments[0] == (1, 1, 5, '2025-01-01 10:00:00', 2, 1000, 1000, 8000)
+        assert sentiments[1][4] == 0
+        assert [row[4] for row in sentiments].count(2) == 7
+
+
+def test_written_products_are_collected_for_invalidation(monkeypatch):
+    rows = review_rows([(1, ['positive']), (2, ['neutral'] * 3), (5, ['negative'])])
+    etl = load_etl(monkeypatch, rows)
+    written = []
+    monkeypatch.setattr(etl, 'upsertReviewSentiments', lambda batch, table: written.append((table, len(batch))))
+
+    products = etl.write_sentiment_rows(etl.sentiment_rows(2), 'review_sentiment_staging', write_batch_size=2)
+    assert products == {1, 2, 5}
+    assert written == [('review_sentiment_staging', 2), ('review_sentiment_staging', 2), ('review_sentiment_staging', 1)]
+
+
+def test_empty_stream_yields_no_rows(monkeypatch):
+    etl = load_etl(monkeypatch, [])
+    assert list(etl.sentiment_rows(4)) == []
+
+
+def has_stopwords():
+    import nltk
+    try:
+        nltk.data.find('corpora/stopwords')
+        return True
+    except LookupError:
+        return False
+
+
+@pytest.mark.skipif(not has_stopwords(), reason='NLTK stopwords corpus is not installed')
+def test_worker_pool_matches_in_process(monkeypatch):
+    rows = review_rows([(1, ['positive', 'negative']), (2, ['neutral'] * 3), (3, ['positive'])])
+    etl = load_etl(monkeypatch, rows)
+    # --workers 1 memakai pool satu proses, bukan jalur in-process
+    assert list(etl.sentiment_rows(2, workers=1)) == list(etl.sentiment_rows(2, workers=0))
@@ -0,0 +1,50 @@
+import sys
+import os
+import threading
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from controller.lazy import LazySubsystem, run_warmup
+from import_report import report
+
+
+@pytest.mark.parametrize('module', ['main', 'controller.fetch'])
+def test_server_import_does_not_load_ml_stack(module):
+    result = report(module)
+    assert result['heavy_modules_imported'] == []
+
+
+def test_subsystem_loads_once_across_threads():
+    calls = []
+    subsystem = LazySubsystem('test', lambda: calls.append(1) or 'model')
+    assert subsystem.status() == {'state': 'not loaded'}
+
+    threads = [threading.Thread(target=subsystem.get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert subsystem.get() == 'model'
+    assert subsystem.status()['state'] == 'ready'
+
+
+def test_failed_subsystem_is_not_retried():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        raise LookupError('stopwords not found')
+    subsystem = LazySubsystem('test', loader)
+    assert subsystem.get() is None
+    assert subsystem.available() is False
+    assert calls == [1]
+    assert subsystem.status()['state'] == 'unavailable'
+
+
+def test_warmup_continues_after_a_failing_task():
+    done = []
+
+    def broken():
+        raise ImportError('no sklearn')
+    run_warmup([('broken', broken), ('index', lambda: done.append('index'))])
+    assert done == ['index']
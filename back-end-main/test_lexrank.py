@@ -0,0 +1,58 @@
+import sys
+import os
+import random
+import numpy as np
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from review_summarization.lexrank import similarity_graph, pagerank, lexrank_scores
+
+WORDS = 'barang sesuai pesanan bagus kirim cepat packing aman seller ramah kualitas mantap harga murah kecewa rusak'.split()
+
+
+def tfidf(n_sentences, seed=0):
+    rng = random.Random(seed)
+    sentences = [' '.join(rng.choices(WORDS, k=rng.randint(3, 8))) for _ in range(n_sentences)]
+    return TfidfVectorizer().fit_transform(sentences)
+
+
+@pytest.mark.parametrize('continuous', [False, True])
+def test_matches_networkx_pagerank(continuous):
+    nx = pytest.importorskip('networkx')
+    matrix = tfidf(80)
+    similarity = cosine_similarity(matrix)
+    similarity[similarity <= 0.1] = 0
+    adjacency = similarity if continuous else similarity > 0
+    expected = nx.pagerank(nx.from_numpy_array(adjacency), max_iter=100, tol=1e-4)
+    scores = lexrank_scores(matrix, threshold=0.1, continuous=continuous)
+    np.testing.assert_allclose(scores, [expected[i] for i in range(80)], atol=1e-12)
+
+
+def test_blocked_graph_equals_single_block():
+    matrix = tfidf(300)
+    whole = similarity_graph(matrix, 0.1, continuous=True, block_rows=1000)
+    blocked = similarity_graph(matrix, 0.1, continuous=True, block_rows=7)
+    assert (whole != blocked).nnz == 0
+
+
+def test_sentences_without_edges_keep_a_score():
+    # Baris kosong (kalimat yang seluruhnya stopword) tidak membuat skor hilang
+    graph = similarity_graph(np.array([[1.0, 0.0], [0.0, 0.0], [1.0, 0.0]]))
+    scores = pagerank(graph)
+    assert scores.sum() == pytest.approx(1.0)
+    assert scores[0] == pytest.approx(scores[2])
+    assert scores[1] > 0
+
+
+def test_weights_match_graph_with_duplicates_kept():
+    rng = random.Random(1)
+    unique = [' '.join(rng.choices(WORDS, k=rng.randint(3, 6))) for _ in range(20)]
+    counts = [rng.randint(1, 5) for _ in unique]
+    expanded = [text for text, count in zip(unique, counts) for _ in range(count)]
+    vectorizer = TfidfVectorizer().fit(unique)
+
+    full = lexrank_scores(vectorizer.transform(expanded), max_iter=1000, tol=1e-12)
+    summed = np.bincount(np.repeat(np.arange(len(unique)), counts), weights=full)
+    weighted = lexrank_scores(vectorizer.transform(unique), max_iter=1000, tol=1e-12, weights=counts)
+    np.testing.assert_allclose(weighted, summed, atol=1e-8)
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from monitoring.memory import MemoryMonitor, rss_mb
+
+
+class FakeRss:
+    def __init__(self, *values):
+        self.values = list(values)
+
+    def __call__(self):
+        return self.values.pop(0) if len(self.values) > 1 else self.values[0]
+
+
+def make_monitor(read_rss, min_interval=0):
+    return MemoryMonitor(interval=60, threshold_mb=500, growth_mb=100, min_interval=min_interval, read_rss=read_rss)
+
+
+def test_no_collection_below_threshold():
+    monitor = make_monitor(FakeRss(300, 450, 499))
+    for _ in range(3):
+        monitor.sample()
+    assert monitor.forced_collections == 0
+    assert monitor.stats()['peak_rss_mb'] == 499
+
+
+def test_collects_once_past_threshold_then_waits_for_growth():
+    # sample 600 -> collect (600 sebelum, 580 sesudah); 620 belum naik 100 MB; 700 sudah
+    monitor = make_monitor(FakeRss(600, 600, 580, 620, 700, 700, 650))
+    monitor.sample()
+    assert monitor.forced_collections == 1
+    assert monitor.forced_freed_mb == 20
+    monitor.sample()
+    assert monitor.forced_collections == 1
+    monitor.sample()
+    assert monitor.forced_collections == 2
+    assert monitor.stats()['forced_freed_mb'] == 70
+
+
+def test_min_interval_limits_forced_collections():
+    monitor = make_monitor(FakeRss(600, 600, 480, 900), min_interval=3600)
+    monitor.sample()
+    monitor.sample()
+    assert monitor.forced_collections == 1
+
+
+def test_explicit_collect_and_stats():
+    monitor = make_monitor(FakeRss(200))
+    monitor.collect('memory_error')
+    stats = monitor.stats()
+    assert stats['forced_collections'] == 1
+    assert len(stats['gc_collections']) == 3
+    assert len(stats['gc_objects_pending']) == 3
+
+
+def test_rss_is_read_without_psutil():
+    assert rss_mb() > 0
@@ -0,0 +1,135 @@
+import sys
+import os
+import json
+import asyncio
+import logging
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from monitoring.metrics import Counter, Histogram, Registry, CACHE_LOOKUPS, REQUEST_SECONDS, timed
+from monitoring.logs import StructuredFormatter, parse_levels
+from db.cache import MemoryBackend, ReadThroughCache
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('latency_seconds', 'Latency', ['route'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, route='/a')
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+    assert 'latency_seconds_sum{route="/a"} 4.05' in lines
+
+
+def test_registry_renders_text_format_with_escaped_labels():
+    registry = Registry()
+    counter = registry.counter('lookups_total', 'Lookups', ['function'])
+    counter.inc(function='say "hi"\n')
+    registry.register_collector(lambda: [('entries', 'gauge', 'Entries', [({'backend': 'memory'}, 3)])])
+    text = registry.render()
+    assert '# TYPE lookups_total counter' in text
+    assert 'lookups_total{function="say \\"hi\\"\\n"} 1' in text
+    assert 'entries{backend="memory"} 3' in text
+    with pytest.raises(ValueError):
+        counter.inc(other='x')
+
+
+def test_timed_records_calls_generators_and_errors():
+    histogram = Histogram('calls_seconds', 'Calls', ['function'])
+    errors = Counter('calls_errors_total', 'Errors', ['function'])
+
+    @timed(histogram, errors, function='rows')
+    def rows():
+        yield from range(3)
+
+    @timed(histogram, errors, function='broken')
+    def broken():
+        raise RuntimeError('query failed')
+
+    @timed(histogram, errors, function='fetch')
+    async def fetch():
+        return 1
+
+    generator = rows()
+    # Generator baru tercatat setelah habis dibaca
+    assert histogram.count(function='rows') == 0
+    assert list(generator) == [0, 1, 2]
+    assert histogram.count(function='rows') == 1
+
+    with pytest.raises(RuntimeError):
+        broken()
+    assert errors.value(function='broken') == 1
+
+    assert asyncio.run(fetch()) == 1
+    assert histogram.count(function='fetch') == 1
+    assert errors.value(function='fetch') == 0
+
+
+def test_closing_a_stream_early_is_not_an_error():
+    histogram = Histogram('stream_seconds', 'Stream', ['function'])
+    errors = Counter('stream_errors_total', 'Errors', ['function'])
+
+    @timed(histogram, errors, function='stream')
+    def stream():
+        yield from range(10)
+
+    generator = stream()
+    next(generator)
+    generator.close()
+    assert histogram.count(function='stream') == 1
+    assert errors.value(function='stream') == 0
+
+
+def test_cache_lookups_are_counted_per_function():
+    cache = ReadThroughCache(MemoryBackend(16))
+
+    @cache.cached(ttl=60)
+    def metrics_categories():
+        return [{'id': 1}]
+
+    metrics_categories()
+    metrics_categories()
+    metrics_categories()
+    # Label sama dengan awalan kunci cache: modul + nama fungsi
+    name = f'{__name__}.test_cache_lookups_are_counted_per_function.<locals>.metrics_categories'
+    assert CACHE_LOOKUPS.value(function=name, result='miss') == 1
+    assert CACHE_LOOKUPS.value(function=name, result='hit') == 2
+
+
+def test_flask_metrics_endpoint_reports_route_latency():
+    import main
+    client = main.app.test_client()
+    before = REQUEST_SECONDS.count(method='GET', route='/', status='200')
+    assert client.get('/').status_code == 200
+    assert REQUEST_SECONDS.count(method='GET', route='/', status='200') == before + 1
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    assert 'yapin_http_request_duration_seconds_count{method="GET",route="/",status="200"}' in text
+    assert '# TYPE yapin_db_query_duration_seconds histogram' in text
+    assert 'yapin_process_rss_megabytes' in text
+
+
+def make_record(**fields):
+    record = logging.LogRecord('db.util', logging.INFO, __file__, 1, 'query finished', None, None)
+    record.__dict__.update(fields)
+    return record
+
+
+def test_structured_formatter_writes_extra_fields():
+    record = make_record(query='getProductPage', rows=20)
+    line = StructuredFormatter('text').format(record)
+    assert line.endswith('INFO    db.util query finished query=getProductPage rows=20')
+
+    payload = json.loads(StructuredFormatter('json').format(record))
+    assert payload['logger'] == 'db.util'
+    assert payload['message'] == 'query finished'
+    assert payload['query'] == 'getProductPage' and payload['rows'] == 20
+
+
+def test_parse_levels():
+    assert parse_levels('access=warning, db.util=ERROR') == {'access': 'WARNING', 'db.util': 'ERROR'}
+    assert parse_levels('') == {}
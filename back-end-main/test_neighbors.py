@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
+from scipy import sparse
+from sklearn.metrics.pairwise import cosine_similarity
+from recomm_system.neighbors import normalize_features, top_k, top_k_batch
+
+
+def sample_features(n_rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    names = sparse.random(n_rows, 50, density=0.1, random_state=seed, format='csr')
+    numeric = sparse.csr_matrix(rng.random((n_rows, 4)))
+    return sparse.hstack([names, numeric]).tocsr()
+
+
+def expected_top(features, row, k):
+    similarities = cosine_similarity(features)[row]
+    similarities[row] = -np.inf
+    order = np.argsort(-similarities, kind='stable')[:k]
+    return order, similarities[order]
+
+
+def test_top_k_matches_cosine_similarity():
+    features = sample_features()
+    normalized = normalize_features(features)
+    for row in (0, 17, 199):
+        indices, scores = top_k(normalized, row, k=5)
+        expected_indices, expected_scores = expected_top(features, row, 5)
+        assert row not in indices
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+        assert set(indices) == set(expected_indices)
+
+
+def test_top_k_batch_matches_single_queries_across_chunks():
+    normalized = normalize_features(sample_features())
+    rows = [3, 50, 120, 199, 3]
+    indices, scores = top_k_batch(normalized, rows, k=7, chunk_size=2)
+    assert indices.shape == (len(rows), 7)
+    for i, row in enumerate(rows):
+        single_indices, single_scores = top_k(normalized, row, k=7)
+        np.testing.assert_allclose(scores[i], single_scores, rtol=1e-5)
+        assert set(indices[i]) == set(single_indices)
+
+
+def test_top_k_batch_small_catalogue_pads_nothing():
+    normalized = normalize_features(sample_features(n_rows=3))
+    indices, scores = top_k_batch(normalized, k=10)
+    # Hanya 2 tetangga yang mungkin untuk 3 produk
+    assert indices.shape == (3, 2)
+    for row in range(3):
+        assert row not in indices[row]
@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import db.util as db_util
+
+REVIEWS = [
+    {'id': review_id, 'review': f'review {review_id}', 'rating': 5, 'tanggal': None, 'productId': 1}
+    for review_id in (2, 3, 5, 8, 13, 21, 34)
+]
+
+
+class FakeCursor:
+    def __init__(self, queries):
+        self.queries = queries
+        self.rows = []
+
+    def execute(self, query, params):
+        self.queries.append((query, params))
+        after_id, limit = params
+        self.rows = [row for row in REVIEWS if row['id'] > after_id][:limit]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, queries):
+        self.queries = queries
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.queries)
+
+
+def test_review_pages_cover_every_row_once(monkeypatch):
+    queries = []
+    monkeypatch.setattr(db_util, 'get_db_connection', lambda: FakeConnection(queries))
+    monkeypatch.setattr(db_util, 'close_connection', lambda connection: None)
+
+    seen = []
+    after_id = None
+    while True:
+        reviews, after_id = db_util.getReviewPage(after_id, limit=3)
+        seen.extend(review['id'] for review in reviews)
+        if after_id is None:
+            break
+
+    assert seen == [row['id'] for row in REVIEWS]
+    assert len(queries) == 3
+    assert all('SELECT *' not in query and 'WHERE id > %s ORDER BY id' in query for query, _ in queries)
+
+
+def test_last_full_page_has_no_cursor(monkeypatch):
+    monkeypatch.setattr(db_util, 'get_db_connection', lambda: FakeConnection([]))
+    monkeypatch.setattr(db_util, 'close_connection', lambda connection: None)
+    reviews, next_cursor = db_util.getReviewPage(13, limit=2)
+    assert [review['id'] for review in reviews] == [21, 34]
+    assert next_cursor is None
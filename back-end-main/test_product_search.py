@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import db.util as db_util
+from product_search.index import ProductSearchIndex, MemorySearchBackend
+
+PRODUCTS = [
+    {'id': 1, 'name': 'Aerostreet 37-44 Massive Low 2.0 Hitam Natural - Sepatu Sneakers Casual - 37'},
+    {'id': 2, 'name': 'Aerostreet 39-44 Reno Hitam Army - Sandal Selop BAAAA - 39'},
+    {'id': 3, 'name': 'APPLE IPHONE 15 IBOX 512GB 256GB 128GB - IPHONE 14 - IPHONE 13 GARANSI RESMI'},
+    {'id': 4, 'name': 'Sepatu Hitam'},
+    {'id': 5, 'name': 'Kemeja Pria Lengan Panjang'},
+]
+
+
+def ids(results):
+    return [product['id'] for product in results]
+
+
+def test_every_token_must_match_and_short_names_rank_first():
+    index = ProductSearchIndex(PRODUCTS)
+    assert ids(index.search('sepatu hitam')) == [4, 1]
+    assert ids(index.search('hitam')) == [4, 2, 1]
+    assert index.search('sepatu kemeja') == []
+
+
+def test_prefix_matches_rank_below_exact_matches():
+    index = ProductSearchIndex(PRODUCTS + [{'id': 6, 'name': 'Sepatunya Hitam'}])
+    assert ids(index.search('aero')) == [2, 1]
+    # Panjang nama sama: exact "sepatu" (4) di atas prefix "sepatunya" (6)
+    assert ids(index.search('sepatu')) == [4, 6, 1]
+    assert ids(index.search('512gb')) == [3]
+
+
+def test_updates_and_removals_are_incremental():
+    index = ProductSearchIndex(PRODUCTS)
+    index.add([{'id': 5, 'name': 'Kemeja Hitam Pria'}])
+    index.remove([4])
+    assert ids(index.search('hitam')) == [5, 2, 1]
+    assert index.search('lengan') == []
+    assert len(index) == 4
+
+
+def test_backend_refresh_adds_new_products_and_rebuilds_after_deletes(monkeypatch):
+    table = list(PRODUCTS)
+    monkeypatch.setattr(db_util, 'iterProducts', lambda batch_size=1000, after_id=0: iter([p for p in table if p['id'] > after_id]))
+    monkeypatch.setattr(db_util, 'getProductStats', lambda: (len(table), max(p['id'] for p in table)))
+
+    backend = MemorySearchBackend(refresh_interval=60)
+    assert ids(backend.search('sandal')) == [2]
+
+    table.append({'id': 7, 'name': 'Sandal Jepit Hitam'})
+    backend.refresh()
+    assert ids(backend.search('sandal')) == [7, 2]
+
+    table.remove(PRODUCTS[1])
+    backend.refresh()
+    assert ids(backend.search('sandal')) == [7]
+
+
+def test_fuzzy_search_tolerates_typos():
+    index = ProductSearchIndex(PRODUCTS)
+    assert index.search('sepatuu') == []
+    assert ids(index.search('sepatuu', fuzzy=True)) == [4, 1]
+    assert ids(index.search('kemja pria', fuzzy=True)) == [5]
+    # Kecocokan exact tetap di atas kecocokan fuzzy
+    index.add([{'id': 8, 'name': 'Sepatuu Hitam'}])
+    assert ids(index.search('sepatuu', fuzzy=True))[0] == 8
+
+
+def test_backend_auto_mode_only_goes_fuzzy_without_results(monkeypatch):
+    monkeypatch.setattr(db_util, 'iterProducts', lambda batch_size=1000, after_id=0: iter([p for p in PRODUCTS if p['id'] > after_id]))
+    monkeypatch.setattr(db_util, 'getProductStats', lambda: (len(PRODUCTS), 5))
+    backend = MemorySearchBackend()
+    assert ids(backend.search('hitam', fuzzy='auto')) == ids(backend.search('hitam'))
+    assert ids(backend.search('hitm', fuzzy='auto')) == [4, 2, 1]
+    assert backend.search('hitm', fuzzy=False) == []
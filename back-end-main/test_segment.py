@@ -0,0 +1,28 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from review_summarization.segment import segment_review, summary_units
+
+
+def test_reviews_are_segmented_before_punctuation_is_removed():
+    assert segment_review('Barang sesuai pesanan. Pengiriman cepat!!\nSeller ramah') == [
+        ('Barang sesuai pesanan', 'barang sesuai pesanan'),
+        ('Pengiriman cepat', 'pengiriman cepat'),
+        ('Seller ramah', 'seller ramah'),
+    ]
+
+
+def test_exact_duplicates_become_one_weighted_unit():
+    units = summary_units(['Barang sesuai pesanan!', 'barang sesuai pesanan', 'Seller ramah sekali'], near_duplicates=False)
+    assert [(unit.normalized, unit.weight) for unit in units] == [('barang sesuai pesanan', 2), ('seller ramah sekali', 1)]
+
+
+def test_near_duplicates_are_merged_under_the_most_common_variant():
+    reviews = ['barang sesuai pesanan'] * 3 + ['Barang sesuai pesanannn', 'barang sesuai pesanan kak', 'Packing rapi dan aman']
+    units = summary_units(reviews)
+    assert [(unit.text, unit.weight) for unit in units] == [('barang sesuai pesanan', 5), ('Packing rapi dan aman', 1)]
+
+
+def test_single_words_are_kept_only_when_nothing_longer_exists():
+    assert [unit.text for unit in summary_units(['Mantap', 'Pengiriman cepat'])] == ['Pengiriman cepat']
+    assert [unit.weight for unit in summary_units(['Mantap', 'mantap!', 'ok'])] == [2, 1]
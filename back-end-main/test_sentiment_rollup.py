@@ -0,0 +1,27 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import db.util as db_util
+
+
+def test_staging_rollups_read_and_write_staging_tables():
+    query = db_util._rollup_query('sentiment_daily', '_staging', 'WHERE reviewId > %s')
+    assert 'INSERT INTO sentiment_daily_staging' in query
+    assert 'FROM review_sentiment_staging WHERE reviewId > %s' in query
+    assert 'GROUP BY productId, DATE(tanggal)' in query
+
+
+def test_prediction_rollup_keeps_the_original_columns():
+    query = db_util._rollup_query('prediction', '', '')
+    assert 'INSERT INTO prediction (productId, sentiment_positive, sentiment_negative, sentiment_neutral)' in query
+    assert 'confidence_sum' not in query
+    # Increment, bukan overwrite: rollup incremental menambah ke jumlah yang ada
+    assert 'sentiment_positive = sentiment_positive + VALUES(sentiment_positive)' in query
+
+
+def test_average_confidence_is_unscaled():
+    row = {'sentiment_positive': 3, 'sentiment_negative': 1, 'sentiment_neutral': 0, 'confidence_sum': 3 * 9000 + 6000}
+    assert db_util._sentiment_row(row) == {
+        'sentiment_positive': 3, 'sentiment_negative': 1, 'sentiment_neutral': 0, 'avg_confidence': 0.825
+    }
+    assert db_util._sentiment_row({**row, 'sentiment_positive': 0, 'sentiment_negative': 0})['avg_confidence'] == 0.0
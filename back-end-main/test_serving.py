@@ -0,0 +1,44 @@
+import sys
+import os
+import importlib.util
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import db.util as db_util
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_gunicorn_conf(monkeypatch, tmp_path):
+    monkeypatch.setenv('SUMMARY_PRECOMPUTE_LOCK', str(tmp_path / 'precompute.lock'))
+    monkeypatch.setenv('WEB_WORKERS', '3')
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', os.path.join(BASE_DIR, 'gunicorn.conf.py'))
+    conf = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(conf)
+    return conf
+
+
+def test_reset_keeps_inherited_pool_alive(monkeypatch):
+    inherited = object()
+    monkeypatch.setattr(db_util, 'connection_pool', inherited)
+    monkeypatch.setattr(db_util, '_inherited_pools', [])
+    db_util.reset_connection_pool()
+    assert db_util.connection_pool is None
+    assert db_util._inherited_pools == [inherited]
+
+
+def test_gunicorn_config_preloads_and_reads_env(monkeypatch, tmp_path):
+    conf = load_gunicorn_conf(monkeypatch, tmp_path)
+    assert conf.preload_app is True
+    assert conf.workers == 3
+    assert conf.worker_class == 'gthread'
+
+
+def test_only_one_worker_claims_the_precompute_lock(monkeypatch, tmp_path):
+    conf = load_gunicorn_conf(monkeypatch, tmp_path)
+    assert conf._claim_precompute() is True
+    # Proses lain (worker berikutnya) tidak mendapat lock selama pemiliknya hidup
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if conf._claim_precompute() is False else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    os.close(conf._precompute_lock)
@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ai_model.util import StemCache
+
+
+class CountingStemmer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, word):
+        self.calls.append(word)
+        return word[:4]
+
+
+def test_hits_and_misses_are_counted():
+    stemmer = CountingStemmer()
+    cache = StemCache(stemmer, max_size=10)
+    assert [cache.stem(word) for word in ('barang', 'bagus', 'barang')] == ['bara', 'bagu', 'bara']
+    assert stemmer.calls == ['barang', 'bagus']
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 2, 2)
+    assert stats['hit_rate'] == 1 / 3
+
+
+def test_least_recently_used_word_is_evicted():
+    stemmer = CountingStemmer()
+    cache = StemCache(stemmer, max_size=2)
+    cache.stem('barang')
+    cache.stem('bagus')
+    # 'barang' dipakai lagi sehingga 'bagus' menjadi yang paling lama
+    cache.stem('barang')
+    cache.stem('sesuai')
+    assert cache.stats()['evictions'] == 1
+    assert len(cache) == 2
+
+    cache.stem('barang')
+    cache.stem('bagus')
+    assert stemmer.calls == ['barang', 'bagus', 'sesuai', 'bagus']
+
+
+def test_new_stems_are_tracked_and_merged(tmp_path):
+    worker = StemCache(CountingStemmer(), max_size=10)
+    worker.track_new()
+    worker.stem('pengiriman')
+    worker.stem('pengiriman')
+    assert worker.drain_new() == {'pengiriman': 'peng'}
+    assert worker.drain_new() == {}
+
+    parent = StemCache(CountingStemmer(), max_size=10)
+    parent.update({'pengiriman': 'peng'})
+    path = tmp_path / 'stems.json'
+    parent.save(str(path))
+
+    restored = StemCache(CountingStemmer(), max_size=10)
+    assert restored.load(str(path)) == 1
+    assert restored.stem('pengiriman') == 'peng'
+    assert restored.stats()['hits'] == 1
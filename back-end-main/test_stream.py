@@ -0,0 +1,46 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flask import Flask
+from controller.stream import stream_response
+
+app = Flask(__name__)
+
+
+def rows(n, fail_after=None):
+    for i in range(n):
+        if fail_after is not None and i == fail_after:
+            raise RuntimeError('connection lost')
+        yield {'id': i + 1, 'review': f'review {i + 1}'}
+
+
+def body(response):
+    return ''.join(chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in response.response)
+
+
+def test_ndjson_writes_one_row_per_line():
+    with app.test_request_context():
+        response = stream_response(rows(1203), 'ndjson', 'ok')
+        lines = body(response).splitlines()
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(line)['id'] for line in lines] == list(range(1, 1204))
+
+
+def test_json_array_keeps_response_envelope():
+    with app.test_request_context():
+        document = json.loads(body(stream_response(rows(1001), 'json', 'Reviews fetched successfully')))
+        empty = json.loads(body(stream_response(rows(0), 'json', 'ok')))
+    assert document['error'] is False
+    assert document['message'] == 'Reviews fetched successfully'
+    assert len(document['data']) == 1001
+    assert empty == {'data': [], 'error': False, 'message': 'ok'}
+
+
+def test_failure_mid_stream_is_reported_in_the_body():
+    with app.test_request_context():
+        document = json.loads(body(stream_response(rows(1200, fail_after=700), 'json', 'ok')))
+        last_line = body(stream_response(rows(1200, fail_after=700), 'ndjson', 'ok')).splitlines()[-1]
+    assert document['error'] is True
+    assert len(document['data']) == 500
+    assert json.loads(last_line)['error'] is True
@@ -0,0 +1,89 @@
+import sys
+import os
+import types
+import importlib
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def store(monkeypatch):
+    # LexRank (dan korpus NLTK-nya) diganti stub; summarize_texts dipatch per test
+    summarizer = types.ModuleType('review_summarization.main')
+    summarizer.lexrank_summarizer = lambda texts, num_sentences=3, threshold=0.1: ' '.join(texts)
+    monkeypatch.setitem(sys.modules, 'review_summarization.main', summarizer)
+    monkeypatch.delitem(sys.modules, 'review_summarization.store', raising=False)
+    return importlib.import_module('review_summarization.store')
+
+
+def install(store, monkeypatch, reviews, stored):
+    saved = {}
+    fetched = []
+
+    def reviews_by_products(productIds):
+        fetched.extend(productIds)
+        return {productId: reviews.get(productId, []) for productId in productIds}
+
+    def fingerprints(productIds=None):
+        current = {productId: (len(rows), 10 * productId + len(rows), productId) for productId, rows in reviews.items() if rows}
+        return current if productIds is None else {productId: current[productId] for productId in productIds if productId in current}
+
+    monkeypatch.setattr(store, 'getReviewsByProducts', reviews_by_products)
+    monkeypatch.setattr(store, 'getReviewFingerprints', fingerprints)
+    monkeypatch.setattr(store, 'getStoredSummary', lambda productId: stored.get(productId))
+    monkeypatch.setattr(store, 'getStoredSummaries', lambda productIds: {p: stored[p] for p in productIds if p in stored})
+    monkeypatch.setattr(store, 'getStoredSummaryFingerprints',
+                        lambda: {productId: row['fingerprint'] for productId, row in stored.items()})
+    monkeypatch.setattr(store, 'saveSummaries', lambda rows: saved.update({p: (f, summary) for p, f, summary in rows}))
+    monkeypatch.setattr(store, 'summarize_texts', lambda texts: ' | '.join(texts))
+    return fetched, saved
+
+
+def test_stored_summary_is_served_only_for_the_same_fingerprint(store, monkeypatch):
+    install(store, monkeypatch, {}, {1: {'fingerprint': (3, 10, 99), 'summary': 'lama', 'updated_at': None}})
+    assert store.get_stored_summary(1, (3, 10, 99)) == 'lama'
+    assert store.get_stored_summary(1, (4, 11, 98)) is None
+    assert store.get_stored_summary(2, (1, 5, 5)) is None
+
+
+def test_lookup_errors_fall_back_to_recomputing(store, monkeypatch):
+    def broken(productId):
+        raise RuntimeError("Table 'review_summary' doesn't exist")
+    monkeypatch.setattr(store, 'getStoredSummary', broken)
+    assert store.get_stored_summary(1, (1, 1, 1)) is None
+
+
+def test_batch_serves_fresh_summaries_and_recomputes_stale_ones(store, monkeypatch):
+    reviews = {
+        1: [{'review': 'barang sesuai pesanan'}],
+        2: [{'review': 'pengiriman cepat sekali'}, {'review': 'ok'}, {'review': 'seller ramah sekali'}],
+        3: [{'review': 'ok'}],
+    }
+    stored = {
+        1: {'fingerprint': (1, 11, 1), 'summary': 'tersimpan'},
+        2: {'fingerprint': (1, 21, 2), 'summary': 'usang'},
+    }
+    fetched, saved = install(store, monkeypatch, reviews, stored)
+
+    results = store.summarize_products(['2', 1, 3, 4, 2])
+    assert results == {
+        2: 'pengiriman cepat sekali | seller ramah sekali',
+        1: 'tersimpan',
+        3: None,  # hanya review terlalu pendek
+        4: None,  # tidak punya review
+    }
+    assert sorted(fetched) == [2, 3]
+    assert saved == {2: ((3, 23, 2), results[2])}
+
+
+def test_precompute_only_refreshes_changed_products(store, monkeypatch):
+    reviews = {pid: [{'review': f'review produk nomor {pid}'}] for pid in (1, 2, 3)}
+    stored = {
+        1: {'fingerprint': (1, 11, 1), 'summary': 'tetap'},
+        2: {'fingerprint': (1, 99, 2), 'summary': 'usang'},
+    }
+    fetched, saved = install(store, monkeypatch, reviews, stored)
+
+    assert store.precompute_summaries(workers=0, batch_size=1) == 2
+    assert sorted(fetched) == [2, 3]
+    assert saved[2][0] == (1, 21, 2)
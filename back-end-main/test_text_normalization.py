@@ -0,0 +1,41 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from text_processing.normalize import TextNormalizer, clean_text, strip_punctuation
+from text_processing.slang import fix_slangwords
+
+STOPWORDS = frozenset(['yang', 'dan', 'nya'])
+
+
+def test_clean_text_removes_noise_in_one_pass():
+    text = 'RT @toko Barang_nya 100% BAGUS!!! 😍 cek https://tokopedia.link/x #promo\nmantap'
+    assert clean_text(text).split() == ['barangnya', 'bagus', 'cek', 'mantap']
+
+
+def test_normalize_applies_slang_and_stopwords():
+    normalizer = TextNormalizer(stopwords=STOPWORDS)
+    # "suka banget" dan "barang bagus" adalah bigram pada kamus slang
+    assert normalizer.normalize('Gw syukaa bgt, barang bagus dan yang jual ramah') == 'saya cinta bagus jual ramah'
+    assert normalizer.normalize(None) == ''
+    assert normalizer.normalize('   ') == ''
+
+
+def test_normalize_many_matches_normalize():
+    calls = []
+
+    def stem(word):
+        calls.append(word)
+        return word.rstrip('s')
+
+    normalizer = TextNormalizer(stem=stem, stopwords=STOPWORDS)
+    texts = ['Barang bagusss', float('nan'), 'Barang bagusss', 'pengiriman cepat']
+    assert normalizer.normalize_many(texts) == [normalizer.normalize(text) if isinstance(text, str) else '' for text in texts]
+    # Teks yang berulang hanya dinormalisasi sekali dalam satu batch
+    calls.clear()
+    normalizer.normalize_many(['Barang bagusss'] * 5)
+    assert calls == ['barang', 'bagusss']
+
+
+def test_strip_punctuation_keeps_digits():
+    assert strip_punctuation('Ukuran  42, pas!  Mantap...') == 'ukuran 42 pas mantap'
+    assert fix_slangwords('Barang bgs') == 'bagus'
@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import argparse
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from text_processing.slang import SLANG_VERSION, DATA_DIR
+
+# Kamus slang publik yang dulu diunduh setiap kali modul di-import
+UPSTREAM_URL = "https://raw.githubusercontent.com/louisowen6/NLP_bahasa_resources/refs/heads/master/combined_slang_words.txt"
+OVERRIDES_PATH = os.path.join(DATA_DIR, 'slang_overrides.json')
+
+
+def fetch_upstream(url=UPSTREAM_URL):
+    import requests
+
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def build(upstream, overrides):
+    """Merge upstream entries with our overrides (overrides win) and split uni/bigrams"""
+    merged = dict(upstream)
+    merged.update(overrides)
+    unigrams = {word: fixed for word, fixed in merged.items() if ' ' not in word}
+    bigrams = {word: fixed for word, fixed in merged.items() if ' ' in word}
+    return {
+        'version': SLANG_VERSION,
+        'upstream': bool(upstream),
+        'unigrams': dict(sorted(unigrams.items())),
+        'bigrams': dict(sorted(bigrams.items()))
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the bundled slang dictionary')
+    parser.add_argument('--offline', action='store_true', help='only use slang_overrides.json')
+    parser.add_argument('--output', default=os.path.join(DATA_DIR, f'slang_v{SLANG_VERSION}.json'))
+    args = parser.parse_args()
+
+    with open(OVERRIDES_PATH, 'r', encoding='utf-8') as file:
+        overrides = json.load(file)
+    upstream = {} if args.offline else fetch_upstream()
+
+    data = build(upstream, overrides)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        # Tanpa indentasi agar file ringkas dan cepat di-parse
+        json.dump(data, file, ensure_ascii=False, separators=(',', ':'))
+    print(f"Slang dictionary v{SLANG_VERSION}: {len(data['unigrams'])} unigrams, "
+          f"{len(data['bigrams'])} bigrams -> {args.output}")
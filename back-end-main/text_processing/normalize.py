@@ -0,0 +1,101 @@
+import re
+import threading
+from .slang import fix_slang_tokens
+
+# Satu regex untuk seluruh pembersihan; urutan alternatif mengikuti urutan langkah lama
+# (mention, hashtag, RT, link, angka, tanda baca, underscore, emoji)
+_CLEAN_PATTERN = re.compile(
+    r'@[A-Za-z0-9]+'
+    r'|#[A-Za-z0-9]+'
+    r'|RT\s'
+    r'|http\S+'
+    r'|[0-9]+'
+    r'|[^\w\s]'
+    r'|_'
+    "|["
+    "\U0001F600-\U0001F64F"
+    "\U0001F300-\U0001F5FF"
+    "\U0001F680-\U0001F6FF"
+    "\U0001F1E0-\U0001F1FF"
+    "\U00002700-\U000027BF"
+    "\U000024C2-\U0001F251"
+    "]+",
+    flags=re.UNICODE
+)
+_NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+
+# Stopword tambahan untuk review e-commerce, di luar daftar NLTK
+EXTRA_STOPWORDS = (
+    'iya', 'yaa', 'nya', 'na', 'sih', 'ku', 'di', 'ya', 'loh', 'kah', 'woi', 'woii', 'woy', 'nih', 'trus', 'tuh',
+    'yah', 'ajah', 'lagi', 'lah', 'aj', 'aja', 'jg', 'juga', 'jga', 'jugaa', 'yng', 'apa', 'cuman', 'deh',
+    'min', 'gak', 'cuma', 'si', 'an', 'dikit', 'langsung'
+)
+
+_stopwords_lock = threading.Lock()
+_stopwords = None
+
+
+def default_stopwords():
+    """NLTK Indonesian stopwords plus EXTRA_STOPWORDS, built once per process"""
+    global _stopwords
+    if _stopwords is None:
+        with _stopwords_lock:
+            if _stopwords is None:
+                from nltk.corpus import stopwords
+
+                _stopwords = frozenset(stopwords.words('indonesian')).union(EXTRA_STOPWORDS)
+    return _stopwords
+
+
+def clean_text(text):
+    """Strip mentions, hashtags, links, digits, punctuation and emoji in one pass, then lowercase"""
+    return _CLEAN_PATTERN.sub('', text.replace('\n', ' ')).lower()
+
+
+def strip_punctuation(text):
+    """Lowercase, replace punctuation with spaces and collapse whitespace (keeps digits)"""
+    return ' '.join(_NON_WORD_PATTERN.sub(' ', text.lower()).split())
+
+
+class TextNormalizer:
+    """
+    clean -> (stem) -> slang -> stopword filter, shared by the NLP modules.
+
+    Patterns are compiled once at import and the stopword set is frozen on
+    first use. normalize_many() normalises each distinct text once, which
+    pays off on review corpora full of repeated short reviews.
+    """
+
+    def __init__(self, stem=None, stopwords=None):
+        self.stem = stem
+        self._stopwords = stopwords
+
+    @property
+    def stopwords(self):
+        if self._stopwords is None:
+            self._stopwords = default_stopwords()
+        return self._stopwords
+
+    def normalize(self, text):
+        if not isinstance(text, str) or not text.strip():
+            return ""
+
+        words = clean_text(text).split()
+        if self.stem is not None:
+            # Stemmer bisa mengembalikan string kosong, jadi dipecah ulang
+            words = ' '.join([self.stem(word) for word in words]).split()
+        stopwords = self.stopwords
+        return ' '.join(word for word in fix_slang_tokens(words) if word not in stopwords)
+
+    def normalize_many(self, texts):
+        seen = {}
+        normalized = []
+        for text in texts:
+            if not isinstance(text, str):
+                normalized.append(self.normalize(text))
+                continue
+            result = seen.get(text)
+            if result is None:
+                result = seen[text] = self.normalize(text)
+            normalized.append(result)
+        return normalized
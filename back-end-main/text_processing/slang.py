@@ -0,0 +1,66 @@
+import os
+import json
+import threading
+
+# Versi format/isi kamus; naikkan bersama nama file saat kamus dibangun ulang
+SLANG_VERSION = 1
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+# Bisa diarahkan ke file lain (mis. hasil build_slang.py) tanpa mengubah kode
+SLANG_PATH = os.getenv('SLANG_DICT_PATH', os.path.join(DATA_DIR, f'slang_v{SLANG_VERSION}.json'))
+
+_lock = threading.Lock()
+_slang = None
+
+
+def load_slang(path=None):
+    """
+    (unigrams, bigrams) dictionaries from the bundled slang file.
+
+    Read once per process on first use and shared by every caller, so
+    importing a preprocessing module never touches the disk or network.
+    """
+    global _slang
+    if path is not None:
+        return _read_slang(path)
+    if _slang is None:
+        with _lock:
+            if _slang is None:
+                _slang = _read_slang(SLANG_PATH)
+    return _slang
+
+
+def _read_slang(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    if data.get('version') != SLANG_VERSION:
+        raise ValueError(f"Unsupported slang dictionary version {data.get('version')} in {path}")
+    return data['unigrams'], data['bigrams']
+
+
+def fix_slang_tokens(words):
+    """Replace slang in a list of lowercase tokens; returns the new token list"""
+    unigrams, bigrams = load_slang()
+
+    # Step 1: Fix unigrams
+    fixed_unigrams = [unigrams.get(word, word) for word in words]
+
+    # Step 2: Check for fixed bigrams
+    i = 0
+    final_words = []
+    while i < len(fixed_unigrams):
+        if i + 1 < len(fixed_unigrams):
+            bigram = f"{fixed_unigrams[i]} {fixed_unigrams[i+1]}"
+            if bigram in bigrams:
+                final_words.append(bigrams[bigram])
+                i += 2
+                continue
+
+        final_words.append(fixed_unigrams[i])
+        i += 1
+
+    # Nilai pengganti bisa terdiri dari beberapa kata
+    return ' '.join(final_words).split()
+
+
+def fix_slangwords(text):
+    return ' '.join(fix_slang_tokens(text.lower().split()))
@@ -0,0 +1,77 @@
+import os
+import gc
+import sys
+import time
+import logging
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+# Muat model sentimen + tokenizer di master sebelum fork (1/0)
+PRELOAD_SENTIMENT_MODEL = os.getenv('PRELOAD_SENTIMENT_MODEL', '1') == '1'
+
+WARMUP_REVIEWS = [
+    'Barang sesuai pesanan, pengiriman cepat.',
+    'Kualitas bagus dan seller ramah.',
+    'Packing aman, recommended seller.',
+]
+
+
+def preload_models():
+    """
+    Heavy artifacts loaded once in the gunicorn master: the Keras model and
+    tokenizer (ai_model.predict), the stopwords and TF-IDF summariser
+    (review_summarization.main). Workers forked afterwards share these
+    pages copy-on-write.
+    """
+    loaded = []
+    if PRELOAD_SENTIMENT_MODEL:
+        try:
+            import ai_model.predict  # noqa: F401  memuat model + tokenizer saat import
+            loaded.append('sentiment model')
+        except Exception as e:
+            log.warning('sentiment model not preloaded', extra={'error': str(e)})
+    # Stopwords NLTK; sudah dimuat oleh warmup create_app, jika tersedia
+    from controller.fetch import summarizer
+    if summarizer.available():
+        loaded.append('summarizer')
+    return loaded
+
+
+def warmup():
+    """
+    Dummy prediction and summary in the current process, run by every
+    worker before it accepts traffic so the first request does not pay
+    for lazy initialisation (TensorFlow graph/thread pools, vectorizer).
+    """
+    start = time.perf_counter()
+    if 'ai_model.predict' in sys.modules:
+        try:
+            sys.modules['ai_model.predict'].predict_proba(WARMUP_REVIEWS)
+        except Exception as e:
+            log.warning('sentiment warmup failed', extra={'error': str(e)})
+    if 'review_summarization.main' in sys.modules:
+        try:
+            sys.modules['review_summarization.main'].lexrank_summarizer(WARMUP_REVIEWS, num_sentences=1)
+        except Exception as e:
+            log.warning('summarizer warmup failed', extra={'error': str(e)})
+    log.info('worker warmed up', extra={'pid': os.getpid(), 'seconds': round(time.perf_counter() - start, 2)})
+
+
+def create_app():
+    """App factory for WSGI servers: indexes and models are loaded before the app is returned"""
+    from main import create_app as create_flask_app
+    # Sinkron: semua yang dimuat di master dibagi ke worker setelah fork
+    flask_app = create_flask_app(warmup='sync')
+    loaded = preload_models()
+    log.info('models preloaded before fork', extra={'models': ', '.join(loaded) or 'none'})
+    # Objek hasil preload dipindah ke generasi permanen: GC di worker tidak menyentuh
+    # (dan tidak menyalin) halaman memori yang dibagi dengan master
+    gc.freeze()
+    return flask_app
+
+
+app = create_app()